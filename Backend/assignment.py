@@ -0,0 +1,171 @@
+"""
+Availability-aware AE assignment
+
+Keeps, per AE, a sorted list of booked demo start times. Every demo lasts
+DEMO_DURATION_MINUTES, so a candidate slot [s, s + d) collides with a booking
+at t exactly when s - d < t < s + d: one bisect per AE answers it.
+"""
+from __future__ import annotations
+
+import asyncio
+import time as _time
+from bisect import bisect_right, insort
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from .config import config
+from .repository import BookingRepository
+
+
+# Tries at assigning a booking when its write loses the slot to another process
+ASSIGNMENT_ATTEMPTS = 3
+
+
+def naive_utc(dt: datetime) -> datetime:
+    # Bookings are stored as naive datetimes; compare like with like
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+class AESchedule:
+    """One AE's working hours (local to their timezone) and sorted booked start times (naive UTC)."""
+
+    __slots__ = ("ae_id", "name", "working_start", "working_end", "tz", "starts")
+
+    def __init__(self, ae_id: UUID, name: str, working_start: time, working_end: time, tz: str = "UTC") -> None:
+        self.ae_id = ae_id
+        self.name = name
+        self.working_start = working_start
+        self.working_end = working_end
+        self.tz = _zone(tz)
+        self.starts: List[datetime] = []
+
+    @property
+    def load(self) -> int:
+        return len(self.starts)
+
+    def within_working_hours(self, start: datetime, duration: timedelta) -> bool:
+        # Convert each end separately: wall-clock arithmetic would misplace demos spanning a DST change
+        start, end = (dt.replace(tzinfo=timezone.utc).astimezone(self.tz) for dt in (start, start + duration))
+        return (
+            end.date() == start.date()
+            and self.working_start <= start.time()
+            and end.time() <= self.working_end
+        )
+
+    def has(self, start: datetime) -> bool:
+        i = bisect_right(self.starts, start) - 1
+        return i >= 0 and self.starts[i] == start
+
+    def is_free(self, start: datetime, duration: timedelta) -> bool:
+        i = bisect_right(self.starts, start - duration)
+        return i == len(self.starts) or self.starts[i] >= start + duration
+
+    def book(self, start: datetime) -> None:
+        insort(self.starts, start)
+
+    def release(self, start: datetime) -> None:
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0 and self.starts[i] == start:
+            del self.starts[i]
+
+
+class AssignmentEngine:
+    """Picks the least-loaded AE that is working and free for a requested slot.
+
+    The index covers bookings from the current time onwards and is rebuilt
+    from storage every ASSIGNMENT_REFRESH_SECONDS, which also picks up
+    bookings made by other worker processes. Within a process, assignment and
+    reservation happen under one lock, so concurrent requests never receive
+    the same AE for overlapping slots. Reservations stay pending until the
+    caller confirms (booking saved) or releases them, and are carried across
+    rebuilds until the snapshot is sure to include them. Across processes the
+    repository rejects overlapping writes with SlotConflictError; callers
+    then invalidate() and assign again.
+    """
+
+    def __init__(self, duration: timedelta, refresh_interval: float) -> None:
+        self.duration = duration
+        self.refresh_interval = refresh_interval
+        self.schedules: Dict[UUID, AESchedule] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # (ae_id, start) -> monotonic time the booking was confirmed, None while it is being saved
+        self._pending: Dict[Tuple[UUID, datetime], Optional[float]] = {}
+
+    async def _refresh(self, repo: BookingRepository) -> None:
+        started = _time.monotonic()
+        since = datetime.utcnow() - self.duration
+        aes, starts = await repo.assignment_snapshot(since)
+        schedules = {ae.id: AESchedule(ae.id, ae.name, ae.working_start, ae.working_end, ae.timezone) for ae in aes}
+        for ae_id, scheduled_time in starts:
+            if ae_id in schedules:
+                schedules[ae_id].starts.append(scheduled_time)
+        for schedule in schedules.values():
+            schedule.starts.sort()
+
+        for (ae_id, start), confirmed_at in list(self._pending.items()):
+            if (confirmed_at is not None and confirmed_at < started) or start < since:
+                # Committed before the snapshot was read, or already over
+                del self._pending[(ae_id, start)]
+                continue
+            schedule = schedules.get(ae_id)
+            if schedule is not None and not schedule.has(start):
+                schedule.book(start)
+        
+        self.schedules = schedules
+        self._loaded_at = _time.monotonic()
+
+    def _pick(self, start: datetime) -> Optional[AESchedule]:
+        best: Optional[AESchedule] = None
+        for schedule in self.schedules.values():
+            if best is not None and schedule.load >= best.load:
+                continue
+            if schedule.within_working_hours(start, self.duration) and schedule.is_free(start, self.duration):
+                best = schedule
+        if best is not None:
+            best.book(start)
+            self._pending[(best.ae_id, start)] = None
+        return best
+
+    async def assign(self, repo: BookingRepository, start: datetime) -> Optional[AESchedule]:
+        """Choose and reserve an AE for a demo at `start`, or None if nobody is free."""
+        return (await self.assign_many(repo, [start]))[0]
+
+    async def assign_many(self, repo: BookingRepository, starts: List[datetime]) -> List[Optional[AESchedule]]:
+        """Assign a batch of demos in order under a single lock acquisition."""
+        async with self._lock:
+            if self._loaded_at is None or _time.monotonic() - self._loaded_at > self.refresh_interval:
+                await self._refresh(repo)
+            return [self._pick(naive_utc(start)) for start in starts]
+
+    def confirm(self, ae_id: UUID, start: datetime) -> None:
+        """Record that a reservation's booking has been committed."""
+        key = (ae_id, naive_utc(start))
+        if key in self._pending:
+            self._pending[key] = _time.monotonic()
+
+    def release(self, ae_id: UUID, start: datetime) -> None:
+        """Undo a reservation whose booking was not saved."""
+        start = naive_utc(start)
+        self._pending.pop((ae_id, start), None)
+        schedule = self.schedules.get(ae_id)
+        if schedule is not None:
+            schedule.release(start)
+
+    def invalidate(self) -> None:
+        """Rebuild from storage on the next assignment, e.g. after a SlotConflictError."""
+        self._loaded_at = None
+
+
+assignment_engine = AssignmentEngine(
+    duration=timedelta(minutes=config.DEMO_DURATION_MINUTES),
+    refresh_interval=config.ASSIGNMENT_REFRESH_SECONDS,
+)
@@ -0,0 +1,198 @@
+"""
+Bulk booking generator for benchmarks
+
+Generates AEs and N bookings spread over working-hour slots from 90 days ago
+to 90 days ahead, and loads them into Postgres (COPY) or the in-memory store.
+Unlike database.seed_data it scales to millions of rows.
+
+Usage (from the repository root, against a database you can wipe):
+    python -m Backend.benchmarks.datagen --bookings 100000 --reset
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import time as _time
+import uuid
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..database import engine, run_migrations
+from ..db import AERecord, BookingRecord, InMemoryDB
+from ..etag import DATA_VERSION_NAME
+from ..utils import create_meeting_link
+
+CATEGORIES = ["Cafe", "QSR", "Fine Dining", "Bakery", "Bar", "Fast Casual", "Food Truck"]
+OUTLETS = ["1 Location", "2-5 Locations", "6-20 Locations", "20+ Locations"]
+PRODUCTS = ["POS", "Online Ordering", "Payments", "Loyalty", "Delivery", "Inventory Management", "Kitchen Display"]
+PAIN_POINTS = [
+    "Long queues at lunch and slow card payments",
+    "Struggling with inventory management across multiple locations",
+    "Need better online ordering system and delivery integration",
+    "Staff scheduling is done on paper",
+    "No visibility into which menu items are profitable",
+    "Third-party delivery fees are eating margins",
+]
+NOTES = [None, "Currently using Square, looking to upgrade", "Interested in accounting integration", "Prefers afternoon calls"]
+SHIFTS = [(time(8, 30), time(16, 30)), (time(9, 0), time(17, 0)), (time(10, 0), time(18, 0))]
+
+# COPY column order; matches the dicts from generate_bookings
+BOOKING_COLUMNS = (
+    "id",
+    "merchant_name",
+    "address",
+    "contact_number",
+    "email",
+    "products_interested",
+    "preferred_time",
+    "website_links",
+    "social_media",
+    "restaurant_category",
+    "number_of_outlets",
+    "current_pain_points",
+    "special_notes",
+    "assigned_ae_id",
+    "scheduled_time",
+    "meeting_link",
+    "prep_brief_status",
+    "status",
+    "created_at",
+)
+
+
+def generate_aes(count: int) -> List[AERecord]:
+    aes = []
+    for i in range(count):
+        working_start, working_end = SHIFTS[i % len(SHIFTS)]
+        aes.append(AERecord(name=f"AE {i + 1:03d}", email=f"ae{i + 1}@example.com", working_start=working_start, working_end=working_end))
+    return aes
+
+
+def generate_bookings(n: int, aes: List[Tuple[uuid.UUID, time, time]], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield n booking column dicts, each assigned to a random AE from (id, working_start, working_end)."""
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    first_day = now - timedelta(days=90)
+    meeting_link = create_meeting_link()
+    for i in range(n):
+        ae_id, working_start, working_end = aes[rng.randrange(len(aes))]
+        day = first_day + timedelta(days=rng.randrange(180))
+        start = datetime.combine(day.date(), working_start)
+        slots = (datetime.combine(day.date(), working_end) - start) // timedelta(minutes=30)
+        scheduled = start + timedelta(minutes=30 * rng.randrange(max(slots, 1)))
+        if scheduled < now:
+            status = "completed" if rng.random() < 0.9 else "upcoming"
+        else:
+            status = "prep-needed" if rng.random() < 0.3 else "upcoming"
+        yield {
+            "id": uuid.uuid4(),
+            "merchant_name": f"Merchant {i:07d} {rng.choice(CATEGORIES)}",
+            "address": f"{rng.randrange(1, 9999)} Main St",
+            "contact_number": f"+1-555-{rng.randrange(10000):04d}",
+            "email": f"owner{i}@merchant.example",
+            "products_interested": rng.sample(PRODUCTS, rng.randint(1, 3)),
+            "preferred_time": scheduled,
+            "website_links": None,
+            "social_media": None,
+            "restaurant_category": rng.choice(CATEGORIES),
+            "number_of_outlets": rng.choice(OUTLETS),
+            "current_pain_points": rng.choice(PAIN_POINTS),
+            "special_notes": rng.choice(NOTES),
+            "assigned_ae_id": ae_id,
+            "scheduled_time": scheduled,
+            "meeting_link": meeting_link,
+            "prep_brief_status": "Generated" if status == "completed" else "Pending",
+            "status": status,
+            "created_at": scheduled - timedelta(days=rng.randrange(1, 30)),
+        }
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value  # None is written as an empty unquoted field, which COPY reads as NULL
+
+
+def _copy(cursor: Any, sql: str, buffer: io.StringIO) -> None:
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def seed_postgres(bookings: int, aes: int, reset: bool, seed: int = 0, chunk_size: int = 50_000) -> None:
+    """Migrate, then COPY the AEs and bookings in one transaction. reset wipes existing data first."""
+    run_migrations()
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if reset:
+            cursor.execute("TRUNCATE brief_jobs, prep_briefs, brief_cache, merchant_bookings, aes")
+        cursor.execute("SELECT id, working_start, working_end FROM aes")
+        shifts = cursor.fetchall()
+        if not shifts:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for ae in generate_aes(aes):
+                writer.writerow([ae.id, ae.name, ae.email, ae.working_start.isoformat(), ae.working_end.isoformat()])
+                shifts.append((ae.id, ae.working_start, ae.working_end))
+            _copy(cursor, "COPY aes (id, name, email, working_start, working_end) FROM STDIN WITH (FORMAT csv)", buffer)
+
+        copy_sql = f"COPY merchant_bookings ({', '.join(BOOKING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+        rows = generate_bookings(bookings, shifts, seed)
+        written = 0
+        while written < bookings:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([_csv_value(row[column]) for column in BOOKING_COLUMNS])
+                written += 1
+                if written % chunk_size == 0:
+                    break
+            _copy(cursor, copy_sql, buffer)
+
+        # Invalidate any ETags clients may hold
+        cursor.execute(
+            "INSERT INTO data_versions (name, version) VALUES (%s, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1",
+            (DATA_VERSION_NAME,),
+        )
+        conn.commit()
+        cursor.execute("ANALYZE aes, merchant_bookings")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def seed_memory(store: InMemoryDB, bookings: int, aes: int, seed: int = 0) -> None:
+    """Load AEs and bookings into an in-memory store (before the app seeds its sample data)."""
+    if not store.aes:
+        for ae in generate_aes(aes):
+            store.add_ae(ae)
+    shifts = [(ae.id, ae.working_start, ae.working_end) for ae in store.aes.values()]
+    store.load_bookings(BookingRecord(**row) for row in generate_bookings(bookings, shifts, seed))
+    store.version += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=10_000)
+    parser.add_argument("--aes", type=int, default=20, help="AEs to create if the database has none")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed, for reproducible data")
+    parser.add_argument("--reset", action="store_true", help="Delete all AEs, bookings, briefs and jobs first")
+    args = parser.parse_args()
+
+    started = _time.perf_counter()
+    seed_postgres(args.bookings, args.aes, args.reset, args.seed)
+    print(f"✅ Seeded {args.bookings} bookings in {_time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
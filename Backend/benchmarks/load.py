@@ -0,0 +1,328 @@
+"""
+End-to-end load benchmark: throughput and p50/p95/p99 latency per route
+
+For each dataset size it starts a mock LLM server and the API (seeded through
+benchmarks.serve), drives /book-demo, /demos, /calendar-events,
+/generate-brief and /prep-brief concurrently for a fixed duration, and
+emits one JSON document with the results, so runs can be compared across
+commits.
+
+Usage (from the repository root):
+    python -m Backend.benchmarks.load --sizes 10000,100000,1000000 --backend memory --output bench.json
+    python -m Backend.benchmarks.load --backend postgres --sizes 100000   # DATABASE_URL is wiped and reseeded
+    python -m Backend.benchmarks.load --target http://127.0.0.1:8000      # an already running server, as is
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Relative weight of each route in the request mix
+DEFAULT_MIX = {
+    "GET /demos": 40,
+    "GET /calendar-events": 20,
+    "GET /prep-brief": 20,
+    "POST /book-demo": 10,
+    "POST /generate-brief": 10,
+}
+
+DEMOS_QUERIES: List[Dict[str, Any]] = [
+    {},
+    {"status": "upcoming"},
+    {"sort": "merchant_name"},
+    {"sort": "-scheduled_time", "status": ["upcoming", "prep-needed"]},
+    {"product": "Loyalty"},
+    {"q": "inventory"},
+]
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+class Recorder:
+    """Latencies and status codes per route, ignoring anything that finishes during warm-up."""
+
+    def __init__(self, measure_from: float) -> None:
+        self.measure_from = measure_from
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+
+    def record(self, route: str, started: float, elapsed: float, status: str) -> None:
+        if started < self.measure_from:
+            return
+        self.latencies.setdefault(route, []).append(elapsed)
+        self.statuses.setdefault(route, Counter())[status] += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            routes[route] = _stats(sorted(values), self.statuses[route], duration)
+        every = sorted(v for values in self.latencies.values() for v in values)
+        total = sum((self.statuses.values()), Counter())
+        return {"routes": routes, "total": _stats(every, total, duration)}
+
+
+def _stats(ordered: List[float], statuses: Counter, duration: float) -> Dict[str, Any]:
+    errors = sum(n for status, n in statuses.items() if status == "error" or status.startswith("5"))
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / duration, 2),
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p95": round(percentile(ordered, 95) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+        "status": dict(sorted(statuses.items())),
+    }
+
+
+class Workload:
+    """Builds requests for each route from booking ids sampled off the server under test."""
+
+    def __init__(self, client: httpx.AsyncClient, booking_ids: List[str], rng: random.Random) -> None:
+        self.client = client
+        self.booking_ids = booking_ids
+        self.briefed: List[str] = []
+        self.rng = rng
+        self.booked = 0
+
+    def requests(self) -> Dict[str, Callable[[], Awaitable[httpx.Response]]]:
+        return {
+            "GET /demos": self.demos,
+            "GET /calendar-events": self.calendar_events,
+            "GET /prep-brief": self.prep_brief,
+            "POST /book-demo": self.book_demo,
+            "POST /generate-brief": self.generate_brief,
+        }
+
+    async def demos(self) -> httpx.Response:
+        params = dict(self.rng.choice(DEMOS_QUERIES), limit=100)
+        return await self.client.get("/demos", params=params)
+
+    async def calendar_events(self) -> httpx.Response:
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=self.rng.randint(-60, 60))
+        params = {"from": start.isoformat(), "to": (start + timedelta(days=7)).isoformat()}
+        return await self.client.get("/calendar-events", params=params)
+
+    async def prep_brief(self) -> httpx.Response:
+        booking_id = self.rng.choice(self.briefed or self.booking_ids)
+        return await self.client.get(f"/prep-brief/{booking_id}")
+
+    async def book_demo(self) -> httpx.Response:
+        # Far-future weekday slots, so bookings mostly succeed regardless of the seeded schedule
+        day = datetime(2040, 1, 2) + timedelta(days=self.rng.randrange(3650))
+        slot = day.replace(hour=self.rng.randint(10, 15), minute=self.rng.choice([0, 30]))
+        self.booked += 1
+        return await self.client.post(
+            "/book-demo",
+            json={
+                "merchantName": f"Load Test Merchant {self.booked}",
+                "address": "1 Bench St",
+                "contactNumber": "+1-555-0100",
+                "email": f"load{self.booked}@example.com",
+                "productsInterested": ["POS", "Payments"],
+                "preferredDateTime": slot.isoformat(),
+                "category": "Cafe",
+                "outlets": "1 Location",
+                "painPoints": "Slow checkout at lunch",
+            },
+        )
+
+    async def generate_brief(self) -> httpx.Response:
+        booking_id = self.rng.choice(self.booking_ids)
+        response = await self.client.post(f"/generate-brief/{booking_id}")
+        if response.status_code == 202:
+            self.briefed.append(booking_id)
+        return response
+
+
+async def sample_booking_ids(client: httpx.AsyncClient, pages: int = 5) -> List[str]:
+    """Upcoming booking ids to generate and fetch briefs for."""
+    ids: List[str] = []
+    params: Dict[str, Any] = {"status": ["upcoming", "prep-needed"], "limit": 500}
+    for _ in range(pages):
+        response = await client.get("/demos", params=params)
+        response.raise_for_status()
+        ids += [demo["id"] for demo in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    if not ids:
+        raise RuntimeError("The server under test has no upcoming bookings to drive brief routes with")
+    return ids
+
+
+async def run_load(
+    base_url: str, duration: float, warmup: float, concurrency: int, mix: Dict[str, int], seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        workload = Workload(client, await sample_booking_ids(client), rng)
+        senders = workload.requests()
+        routes = [route for route in mix if mix[route] > 0]
+        weights = [mix[route] for route in routes]
+
+        started = time.perf_counter()
+        recorder = Recorder(measure_from=started + warmup)
+        deadline = started + warmup + duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                route = rng.choices(routes, weights)[0]
+                sent = time.perf_counter()
+                try:
+                    status = str((await senders[route]()).status_code)
+                except httpx.HTTPError:
+                    status = "error"
+                recorder.record(route, sent, time.perf_counter() - sent, status)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder.summary(duration)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: Optional[subprocess.Popen], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before it was ready")
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} was not ready after {timeout:.0f}s")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, value.split(",")):
+        route, _, weight = part.partition("=")
+        matches = [name for name in mix if name.split(" ", 1)[1] == route.strip()]
+        if not matches:
+            raise argparse.ArgumentTypeError(f"Unknown route in --mix: {route!r}")
+        mix[matches[0]] = int(weight)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000", help="Comma-separated booking counts, e.g. 10000,100000,1000000")
+    parser.add_argument("--backend", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per size")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before each measurement")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight requests")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="Route weights, e.g. /demos=50,/book-demo=0")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Mock LLM seconds per completion")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target", help="Benchmark this running server instead of starting and seeding one")
+    parser.add_argument("--startup-timeout", type=float, default=1800, help="Seconds to wait for seeding and startup")
+    parser.add_argument("--output", help="Write the JSON here as well as to stdout")
+    args = parser.parse_args()
+
+    settings = {
+        key: getattr(args, key)
+        for key in ("backend", "duration", "warmup", "concurrency", "mix", "llm_latency", "seed", "target")
+    }
+    report: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "settings": settings,
+        "runs": [],
+    }
+
+    if args.target:
+        results = asyncio.run(run_load(args.target, args.duration, args.warmup, args.concurrency, args.mix, args.seed))
+        report["runs"].append({"bookings": None, **results})
+    else:
+        llm_port = _free_port()
+        mock_llm = subprocess.Popen(
+            [sys.executable, "-m", "Backend.benchmarks.mock_llm", "--port", str(llm_port), "--latency", str(args.llm_latency)],
+            stdout=sys.stderr,  # keep stdout for the JSON report
+        )
+        try:
+            _wait_until_up(f"http://127.0.0.1:{llm_port}/docs", mock_llm, timeout=30)
+            env = dict(
+                os.environ,
+                STORAGE_BACKEND=args.backend,
+                OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "benchmark",
+                OPENAI_BASE_URL=f"http://127.0.0.1:{llm_port}/v1",
+                BRIEF_PREGEN_ENABLED="false",
+                DEBUG="false",
+            )
+            for size in (int(s) for s in args.sizes.split(",")):
+                port = _free_port()
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "Backend.benchmarks.serve", "--bookings", str(size), "--reset", "--port", str(port), "--seed", str(args.seed)],
+                    env=env,
+                    stdout=sys.stderr,
+                )
+                try:
+                    seeding = time.perf_counter()
+                    _wait_until_up(f"http://127.0.0.1:{port}/", server, timeout=args.startup_timeout)
+                    startup_seconds = round(time.perf_counter() - seeding, 2)
+                    results = asyncio.run(
+                        run_load(f"http://127.0.0.1:{port}", args.duration, args.warmup, args.concurrency, args.mix, args.seed)
+                    )
+                finally:
+                    _stop(server)
+                report["runs"].append({"bookings": size, "startup_seconds": startup_seconds, **results})
+                print(f"✅ {size} bookings: {results['total']['throughput_rps']} req/s", file=sys.stderr)
+        finally:
+            _stop(mock_llm)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+OpenAI-compatible mock chat completions server for benchmarks
+
+Answers POST /v1/chat/completions with a fixed, well-formed prep brief after a
+configurable delay, streamed or not, so brief generation can be load tested
+without network calls or API spend. Point the backend at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any OPENAI_API_KEY.
+
+Usage (from the repository root):
+    python -m Backend.benchmarks.mock_llm [--port 8090] [--latency 0.8] [--jitter 0.2]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+BRIEF = {
+    "company_insights": "Multi-location operator growing steadily; margins are under pressure from delivery fees and stock waste.",
+    "pain_points_summary": "Manual stock counts across sites, slow checkout at peak, no single view of sales.",
+    "relevant_product_features": [
+        "Centralised inventory with automated reorder alerts",
+        "Fast tap-to-pay checkout with offline mode",
+        "Consolidated multi-location reporting",
+    ],
+    "pitch_suggestions": [
+        "Open with the cost of stock waste across locations",
+        "Demo the lunch-rush checkout flow",
+        "Close on a single-site pilot",
+    ],
+}
+CONTENT = json.dumps(BRIEF, indent=2)
+COMPLETION_TOKENS = len(CONTENT) // 4  # rough, ~4 characters per token
+CHUNK_CHARS = 16
+
+
+def create_app(latency: float, jitter: float) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+
+    def delay() -> float:
+        return max(0.0, latency + random.uniform(-jitter, jitter))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(completion_id, created, model, delay()),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(delay())
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": CONTENT}, "finish_reason": "stop"}
+            ],
+            "usage": {
+                "prompt_tokens": sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4,
+                "completion_tokens": COMPLETION_TOKENS,
+                "total_tokens": COMPLETION_TOKENS,
+            },
+        }
+
+    return app
+
+
+async def _stream(completion_id: str, created: int, model: str, total_delay: float) -> AsyncIterator[str]:
+    # Spread the delay evenly over the chunks, like tokens arriving
+    pieces = [CONTENT[i:i + CHUNK_CHARS] for i in range(0, len(CONTENT), CHUNK_CHARS)]
+    pause = total_delay / len(pieces)
+    for piece in pieces:
+        await asyncio.sleep(pause)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    done = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.8, help="Seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Uniform +/- seconds added to latency")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.jitter), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
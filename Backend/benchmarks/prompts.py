@@ -0,0 +1,145 @@
+"""
+Input tokens (and optionally latency) per brief prompt template version
+
+Renders every registered "brief" template for the same generated bookings,
+under the configured BRIEF_PROMPT_TOKEN_BUDGET, and reports token counts
+against the first version. With --live it also sends the prompts through
+the LLM gateway and reports latency and the provider's token usage; that
+needs OPENAI_API_KEY (and OPENAI_BASE_URL for anything but OpenAI).
+
+Usage (from the repository root):
+    python -m Backend.benchmarks.prompts [--bookings 1000] [--long-share 0.1] [--live 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import time as clock
+from typing import Dict, List
+
+from ..config import config
+from ..llm_gateway import llm_gateway
+from ..models import MerchantBooking
+from ..prompts import PROMPTS, PromptTemplate, brief_fields, get_tokenizer, render_within_budget
+from .datagen import generate_bookings
+
+# Long free text, repeated to stress the token budget
+RAMBLING_NOTES = (
+    "Owner mentioned they tried two other systems last year and churned because of support response times; "
+    "they want to see the reporting screens, staff permissions and how refunds work across locations. "
+)
+
+
+def sample_bookings(n: int, long_share: float, seed: int) -> List[MerchantBooking]:
+    rng = random.Random(seed)
+    shifts = [(uuid.uuid4(), clock(9), clock(17))]
+    bookings = []
+    for row in generate_bookings(n, shifts, seed):
+        booking = MerchantBooking(**{k: v for k, v in row.items() if k in MerchantBooking.model_fields})
+        if rng.random() < long_share:
+            booking.special_notes = RAMBLING_NOTES * rng.randint(3, 12)
+            booking.current_pain_points = (booking.current_pain_points + ". ") * rng.randint(2, 8)
+        bookings.append(booking)
+    return bookings
+
+
+def _percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def measure_tokens(template: PromptTemplate, bookings: List[MerchantBooking]) -> Dict[str, float]:
+    tokenizer = get_tokenizer(config.OPENAI_MODEL)
+    budget = config.BRIEF_PROMPT_TOKEN_BUDGET
+    counts, truncated = [], 0
+    started = time.perf_counter()
+    for booking in bookings:
+        fields = brief_fields(booking)
+        messages = render_within_budget(template, fields, tokenizer, budget)
+        counts.append(tokenizer.count_messages(messages))
+        truncated += messages != template.render(fields)
+    elapsed = time.perf_counter() - started
+    return {
+        "mean": statistics.mean(counts),
+        "p50": _percentile(counts, 50),
+        "p95": _percentile(counts, 95),
+        "max": max(counts),
+        "truncated": truncated,
+        "render_us": elapsed / len(bookings) * 1e6,
+    }
+
+
+async def measure_live(template: PromptTemplate, bookings: List[MerchantBooking], calls: int) -> Dict[str, float]:
+    latencies, prompt_tokens, completion_tokens = [], [], []
+    tokenizer = get_tokenizer(config.OPENAI_MODEL)
+    for booking in bookings[:calls]:
+        messages = render_within_budget(template, brief_fields(booking), tokenizer, config.BRIEF_PROMPT_TOKEN_BUDGET)
+        started = time.perf_counter()
+        response = await llm_gateway.chat_completion(
+            model=config.OPENAI_MODEL,
+            messages=messages,
+            temperature=config.OPENAI_TEMPERATURE,
+            max_tokens=config.OPENAI_MAX_TOKENS,
+        )
+        latencies.append(time.perf_counter() - started)
+        if response.usage is not None:
+            prompt_tokens.append(response.usage.prompt_tokens)
+            completion_tokens.append(response.usage.completion_tokens)
+    return {
+        "latency_p50": _percentile(latencies, 50),
+        "latency_mean": statistics.mean(latencies),
+        "prompt_tokens": statistics.mean(prompt_tokens) if prompt_tokens else float("nan"),
+        "completion_tokens": statistics.mean(completion_tokens) if completion_tokens else float("nan"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--long-share", type=float, default=0.1, help="Fraction of bookings given long notes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--live", type=int, default=0, help="Completions to request per template version")
+    args = parser.parse_args()
+
+    bookings = sample_bookings(args.bookings, args.long_share, args.seed)
+    templates = [PROMPTS["brief"][v] for v in sorted(PROMPTS["brief"], key=int)]
+    tokenizer = get_tokenizer(config.OPENAI_MODEL).load()
+    print(f"bookings: {args.bookings}  model: {config.OPENAI_MODEL}  budget: {config.BRIEF_PROMPT_TOKEN_BUDGET}")
+    print(f"tokenizer: {'tiktoken ' + tokenizer.encoding.name if tokenizer.exact else 'estimate (tiktoken unavailable)'}")
+
+    baseline = None
+    for template in templates:
+        stats = measure_tokens(template, bookings)
+        baseline = baseline or stats
+        delta = (stats["mean"] - baseline["mean"]) / baseline["mean"] * 100
+        print(
+            f"{template.key:10} input tokens mean {stats['mean']:7.1f}  p50 {stats['p50']:5.0f}  p95 {stats['p95']:5.0f}  "
+            f"max {stats['max']:5.0f}  ({delta:+.1f}% vs {templates[0].key})  "
+            f"truncated {stats['truncated']:d}  render {stats['render_us']:.0f} µs"
+        )
+
+    if args.live:
+        async def run() -> None:
+            try:
+                live_baseline = None
+                for template in templates:
+                    stats = await measure_live(template, bookings, args.live)
+                    live_baseline = live_baseline or stats
+                    delta = (stats["latency_mean"] - live_baseline["latency_mean"]) / live_baseline["latency_mean"] * 100
+                    print(
+                        f"{template.key:10} live latency p50 {stats['latency_p50'] * 1000:7.0f} ms  "
+                        f"mean {stats['latency_mean'] * 1000:7.0f} ms ({delta:+.1f}%)  "
+                        f"usage prompt {stats['prompt_tokens']:.0f}  completion {stats['completion_tokens']:.0f}"
+                    )
+            finally:
+                await llm_gateway.aclose()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
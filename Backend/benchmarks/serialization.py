@@ -0,0 +1,125 @@
+"""
+Per-row serialization cost of the /demos response, before and after the trusted fast path
+
+Usage (from the repository root):
+    python -m Backend.benchmarks.serialization [--rows 10000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Any, Callable, List
+
+import orjson
+from pydantic import TypeAdapter
+
+from ..models import DemoCard
+from ..serialization import DEMO_CARD_COLUMNS, demo_card
+
+Row = namedtuple("Row", [column.key for column in DEMO_CARD_COLUMNS] + ["ae_name"])
+
+PRODUCTS = ["POS", "Online Ordering", "Payments", "Loyalty", "Delivery", "Inventory"]
+
+
+def make_rows(n: int) -> List[Row]:
+    start = datetime(2025, 1, 1, 9, 0)
+    return [
+        Row(
+            id=uuid.uuid4(),
+            merchant_name=f"Merchant {i}",
+            restaurant_category=random.choice(["Cafe", "QSR", "Fine Dining", "Bakery"]),
+            scheduled_time=start + timedelta(minutes=30 * i),
+            preferred_time=start + timedelta(minutes=30 * i),
+            status=random.choice(["upcoming", "prep-needed", "completed"]),
+            prep_brief_status=random.choice(["Pending", "Generated"]),
+            meeting_link="https://meet.google.com/abc-defg-hij",
+            address=f"{i} Main Street, Springfield",
+            contact_number="+1-555-0100",
+            email=f"owner{i}@merchant{i}.com",
+            website_links=f"https://merchant{i}.com",
+            social_media=f"@merchant{i}",
+            products_interested=random.sample(PRODUCTS, 2),
+            number_of_outlets="2-5 Locations",
+            current_pain_points="Long queues at lunch and no online presence",
+            special_notes=None,
+            ae_name="Priya Patel",
+        )
+        for i in range(n)
+    ]
+
+
+def before(rows: List[Row], adapter: TypeAdapter) -> bytes:
+    """The previous path: json.loads + DemoCard per row, then response_model validation and dump.
+
+    Expects rows with products_interested still JSON-encoded, as in the old Text column.
+    """
+    cards = []
+    for b in rows:
+        status = b.status or ("prep-needed" if b.prep_brief_status != "Generated" else "upcoming")
+        try:
+            products_list = json.loads(b.products_interested) if b.products_interested else []
+        except:
+            products_list = []
+        cards.append(
+            DemoCard(
+                id=str(b.id),
+                merchantName=b.merchant_name,
+                category=b.restaurant_category,
+                scheduledDateTime=(b.scheduled_time or b.preferred_time).isoformat(),
+                aeName=b.ae_name or "",
+                status=status,
+                meetingLink=b.meeting_link,
+                address=b.address,
+                contactNumber=b.contact_number,
+                email=b.email,
+                website=b.website_links,
+                socialMedia=b.social_media,
+                productsInterested=", ".join(products_list),
+                outlets=b.number_of_outlets,
+                painPoints=b.current_pain_points,
+                specialNotes=b.special_notes,
+            )
+        )
+    # What FastAPI does with response_model=List[DemoCard]
+    return adapter.dump_json(adapter.validate_python(cards, from_attributes=True))
+
+
+def after(rows: List[Row]) -> bytes:
+    return orjson.dumps([demo_card(row, row.ae_name) for row in rows])
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    legacy_rows = [row._replace(products_interested=json.dumps(row.products_interested)) for row in rows]
+    adapter = TypeAdapter(List[DemoCard])
+    assert json.loads(before(legacy_rows, adapter)) == orjson.loads(after(rows)), "paths disagree"
+
+    slow = best_of(lambda: before(legacy_rows, adapter), args.repeat)
+    fast = best_of(lambda: after(rows), args.repeat)
+    print(f"rows: {args.rows}")
+    print(f"before: {slow * 1000:8.1f} ms total  {slow / args.rows * 1e6:6.2f} µs/row")
+    print(f"after:  {fast * 1000:8.1f} ms total  {fast / args.rows * 1e6:6.2f} µs/row")
+    print(f"speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Seed a storage backend with generated bookings, then serve the API
+
+Started by the load benchmark as the server under test. STORAGE_BACKEND,
+OPENAI_BASE_URL and the rest of the settings come from the environment as
+usual; with the memory backend the data is generated inside this process.
+
+Usage (from the repository root):
+    STORAGE_BACKEND=memory python -m Backend.benchmarks.serve --bookings 100000 --port 8011
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import uvicorn
+
+from ..config import config
+from ..db import memory_db
+from ..main import app
+from .datagen import seed_memory, seed_postgres
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=10_000)
+    parser.add_argument("--aes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="Postgres only: delete existing data first")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if config.STORAGE_BACKEND == "memory":
+        seed_memory(memory_db, args.bookings, args.aes, args.seed)
+    else:
+        seed_postgres(args.bookings, args.aes, args.reset, args.seed)
+    print(f"✅ Seeded {args.bookings} bookings ({config.STORAGE_BACKEND}) in {time.perf_counter() - started:.1f}s")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
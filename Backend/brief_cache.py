@@ -0,0 +1,178 @@
+"""
+Content-addressed cache for generated prep briefs
+
+Entries are keyed by a hash of everything that determines the LLM output:
+the normalized merchant context, model, sampling settings and prompt
+version. Lookups check a per-process LRU tier first, then Postgres.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from .config import config
+from .database import AsyncSessionLocal, BriefCacheModel
+from .models import MerchantBooking
+
+CachedBrief = Dict[str, str]
+
+
+def _normalize(value: Optional[str]) -> str:
+    # Collapse whitespace so cosmetic edits don't miss the cache
+    return " ".join((value or "").split())
+
+
+def brief_cache_key(
+    booking: MerchantBooking,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    prompt_version: str,
+) -> str:
+    """SHA-256 over every booking field that reaches the prompt plus generation settings."""
+    payload = {
+        "context": {
+            "merchant_name": _normalize(booking.merchant_name),
+            "category": _normalize(booking.restaurant_category),
+            "outlets": _normalize(booking.number_of_outlets),
+            "products": sorted(_normalize(p) for p in booking.products_interested),
+            "pain_points": _normalize(booking.current_pain_points),
+            "special_notes": _normalize(booking.special_notes),
+            "contact_number": _normalize(booking.contact_number),
+            "email": _normalize(booking.email).lower(),
+            "address": _normalize(booking.address),
+            "website": _normalize(booking.website_links),
+            "social_media": _normalize(booking.social_media),
+        },
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "prompt_version": prompt_version,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LRUCache:
+    """Size-bounded LRU with per-entry TTL. Not thread-safe; used from the event loop."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, CachedBrief]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedBrief]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: CachedBrief) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+
+class BriefCache:
+    """Two-tier brief cache. Storage errors are logged and treated as misses.
+
+    Invalidation clears the Postgres tier and this process's LRU tier; other
+    workers drop their copy when its TTL (BRIEF_CACHE_TTL) expires. With
+    persistent=False (in-memory storage) only the LRU tier is used.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, db_ttl: float, persistent: bool = True) -> None:
+        self.memory = LRUCache(maxsize, ttl)
+        self.db_ttl = db_ttl
+        self.persistent = persistent
+
+    async def get(self, key: str) -> Optional[CachedBrief]:
+        cached = self.memory.get(key)
+        if cached is not None or not self.persistent:
+            return cached
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                row = (
+                    await db.execute(
+                        select(BriefCacheModel.payload).where(
+                            BriefCacheModel.key == key,
+                            BriefCacheModel.created_at >= datetime.utcnow() - timedelta(seconds=self.db_ttl),
+                        )
+                    )
+                ).scalar_one_or_none()
+        except Exception as e:
+            print(f"❌ Brief cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+
+        cached = json.loads(row)
+        self.memory.set(key, cached)
+        return cached
+
+    async def put(self, key: str, value: CachedBrief, model: str, prompt_version: str) -> None:
+        self.memory.set(key, value)
+        if not self.persistent:
+            return
+        payload = json.dumps(value)
+        stmt = insert(BriefCacheModel).values(
+            key=key, model=model, prompt_version=prompt_version, payload=payload, created_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BriefCacheModel.key],
+            set_={"payload": stmt.excluded.payload, "created_at": stmt.excluded.created_at},
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            print(f"❌ Brief cache write failed: {e}")
+
+    async def invalidate(self, key: str) -> bool:
+        removed = self.memory.delete(key)
+        if not self.persistent:
+            return removed
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(BriefCacheModel).where(BriefCacheModel.key == key))
+            await db.commit()
+        return removed or result.rowcount > 0
+
+    async def clear(self) -> int:
+        cleared = self.memory.clear()
+        if not self.persistent:
+            return cleared
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(BriefCacheModel))
+            await db.commit()
+        return result.rowcount
+
+
+brief_cache = BriefCache(
+    config.BRIEF_CACHE_SIZE,
+    config.BRIEF_CACHE_TTL,
+    config.BRIEF_CACHE_DB_TTL,
+    persistent=config.STORAGE_BACKEND != "memory",
+)
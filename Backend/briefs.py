@@ -0,0 +1,201 @@
+"""
+Prep brief generation shared by the API routes and background workers
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import ACTIVE_JOB_PREDICATE, AEModel, BriefJobModel, MerchantBookingModel, PrepBriefModel
+from .changes import notify_change
+from .config import config
+from .etag import bump_data_version
+from .models import AE, MerchantBooking, PrepBrief
+from .utils import DRAFT_STATUS, draft_model, generate_ai_brief
+
+# Brief job kinds: first-pass generation, and regenerating a draft brief with the final model
+GENERATE_JOB = "generate"
+UPGRADE_JOB = "upgrade"
+
+
+class BriefGenerationError(Exception):
+    """Raised when a booking is not in a state that allows brief generation."""
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def load_brief_context(db: AsyncSession, merchant_id: UUID) -> Tuple[MerchantBooking, AE]:
+    """Load a booking and its assigned AE as the Pydantic models the AI layer expects."""
+    booking = await db.get(MerchantBookingModel, merchant_id)
+    if not booking:
+        raise BriefGenerationError("Merchant booking not found", status_code=404)
+    if not booking.assigned_ae_id:
+        raise BriefGenerationError("No AE assigned to booking")
+    
+    ae = await db.get(AEModel, booking.assigned_ae_id)
+    if not ae:
+        raise BriefGenerationError("Assigned AE not found")
+    return brief_context_models(booking, ae)
+
+
+def brief_context_models(booking: Any, ae: Any) -> Tuple[MerchantBooking, AE]:
+    """Pydantic booking and AE from ORM models or in-memory records (same attribute names)."""
+    booking_pydantic = MerchantBooking(
+        id=booking.id,
+        merchant_name=booking.merchant_name,
+        address=booking.address,
+        contact_number=booking.contact_number,
+        email=booking.email,
+        products_interested=booking.products_interested or [],
+        preferred_time=booking.preferred_time,
+        website_links=booking.website_links,
+        social_media=booking.social_media,
+        restaurant_category=booking.restaurant_category,
+        number_of_outlets=booking.number_of_outlets,
+        current_pain_points=booking.current_pain_points,
+        special_notes=booking.special_notes,
+        assigned_ae=booking.assigned_ae_id,
+        scheduled_time=booking.scheduled_time,
+        meeting_link=booking.meeting_link,
+        prep_brief_status=booking.prep_brief_status,
+    )
+    
+    ae_pydantic = AE(
+        id=ae.id,
+        name=ae.name,
+        email=ae.email,
+        working_start=ae.working_start,
+        working_end=ae.working_end,
+        timezone=ae.timezone,
+        booked_slots=[]  # Not used in AI generation
+    )
+    return booking_pydantic, ae_pydantic
+
+
+async def load_prep_brief(db: AsyncSession, merchant_id: UUID) -> Optional[PrepBrief]:
+    """The booking's stored brief, if any (there is at most one per booking)."""
+    brief = (
+        await db.execute(select(PrepBriefModel).where(PrepBriefModel.merchant_id == merchant_id))
+    ).scalar_one_or_none()
+    if not brief:
+        return None
+    return prep_brief_model(brief)
+
+
+def prep_brief_model(brief: Any) -> PrepBrief:
+    return PrepBrief(
+        id=brief.id,
+        merchant_id=brief.merchant_id,
+        ae_id=brief.ae_id,
+        insights=brief.company_insights or brief.insights,  # Use enhanced field if available
+        pain_points_summary=brief.pain_points_summary,
+        relevant_features=brief.relevant_product_features or brief.relevant_features,  # Use enhanced field if available
+        pitch_suggestions=brief.pitch_suggestions,
+        status=brief.status,
+        model=brief.model,
+    )
+
+
+async def save_prep_brief(db: AsyncSession, brief: PrepBrief, job_id: Optional[UUID] = None) -> None:
+    """Upsert a booking's brief, flag the booking and finish its job, in one transaction.
+
+    Regenerating replaces the existing brief in place, keeping its id, so
+    brief.id is updated to the stored row's id. Saving a draft also queues
+    its upgrade job, so a draft is never left without one.
+    """
+    sections = dict(
+        ae_id=brief.ae_id,
+        insights=brief.insights,
+        pain_points_summary=brief.pain_points_summary,
+        relevant_features=brief.relevant_features,
+        pitch_suggestions=brief.pitch_suggestions,
+        # Clear legacy enhanced fields so get_prep_brief doesn't prefer stale text
+        company_insights=None,
+        relevant_product_features=None,
+        status=brief.status,
+        model=brief.model,
+        created_at=datetime.utcnow(),
+    )
+    stmt = insert(PrepBriefModel).values(id=brief.id, merchant_id=brief.merchant_id, **sections)
+    stmt = stmt.on_conflict_do_update(index_elements=[PrepBriefModel.merchant_id], set_=sections)
+    brief.id = (await db.execute(stmt.returning(PrepBriefModel.id))).scalar_one()
+
+    await db.execute(
+        update(MerchantBookingModel)
+        .where(MerchantBookingModel.id == brief.merchant_id)
+        .values(prep_brief_status="Generated")
+    )
+    if job_id:
+        await db.execute(
+            update(BriefJobModel)
+            .where(BriefJobModel.id == job_id)
+            .values(status="done", brief_id=brief.id, error=None, finished_at=datetime.utcnow())
+        )
+    upgrade_id = None
+    if brief.status == DRAFT_STATUS:
+        # After finishing job_id, so the booking's active job slot is free
+        upgrade_id = (
+            await db.execute(
+                insert(BriefJobModel)
+                .values(id=uuid4(), merchant_id=brief.merchant_id, kind=UPGRADE_JOB, status="queued", created_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=[BriefJobModel.merchant_id], index_where=text(ACTIVE_JOB_PREDICATE))
+                .returning(BriefJobModel.id)
+            )
+        ).scalar_one_or_none()
+    await bump_data_version(db)
+    await notify_change(db, {"type": "brief_generated", "id": str(brief.merchant_id), "status": brief.status})
+    await db.commit()
+    if upgrade_id is not None:
+        from .jobs import brief_workers  # jobs imports this module
+
+        brief_workers.notify()
+
+
+def brief_retry_delay(kind: str, attempts: int) -> Optional[float]:
+    """Seconds before a failed job runs again, or None if it has failed for good.
+
+    Only upgrades are retried: the booking keeps its draft meanwhile, and with
+    no retry a transient provider outage would leave the draft in place forever.
+    """
+    if kind != UPGRADE_JOB or attempts >= config.BRIEF_JOB_MAX_ATTEMPTS:
+        return None
+    return config.BRIEF_UPGRADE_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+async def generate_brief_for_job(booking: MerchantBooking, ae: AE, kind: str = GENERATE_JOB) -> PrepBrief:
+    """Generate the brief a job of this kind should save.
+
+    With a draft model configured, first-pass jobs produce a Draft brief from
+    it and upgrade jobs regenerate with OPENAI_MODEL; otherwise every brief
+    comes from OPENAI_MODEL. An upgrade that would save a mock brief raises
+    instead, so the job fails and the draft stays in place.
+    """
+    model = draft_model()
+    if kind == UPGRADE_JOB or model is None:
+        brief = await generate_ai_brief(booking, ae)
+        if kind == UPGRADE_JOB and brief.model is None:
+            raise BriefGenerationError("Final model unavailable; keeping the draft brief", status_code=503)
+        return brief
+    brief = await generate_ai_brief(booking, ae, model)
+    brief.status = DRAFT_STATUS
+    return brief
+
+
+async def generate_and_save_brief(
+    db: AsyncSession, merchant_id: UUID, job_id: Optional[UUID] = None, kind: str = GENERATE_JOB
+) -> PrepBrief:
+    """Generate a prep brief for a booking and store it."""
+    booking, ae = await load_brief_context(db, merchant_id)
+    # Don't hold a pooled connection open for the duration of the LLM call
+    await db.commit()
+
+    brief = await generate_brief_for_job(booking, ae, kind)
+    await save_prep_brief(db, brief, job_id)
+    return brief
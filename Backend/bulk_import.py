@@ -0,0 +1,191 @@
+"""
+Streaming bulk import of demo bookings from CSV or NDJSON uploads
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple, Union
+
+from pydantic import ValidationError
+from .assignment import ASSIGNMENT_ATTEMPTS, assignment_engine, naive_utc
+from .config import config
+from .models import BookDemoRequest, BulkImportResponse, ImportRowError
+from .repository import BookingRepository, SlotConflictError
+from .utils import create_meeting_link
+
+# Content types accepted by the import endpoint
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+RawRecord = Union[Dict[str, Any], Exception]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 and yield complete lines (without line endings)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def _iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        yield record if isinstance(record, dict) else ValueError("Each line must be a JSON object")
+
+
+async def _iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    header: List[str] = []
+    record = ""
+    async for line in lines:
+        # A quoted field may span lines; wait until the quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        row, record = next(csv.reader([record])) if record.strip() else [], ""
+        if not row:
+            continue
+        if not header:
+            header = [name.strip() for name in row]
+            continue
+        if len(row) > len(header):
+            yield ValueError(f"Expected {len(header)} columns, got {len(row)}")
+            continue
+        # Empty cells count as missing so field defaults apply
+        values: Dict[str, Any] = {name: value for name, value in zip(header, row) if value != ""}
+        products = values.get("products_interested", values.get("productsInterested"))
+        if isinstance(products, str):
+            # JSON array, or semicolon-separated list
+            try:
+                parsed = json.loads(products) if products.lstrip().startswith("[") else products.split(";")
+            except json.JSONDecodeError as e:
+                yield ValueError(f"products_interested: invalid JSON array: {e.msg}")
+                continue
+            values["products_interested"] = [str(p).strip() for p in parsed if str(p).strip()]
+            values.pop("productsInterested", None)
+        yield values
+    if record:
+        yield ValueError("Unterminated quoted field at end of file")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def _flush(repo: BookingRepository, rows: List[Tuple[int, BookDemoRequest]], report: BulkImportResponse) -> None:
+    """Assign AEs for a chunk and insert it in one transaction.
+
+    If another process booked one of the chosen AEs first, the chunk is
+    assigned again from fresh schedules, up to ASSIGNMENT_ATTEMPTS times.
+    """
+    if not rows:
+        return
+    # Stored in naive UTC columns; reserve and store the same value
+    starts = [naive_utc(payload.preferredDateTime) for _, payload in rows]
+    for attempt in range(ASSIGNMENT_ATTEMPTS):
+        aes = await assignment_engine.assign_many(repo, starts)
+        values = []
+        reserved = []
+        for (row_number, payload), start, ae in zip(rows, starts, aes):
+            if ae is None:
+                continue
+            reserved.append((ae.ae_id, start))
+            values.append(
+                dict(
+                    merchant_name=payload.merchantName,
+                    address=payload.address,
+                    contact_number=payload.contactNumber,
+                    email=payload.email,
+                    products_interested=payload.productsInterested,
+                    preferred_time=start,
+                    website_links=payload.website,
+                    social_media=payload.socialMedia,
+                    restaurant_category=payload.category,
+                    number_of_outlets=payload.outlets,
+                    current_pain_points=payload.painPoints or "",
+                    special_notes=payload.specialNotes,
+                    assigned_ae_id=ae.ae_id,
+                    scheduled_time=start,
+                    meeting_link=create_meeting_link(),
+                    prep_brief_status="Pending",
+                    status="upcoming",
+                )
+            )
+        
+        error = None
+        try:
+            if values:
+                await repo.insert_bookings(values)
+        except SlotConflictError:
+            for ae_id, start in reserved:
+                assignment_engine.release(ae_id, start)
+            assignment_engine.invalidate()
+            if attempt + 1 < ASSIGNMENT_ATTEMPTS:
+                continue
+            error = "An assigned AE was booked by another request; retry these rows"
+        except Exception as e:
+            for ae_id, start in reserved:
+                assignment_engine.release(ae_id, start)
+            print(f"❌ Bulk import chunk failed: {e}")
+            error = "Database insert failed for this chunk"
+        except BaseException:
+            for ae_id, start in reserved:
+                assignment_engine.release(ae_id, start)
+            raise
+        else:
+            for ae_id, start in reserved:
+                assignment_engine.confirm(ae_id, start)
+            report.imported += len(values)
+        
+        for (row_number, _), ae in zip(rows, aes):
+            if ae is None:
+                report.errors.append(ImportRowError(row=row_number, error="No AE is available at the requested time."))
+            elif error:
+                report.errors.append(ImportRowError(row=row_number, error=error))
+        return
+
+
+async def import_bookings(repo: BookingRepository, chunks: AsyncIterator[bytes], fmt: str) -> BulkImportResponse:
+    """Validate, assign and insert bookings from a streamed upload, IMPORT_CHUNK_SIZE rows per transaction."""
+    report = BulkImportResponse()
+    records = _iter_csv(_iter_lines(chunks)) if fmt == "csv" else _iter_ndjson(_iter_lines(chunks))
+    pending: List[Tuple[int, BookDemoRequest]] = []
+    row_number = 0
+    
+    async for record in records:
+        row_number += 1
+        if isinstance(record, Exception):
+            report.errors.append(ImportRowError(row=row_number, error=str(record)))
+            continue
+        try:
+            pending.append((row_number, BookDemoRequest.model_validate(record)))
+        except ValidationError as e:
+            report.errors.append(ImportRowError(row=row_number, error=_validation_message(e)))
+            continue
+        if len(pending) >= config.IMPORT_CHUNK_SIZE:
+            await _flush(repo, pending, report)
+            pending = []
+    await _flush(repo, pending, report)
+
+    report.failed = len(report.errors)
+    report.errors.sort(key=lambda e: e.row)
+    return report
@@ -0,0 +1,130 @@
+"""
+Booking change feed: Postgres LISTEN/NOTIFY fanned out to connected dashboards
+
+Writers call notify_change() inside their transaction, so Postgres delivers
+the event on commit and drops it on rollback. Each worker process holds one
+dedicated LISTEN connection and copies every notification into the queues of
+its own subscribers, so a change costs one notification per process no matter
+how many dashboards are open.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import config
+
+CHANGES_CHANNEL = "booking_changes"
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7900
+
+# Tells a client it may have missed events and should refetch
+RESYNC_EVENT: Dict[str, Any] = {"type": "resync"}
+
+
+async def notify_change(db: AsyncSession, event: Dict[str, Any]) -> None:
+    """Queue a change event; it is published when the current transaction commits."""
+    payload = json.dumps(event, default=str)
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        payload = json.dumps(RESYNC_EVENT)
+    await db.execute(select(func.pg_notify(CHANGES_CHANNEL, payload)))
+
+
+class ChangeFeed:
+    """One LISTEN connection per process, fanned out to in-memory subscriber queues.
+
+    A subscriber that falls behind by CHANGE_FEED_QUEUE_SIZE events has its
+    backlog replaced by a single resync event rather than slowing everyone
+    else down. Subscribers also get a resync after the listener reconnects,
+    since anything committed while it was down was not delivered.
+    """
+
+    def __init__(self, queue_size: int, reconnect_delay: float, health_interval: float) -> None:
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.health_interval = health_interval
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def dsn(self) -> str:
+        # asyncpg takes a plain postgresql:// DSN, not the SQLAlchemy dialect URL
+        url = make_url(config.ASYNC_DATABASE_URL).set(drivername="postgresql")
+        return url.render_as_string(hide_password=False)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            event = RESYNC_EVENT
+        self.publish(event)
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                await conn.add_listener(CHANGES_CHANNEL, self._on_notification)
+                print("✅ Listening for booking changes")
+                if reconnecting:
+                    self.publish(RESYNC_EVENT)
+                # Notifications arrive via the callback; just make sure the connection is alive
+                while True:
+                    await asyncio.sleep(self.health_interval)
+                    await conn.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Change feed listener lost: {e}")
+            finally:
+                if conn is not None:
+                    conn.terminate()
+            reconnecting = True
+            await asyncio.sleep(self.reconnect_delay)
+
+
+change_feed = ChangeFeed(
+    queue_size=config.CHANGE_FEED_QUEUE_SIZE,
+    reconnect_delay=config.CHANGE_FEED_RECONNECT,
+    health_interval=config.CHANGE_FEED_HEARTBEAT,
+)
@@ -1,27 +1,46 @@
 """
 Database configuration and models for DemoGenie
 """
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, ForeignKey, Time
+from sqlalchemy import create_engine, func, text, BigInteger, Column, String, DateTime, Integer, Text, ForeignKey, Time, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import os
 import uuid
+from time import sleep
 from datetime import datetime, time
 
+from alembic import command
+from alembic.config import Config as AlembicConfig
+
 from .config import config
+from .metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolCollector, instrument_engine, registry
+
+POOL_OPTIONS = dict(
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
+    pool_recycle=config.DB_POOL_RECYCLE,
+)
 
-# Create engine and session
-engine = create_engine(config.DATABASE_URL)
+# Sync engine: schema creation, seeding and maintenance scripts
+engine = create_engine(config.DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-# Database dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Async engine (asyncpg): used by all request handlers
+async_engine = create_async_engine(
+    config.ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **POOL_OPTIONS
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Statement counts and timings for /metrics
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+registry.register(PoolCollector({"async": lambda: async_engine.pool, "sync": lambda: engine.pool}))
+
+Base = declarative_base()
 
 # Database Models
 class AEModel(Base):
@@ -32,6 +51,7 @@ class AEModel(Base):
     email = Column(String, nullable=False)
     working_start = Column(Time, nullable=False)
     working_end = Column(Time, nullable=False)
+    timezone = Column(String, nullable=False, server_default="UTC")  # IANA name; working hours are local to it
     
     # Relationships
     bookings = relationship("MerchantBookingModel", back_populates="ae")
@@ -39,13 +59,42 @@ class AEModel(Base):
 
 class MerchantBookingModel(Base):
     __tablename__ = "merchant_bookings"
+    __table_args__ = (
+        # Keyset pagination for /demos orders by (scheduled_time, id)
+        Index("ix_merchant_bookings_scheduled_time_id", "scheduled_time", "id"),
+        # /calendar-events filters on status and a scheduled_time window
+        Index("ix_merchant_bookings_status_scheduled_time", "status", "scheduled_time"),
+        # Per-AE views (/aes/{id}/demos, /calendar-events?ae_id=) as index-only scans
+        Index(
+            "ix_merchant_bookings_ae_scheduled_time",
+            "assigned_ae_id",
+            "scheduled_time",
+            "id",
+            postgresql_include=[
+                "merchant_name",
+                "restaurant_category",
+                "status",
+                "prep_brief_status",
+                "meeting_link",
+            ],
+        ),
+        # /demos?sort=merchant_name keyset pagination
+        Index("ix_merchant_bookings_merchant_name_id", "merchant_name", "id"),
+        # /demos?product= containment (@>) lookups
+        Index(
+            "ix_merchant_bookings_products_interested",
+            "products_interested",
+            postgresql_using="gin",
+            postgresql_ops={"products_interested": "jsonb_path_ops"},
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     merchant_name = Column(String, nullable=False)
     address = Column(String, nullable=False)
     contact_number = Column(String, nullable=False)
     email = Column(String, nullable=False)
-    products_interested = Column(Text, nullable=False)  # JSON string
+    products_interested = Column(JSONB, nullable=False, default=list)  # list of product names
     preferred_time = Column(DateTime, nullable=False)
     website_links = Column(String)
     social_media = Column(String)
@@ -64,8 +113,24 @@ class MerchantBookingModel(Base):
     ae = relationship("AEModel", back_populates="bookings")
     brief = relationship("PrepBriefModel", back_populates="booking", uselist=False)
 
+# Full-text search document for /demos?q=. Queries must use this exact
+# expression (with constant literals, not bind parameters) to hit the index.
+BOOKING_SEARCH_DOCUMENT = func.to_tsvector(
+    text("'english'"),
+    func.coalesce(MerchantBookingModel.merchant_name, text("''"))
+    .op("||")(text("' '"))
+    .op("||")(func.coalesce(MerchantBookingModel.current_pain_points, text("''")))
+    .op("||")(text("' '"))
+    .op("||")(func.coalesce(MerchantBookingModel.special_notes, text("''"))),
+)
+Index("ix_merchant_bookings_search", BOOKING_SEARCH_DOCUMENT, postgresql_using="gin")
+
 class PrepBriefModel(Base):
     __tablename__ = "prep_briefs"
+    __table_args__ = (
+        # One brief per booking; save_prep_brief upserts on it
+        Index("uq_prep_briefs_merchant_id", "merchant_id", unique=True),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     merchant_id = Column(UUID(as_uuid=True), ForeignKey("merchant_bookings.id"), nullable=False)
@@ -77,16 +142,82 @@ class PrepBriefModel(Base):
     # New enhanced fields
     company_insights = Column(Text, nullable=True)
     relevant_product_features = Column(Text, nullable=True)  # JSON array as string
-    status = Column(String, default="Pending")
+    status = Column(String, default="Pending")  # Draft, Generated
+    model = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     booking = relationship("MerchantBookingModel", back_populates="brief")
     ae = relationship("AEModel", back_populates="briefs")
 
-# Create tables
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+# Jobs in these states hold their booking's slot in uq_brief_jobs_active_merchant_id.
+# Kept as literal SQL so ON CONFLICT can match the partial index predicate.
+ACTIVE_JOB_STATUSES = ("queued", "running")
+ACTIVE_JOB_PREDICATE = "status IN ('queued', 'running')"
+
+class BriefJobModel(Base):
+    __tablename__ = "brief_jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job (upgrades last): WHERE status = ... ORDER BY created_at
+        Index("ix_brief_jobs_status_created_at", "status", "created_at"),
+        # At most one active job per booking, so concurrent requests share it
+        Index(
+            "uq_brief_jobs_active_merchant_id",
+            "merchant_id",
+            unique=True,
+            postgresql_where=text(ACTIVE_JOB_PREDICATE),
+        ),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    merchant_id = Column(UUID(as_uuid=True), ForeignKey("merchant_bookings.id"), nullable=False)
+    kind = Column(String, nullable=False, default="generate", server_default="generate")  # generate, upgrade
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    brief_id = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    run_after = Column(DateTime)  # a queued retry is not claimed before this
+
+class BriefCacheModel(Base):
+    __tablename__ = "brief_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 hex of context + generation settings
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON of the brief sections
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class DataVersionModel(Base):
+    __tablename__ = "data_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)  # bumped by every booking/brief write
+
+# Held while upgrading so concurrently starting workers don't race each other
+MIGRATION_LOCK_KEY = 724_190_002
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+# Bring the schema up to the latest Alembic revision
+def run_migrations():
+    alembic_config = AlembicConfig(ALEMBIC_INI)
+    with engine.connect() as conn:
+        # Poll rather than block in pg_advisory_lock: a waiting session holds a
+        # snapshot, and CREATE INDEX CONCURRENTLY in the lock holder would wait on it
+        while not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}).scalar():
+            conn.commit()
+            sleep(1)
+        conn.commit()
+        try:
+            alembic_config.attributes["connection"] = conn
+            command.upgrade(alembic_config, "head")
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
 
 # Seed data function
 def seed_data():
@@ -129,7 +260,7 @@ def seed_data():
             address="123 Main St, Downtown",
             contact_number="+1 (555) 123-4567",
             email="owner@bellavista.com",
-            products_interested='["POS", "Inventory Management"]',
+            products_interested=["POS", "Inventory Management"],
             preferred_time=datetime(2024, 1, 15, 14, 0),
             website_links="https://bellavista.com",
             social_media="@bellavista_restaurant",
@@ -149,7 +280,7 @@ def seed_data():
             address="456 Oak Ave, Midtown",
             contact_number="+1 (555) 987-6543",
             email="manager@quickbites.com",
-            products_interested='["POS System", "Online Ordering"]',
+            products_interested=["POS System", "Online Ordering"],
             preferred_time=datetime(2024, 1, 16, 10, 30),
             restaurant_category="Fast Casual",
             number_of_outlets="1 Location",
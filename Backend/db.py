@@ -1,75 +1,549 @@
+"""
+In-memory storage backend (STORAGE_BACKEND=memory)
+
+Runs the whole API with no database, for local development, tests and
+benchmarks. Records are __slots__ classes with the same attribute names as the
+ORM models, so the serializers and brief helpers take either. Secondary
+indexes keep reads off full scans:
+
+- bookings by scheduled time and by merchant name: sorted (key, id) lists,
+  bisected for keyset pagination and time windows
+- bookings by AE: a sorted (scheduled_time, id) list per AE
+- booking ids by status
+- brief by merchant, and the active (queued or running) brief job by merchant
+
+Everything runs on the event loop, so there is no locking; data lasts as long
+as the process.
+"""
 from __future__ import annotations
 
-from datetime import datetime, time
-from typing import Dict, List, Optional
-from uuid import UUID
+import asyncio
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, time, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID, uuid4
 
+from .briefs import (
+    GENERATE_JOB,
+    UPGRADE_JOB,
+    BriefGenerationError,
+    brief_context_models,
+    brief_retry_delay,
+    generate_brief_for_job,
+    prep_brief_model,
+)
+from .changes import change_feed
 from .models import AE, MerchantBooking, PrepBrief
+from .repository import CALENDAR_STATUSES, BookingRepository, DemoFilters
+from .serialization import demo_card
+from .utils import DRAFT_STATUS
+
+
+class AERecord:
+    __slots__ = ("id", "name", "email", "working_start", "working_end", "timezone")
+
+    def __init__(
+        self, name: str, email: str, working_start: time, working_end: time, id: Optional[UUID] = None, timezone: str = "UTC"
+    ) -> None:
+        self.id = id or uuid4()
+        self.name = name
+        self.email = email
+        self.working_start = working_start
+        self.working_end = working_end
+        self.timezone = timezone
+
+
+class BookingRecord:
+    __slots__ = (
+        "id",
+        "merchant_name",
+        "address",
+        "contact_number",
+        "email",
+        "products_interested",
+        "preferred_time",
+        "website_links",
+        "social_media",
+        "restaurant_category",
+        "number_of_outlets",
+        "current_pain_points",
+        "special_notes",
+        "assigned_ae_id",
+        "scheduled_time",
+        "meeting_link",
+        "prep_brief_status",
+        "status",
+        "created_at",
+    )
+
+    # Column defaults from MerchantBookingModel
+    DEFAULTS: Dict[str, Any] = {
+        "current_pain_points": "",
+        "prep_brief_status": "Pending",
+        "status": "upcoming",
+    }
+
+    def __init__(self, **values: Any) -> None:
+        for field in self.__slots__:
+            setattr(self, field, self.DEFAULTS.get(field))
+        for field, value in values.items():
+            setattr(self, field, value)  # AttributeError for anything that isn't a column
+        self.id = self.id or uuid4()
+        self.products_interested = list(self.products_interested or [])
+        self.created_at = self.created_at or datetime.utcnow()
+
+
+class BriefRecord:
+    __slots__ = (
+        "id",
+        "merchant_id",
+        "ae_id",
+        "insights",
+        "pain_points_summary",
+        "relevant_features",
+        "pitch_suggestions",
+        "company_insights",
+        "relevant_product_features",
+        "status",
+        "model",
+        "created_at",
+    )
+
+    def __init__(self, brief: PrepBrief) -> None:
+        self.id = brief.id
+        self.merchant_id = brief.merchant_id
+        self.ae_id = brief.ae_id
+        self.insights = brief.insights
+        self.pain_points_summary = brief.pain_points_summary
+        self.relevant_features = brief.relevant_features
+        self.pitch_suggestions = brief.pitch_suggestions
+        self.company_insights = None
+        self.relevant_product_features = None
+        self.status = brief.status
+        self.model = brief.model
+        self.created_at = datetime.utcnow()
+
+
+class JobRecord:
+    __slots__ = (
+        "id", "merchant_id", "kind", "status", "attempts", "error", "brief_id", "created_at", "started_at", "finished_at", "run_after"
+    )
+
+    def __init__(self, merchant_id: UUID, status: str, kind: str = GENERATE_JOB) -> None:
+        now = datetime.utcnow()
+        running = status == "running"
+        self.id = uuid4()
+        self.merchant_id = merchant_id
+        self.kind = kind
+        self.status = status
+        self.attempts = 1 if running else 0
+        self.error: Optional[str] = None
+        self.brief_id: Optional[UUID] = None
+        self.created_at = now
+        self.started_at = now if running else None
+        self.finished_at: Optional[datetime] = None
+        self.run_after: Optional[datetime] = None
 
 
 class InMemoryDB:
-    """Naive in-memory storage for hackathon/demo use."""
+    """Records plus the secondary indexes; all mutation goes through these methods."""
 
     def __init__(self) -> None:
-        self.aes: Dict[UUID, AE] = {}
-        self.bookings: Dict[UUID, MerchantBooking] = {}
-        self.briefs: Dict[UUID, PrepBrief] = {}
+        self.aes: Dict[UUID, AERecord] = {}
+        self.bookings: Dict[UUID, BookingRecord] = {}
+        self.briefs: Dict[UUID, BriefRecord] = {}  # by merchant (booking) id
+        self.jobs: Dict[UUID, JobRecord] = {}
+        self.active_jobs: Dict[UUID, JobRecord] = {}  # by merchant id; at most one per booking
+        self.by_time: List[Tuple[datetime, UUID]] = []
+        self.by_name: List[Tuple[str, UUID]] = []
+        self.by_ae: Dict[UUID, List[Tuple[datetime, UUID]]] = {}
+        self.by_status: Dict[str, Set[UUID]] = {}
+        self.version = 0
 
-    # Seed data for quick start
-    def seed(self) -> None:
-        from uuid import uuid4
+    def add_ae(self, ae: AERecord) -> None:
+        self.aes[ae.id] = ae
+
+    def add_booking(self, booking: BookingRecord) -> None:
+        self.bookings[booking.id] = booking
+        insort(self.by_name, (booking.merchant_name, booking.id))
+        if booking.scheduled_time is not None:
+            insort(self.by_time, (booking.scheduled_time, booking.id))
+            if booking.assigned_ae_id is not None:
+                insort(self.by_ae.setdefault(booking.assigned_ae_id, []), (booking.scheduled_time, booking.id))
+        self.by_status.setdefault(booking.status, set()).add(booking.id)
+
+    def load_bookings(self, bookings: Iterable[BookingRecord]) -> None:
+        """Bulk add: append to the indexes and sort each once, instead of an insort per booking."""
+        touched = set()
+        for booking in bookings:
+            self.bookings[booking.id] = booking
+            self.by_name.append((booking.merchant_name, booking.id))
+            if booking.scheduled_time is not None:
+                self.by_time.append((booking.scheduled_time, booking.id))
+                if booking.assigned_ae_id is not None:
+                    self.by_ae.setdefault(booking.assigned_ae_id, []).append((booking.scheduled_time, booking.id))
+                    touched.add(booking.assigned_ae_id)
+            self.by_status.setdefault(booking.status, set()).add(booking.id)
+        self.by_name.sort()
+        self.by_time.sort()
+        for ae_id in touched:
+            self.by_ae[ae_id].sort()
 
-        # Seed AEs
-        ae_1 = AE(name="Sarah Johnson", email="sarah@example.com", working_start=time(9, 0), working_end=time(17, 0))
-        ae_2 = AE(name="Mike Chen", email="mike@example.com", working_start=time(10, 0), working_end=time(18, 0))
-        ae_3 = AE(name="Priya Patel", email="priya@example.com", working_start=time(8, 30), working_end=time(16, 30))
+    def set_status(self, booking: BookingRecord, status: str) -> None:
+        self.by_status.get(booking.status, set()).discard(booking.id)
+        booking.status = status
+        self.by_status.setdefault(status, set()).add(booking.id)
+
+    def seed(self) -> None:
+        """Same sample AEs and bookings as database.seed_data."""
+        if self.aes:
+            return
+        ae_1 = AERecord(name="Sarah Johnson", email="sarah@example.com", working_start=time(9, 0), working_end=time(17, 0))
+        ae_2 = AERecord(name="Mike Chen", email="mike@example.com", working_start=time(10, 0), working_end=time(18, 0))
+        ae_3 = AERecord(name="Priya Patel", email="priya@example.com", working_start=time(8, 30), working_end=time(16, 30))
         for ae in (ae_1, ae_2, ae_3):
-            self.aes[ae.id] = ae
-
-        # Seed Bookings (2 sample)
-        b1 = MerchantBooking(
-            merchant_name="Bella Vista Restaurant",
-            address="123 Main St, Downtown",
-            contact_number="+1 (555) 123-4567",
-            email="owner@bellavista.com",
-            products_interested=["Complete Suite"],
-            preferred_time=datetime(2024, 1, 15, 14, 0),
-            website_links="https://bellavista.com",
-            social_media="@bellavista_restaurant",
-            restaurant_category="Fine Dining",
-            number_of_outlets="2-5 Locations",
-            current_pain_points="Struggling with inventory management across multiple locations",
-            special_notes="Interested in integration with existing accounting software",
-            assigned_ae=ae_1.id,
-            scheduled_time=datetime(2024, 1, 15, 14, 0),
-            meeting_link="https://meet.google.com/abc-defg-hij",
-            prep_brief_status="Pending",
+            self.add_ae(ae)
+
+        self.add_booking(
+            BookingRecord(
+                merchant_name="Bella Vista Restaurant",
+                address="123 Main St, Downtown",
+                contact_number="+1 (555) 123-4567",
+                email="owner@bellavista.com",
+                products_interested=["POS", "Inventory Management"],
+                preferred_time=datetime(2024, 1, 15, 14, 0),
+                website_links="https://bellavista.com",
+                social_media="@bellavista_restaurant",
+                restaurant_category="Fine Dining",
+                number_of_outlets="2-5 Locations",
+                current_pain_points="Struggling with inventory management across multiple locations",
+                special_notes="Interested in integration with existing accounting software",
+                assigned_ae_id=ae_1.id,
+                scheduled_time=datetime(2024, 1, 15, 14, 0),
+                meeting_link="https://meet.google.com/zsp-mgca-qso?hs=197&hs=187&authuser=0&ijlm=1756460105373&adhoc=1",
+            )
         )
-        b2 = MerchantBooking(
-            merchant_name="Quick Bites Cafe",
-            address="456 Oak Ave, Midtown",
-            contact_number="+1 (555) 987-6543",
-            email="manager@quickbites.com",
-            products_interested=["POS System", "Online Ordering"],
-            preferred_time=datetime(2024, 1, 16, 10, 30),
-            restaurant_category="Fast Casual",
-            number_of_outlets="1 Location",
-            current_pain_points="Need better online ordering system and delivery integration",
-            special_notes="Currently using Square, looking to upgrade",
-            assigned_ae=ae_2.id,
-            scheduled_time=datetime(2024, 1, 16, 10, 30),
-            meeting_link="https://zoom.us/j/123456789",
-            prep_brief_status="Pending",
+        self.add_booking(
+            BookingRecord(
+                merchant_name="Quick Bites Cafe",
+                address="456 Oak Ave, Midtown",
+                contact_number="+1 (555) 987-6543",
+                email="manager@quickbites.com",
+                products_interested=["POS System", "Online Ordering"],
+                preferred_time=datetime(2024, 1, 16, 10, 30),
+                restaurant_category="Fast Casual",
+                number_of_outlets="1 Location",
+                current_pain_points="Need better online ordering system and delivery integration",
+                special_notes="Currently using Square, looking to upgrade",
+                assigned_ae_id=ae_2.id,
+                scheduled_time=datetime(2024, 1, 16, 10, 30),
+                meeting_link="https://zoom.us/j/99580702559?pwd=xulkhpSR8Ia1wkTL7UXXVPXAv45OUR.1",
+            )
         )
-        for b in (b1, b2):
-            self.bookings[b.id] = b
+        print("✅ In-memory store seeded")
+
+
+def _search_groups(q: str) -> List[Tuple[Set[str], Set[str]]]:
+    """Parse websearch syntax (quoted phrases, -exclusions, OR) into (required, excluded) word sets.
+
+    Approximates websearch_to_tsquery without stemming or stop words; phrases
+    only require their words to be present.
+    """
+    groups: List[Tuple[Set[str], Set[str]]] = [(set(), set())]
+    for token in re.findall(r'-?"[^"]*"|\S+', q):
+        if token.lower() == "or":
+            groups.append((set(), set()))
+            continue
+        required, excluded = groups[-1]
+        words = re.findall(r"\w+", token.lower())
+        (excluded if token.startswith("-") else required).update(words)
+    return [group for group in groups if group[0] or group[1]]
+
+
+def _search_matches(booking: BookingRecord, groups: List[Tuple[Set[str], Set[str]]]) -> bool:
+    document = f"{booking.merchant_name or ''} {booking.current_pain_points or ''} {booking.special_notes or ''}"
+    words = set(re.findall(r"\w+", document.lower()))
+    return any(required <= words and not excluded & words for required, excluded in groups)
+
+
+class InMemoryRepository(BookingRepository):
+    """BookingRepository over an InMemoryDB.
+
+    Change events go straight to this process's change feed. Queued brief jobs
+    run as event loop tasks rather than on the Postgres worker pool, and the
+    pre-generation scheduler does not run.
+    """
+
+    def __init__(self, store: InMemoryDB) -> None:
+        self.store = store
+        self._job_done: Dict[UUID, asyncio.Event] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _changed(self, event: Dict[str, Any]) -> None:
+        self.store.version += 1
+        change_feed.publish(event)
+
+    def _ae_name(self, ae_id: Optional[UUID]) -> Optional[str]:
+        ae = self.store.aes.get(ae_id) if ae_id else None
+        return ae.name if ae else None
+
+    async def data_version(self) -> int:
+        return self.store.version
+
+    async def ae_exists(self, ae_id: UUID) -> bool:
+        return ae_id in self.store.aes
+
+    async def assignment_snapshot(self, since: datetime) -> Tuple[List[AERecord], List[Tuple[UUID, datetime]]]:
+        starts = [
+            (ae_id, scheduled_time)
+            for ae_id, entries in self.store.by_ae.items()
+            for scheduled_time, _ in entries[bisect_left(entries, (since,)):]
+        ]
+        return list(self.store.aes.values()), starts
+
+    async def booking_with_ae_name(self, booking_id: UUID) -> Optional[Tuple[BookingRecord, Optional[str]]]:
+        booking = self.store.bookings.get(booking_id)
+        return (booking, self._ae_name(booking.assigned_ae_id)) if booking else None
+
+    def _index_for(self, filters: DemoFilters) -> List[Tuple[Any, UUID]]:
+        """The sorted (key, id) list to walk for these filters."""
+        key = filters.sort.lstrip("-")
+        if key == "scheduled_time" and filters.ae_id:
+            return self.store.by_ae.get(filters.ae_id, [])
+        full = self.store.by_time if key == "scheduled_time" else self.store.by_name
+        if filters.status:
+            ids = [i for status in set(filters.status) for i in self.store.by_status.get(status, ())]
+            # Few enough matches that sorting them beats walking the whole index
+            if len(ids) * 8 < len(full):
+                bookings = self.store.bookings
+                return sorted(
+                    (getattr(bookings[i], key), i) for i in ids if getattr(bookings[i], key) is not None
+                )
+        return full
+
+    def _scan(self, filters: DemoFilters, limit: Optional[int]) -> List[BookingRecord]:
+        entries = self._index_for(filters)
+        descending = filters.sort.startswith("-")
+        scheduled_from, scheduled_to = filters.scheduled_from, filters.scheduled_to
+
+        lo, hi = 0, len(entries)
+        if filters.sort.lstrip("-") == "scheduled_time":
+            if scheduled_from:
+                lo = bisect_left(entries, (scheduled_from,))
+            if scheduled_to:
+                hi = bisect_left(entries, (scheduled_to,))
+        if filters.after:
+            if descending:
+                hi = min(hi, bisect_left(entries, filters.after))
+            else:
+                lo = max(lo, bisect_right(entries, filters.after))
+
+        statuses = set(filters.status) if filters.status else None
+        search = _search_groups(filters.q) if filters.q and filters.q.strip() else None
+        rows: List[BookingRecord] = []
+        for i in range(hi - 1, lo - 1, -1) if descending else range(lo, hi):
+            b = self.store.bookings[entries[i][1]]
+            if statuses and b.status not in statuses:
+                continue
+            if filters.ae_id and b.assigned_ae_id != filters.ae_id:
+                continue
+            if filters.category and b.restaurant_category != filters.category:
+                continue
+            if filters.outlets and b.number_of_outlets != filters.outlets:
+                continue
+            if filters.product and filters.product not in b.products_interested:
+                continue
+            if scheduled_from and (b.scheduled_time is None or b.scheduled_time < scheduled_from):
+                continue
+            if scheduled_to and (b.scheduled_time is None or b.scheduled_time >= scheduled_to):
+                continue
+            if search and not _search_matches(b, search):
+                continue
+            rows.append(b)
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+    async def list_demos(self, filters: DemoFilters, limit: int) -> List[Tuple[BookingRecord, Optional[str]]]:
+        return [(b, self._ae_name(b.assigned_ae_id)) for b in self._scan(filters, limit)]
+
+    async def list_ae_demos(self, ae_id: UUID, filters: DemoFilters, limit: int) -> List[BookingRecord]:
+        return self._scan(filters._replace(ae_id=ae_id, sort="scheduled_time"), limit)
+
+    async def calendar_events(
+        self, start: Optional[datetime], end: Optional[datetime], ae_id: Optional[UUID]
+    ) -> List[Tuple[BookingRecord, Optional[str]]]:
+        filters = DemoFilters(status=list(CALENDAR_STATUSES), ae_id=ae_id, scheduled_from=start, scheduled_to=end)
+        return [(b, self._ae_name(b.assigned_ae_id)) for b in self._scan(filters, None)]
+
+    async def export_batches(self, batch_size: int) -> AsyncIterator[Sequence[Sequence[Any]]]:
+        # Snapshot the order up front; bookings added mid-export are left out
+        ids = [booking_id for _, booking_id in self.store.by_time]
+        ids += [b.id for b in self.store.bookings.values() if b.scheduled_time is None]
+        for offset in range(0, len(ids), batch_size):
+            batch = []
+            for booking_id in ids[offset:offset + batch_size]:
+                b = self.store.bookings[booking_id]
+                batch.append((
+                    b.id,
+                    b.merchant_name,
+                    b.restaurant_category,
+                    b.scheduled_time,
+                    self._ae_name(b.assigned_ae_id),
+                    b.status,
+                    b.prep_brief_status,
+                    b.meeting_link,
+                    b.email,
+                    b.contact_number,
+                    b.products_interested,
+                    b.number_of_outlets,
+                    b.created_at,
+                ))
+            yield batch
+            # Let other requests run between batches of a large export
+            await asyncio.sleep(0)
+
+    async def create_booking(self, values: Dict[str, Any], ae_name: str) -> BookingRecord:
+        booking = BookingRecord(**values)
+        self.store.add_booking(booking)
+        self._changed({"type": "booking_created", "demo": demo_card(booking, ae_name)})
+        return booking
+
+    async def insert_bookings(self, values: List[Dict[str, Any]]) -> None:
+        bookings = [BookingRecord(**row) for row in values]
+        for booking in bookings:
+            self.store.add_booking(booking)
+        self._changed({"type": "bookings_imported", "count": len(bookings)})
+
+    async def complete_demo(self, booking_id: UUID) -> bool:
+        booking = self.store.bookings.get(booking_id)
+        if not booking:
+            return False
+        self.store.set_status(booking, "completed")
+        self._changed({"type": "demo_completed", "id": str(booking_id)})
+        return True
+
+    async def brief_context(self, merchant_id: UUID) -> Tuple[MerchantBooking, AE]:
+        booking = self.store.bookings.get(merchant_id)
+        if not booking:
+            raise BriefGenerationError("Merchant booking not found", status_code=404)
+        if not booking.assigned_ae_id:
+            raise BriefGenerationError("No AE assigned to booking")
+        ae = self.store.aes.get(booking.assigned_ae_id)
+        if not ae:
+            raise BriefGenerationError("Assigned AE not found")
+        return brief_context_models(booking, ae)
+
+    async def prep_brief(self, merchant_id: UUID) -> Optional[PrepBrief]:
+        brief = self.store.briefs.get(merchant_id)
+        return prep_brief_model(brief) if brief else None
+
+    async def save_prep_brief(self, brief: PrepBrief, job_id: Optional[UUID] = None) -> None:
+        # Regenerating replaces the brief in place, keeping its id
+        existing = self.store.briefs.get(brief.merchant_id)
+        if existing:
+            brief.id = existing.id
+        self.store.briefs[brief.merchant_id] = BriefRecord(brief)
+
+        booking = self.store.bookings.get(brief.merchant_id)
+        if booking:
+            booking.prep_brief_status = "Generated"
+        job = self.store.jobs.get(job_id) if job_id else None
+        if job:
+            self._finish_job(job, "done", brief_id=brief.id)
+        if brief.status == DRAFT_STATUS:
+            upgrade, created = self._active_or_new_job(brief.merchant_id, "queued", UPGRADE_JOB)
+            if created:
+                self._spawn(upgrade)
+        self._changed({"type": "brief_generated", "id": str(brief.merchant_id), "status": brief.status})
+
+    async def brief_job(self, job_id: UUID) -> Optional[JobRecord]:
+        return self.store.jobs.get(job_id)
+
+    def _active_or_new_job(self, merchant_id: UUID, status: str, kind: str = GENERATE_JOB) -> Tuple[JobRecord, bool]:
+        job = self.store.active_jobs.get(merchant_id)
+        if job is not None:
+            return job, False
+        job = JobRecord(merchant_id, status, kind)
+        self.store.jobs[job.id] = job
+        self.store.active_jobs[merchant_id] = job
+        self._job_done[job.id] = asyncio.Event()
+        return job, True
+
+    def _finish_job(self, job: JobRecord, status: str, error: Optional[str] = None, brief_id: Optional[UUID] = None) -> None:
+        job.status = status
+        job.error = error
+        job.brief_id = brief_id
+        job.finished_at = datetime.utcnow()
+        if self.store.active_jobs.get(job.merchant_id) is job:
+            del self.store.active_jobs[job.merchant_id]
+        done = self._job_done.pop(job.id, None)
+        if done:
+            done.set()
+
+    async def aclose(self) -> None:
+        """Cancel in-flight brief tasks; call at shutdown before the LLM client is closed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def _spawn(self, job: JobRecord, delay: float = 0) -> None:
+        task = asyncio.get_running_loop().create_task(self._run_job(job, delay))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: JobRecord, delay: float = 0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        job.attempts += 1
+        try:
+            booking, ae = await self.brief_context(job.merchant_id)
+            brief = await generate_brief_for_job(booking, ae, job.kind)
+            await self.save_prep_brief(brief, job.id)
+        except Exception as e:
+            print(f"❌ Brief job {job.id} failed: {e}")
+            await self.fail_brief_job(job.id, job.merchant_id, str(e))
+
+    async def enqueue_brief_job(self, merchant_id: UUID) -> JobRecord:
+        job, created = self._active_or_new_job(merchant_id, "queued")
+        if created:
+            self._spawn(job)
+        return job
+
+    async def start_brief_job(self, merchant_id: UUID) -> Tuple[JobRecord, bool]:
+        return self._active_or_new_job(merchant_id, "running")
 
-        # Update booked slots
-        self.aes[ae_1.id].booked_slots.append(b1.scheduled_time)  # type: ignore[arg-type]
-        self.aes[ae_2.id].booked_slots.append(b2.scheduled_time)  # type: ignore[arg-type]
+    async def fail_brief_job(self, job_id: UUID, merchant_id: UUID, error: str) -> None:
+        job = self.store.jobs.get(job_id)
+        delay = brief_retry_delay(job.kind, job.attempts) if job else None
+        if delay is not None:
+            job.status = "queued"
+            job.error = error
+            job.started_at = None
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            self._spawn(job, delay)
+            return
+        if job:
+            self._finish_job(job, "failed", error=error)
+        change_feed.publish({"type": "brief_failed", "id": str(merchant_id)})
 
+    async def requeue_brief_job(self, job_id: UUID) -> None:
+        job = self.store.jobs.get(job_id)
+        if job and job.status == "running":
+            job.status = "queued"
+            job.started_at = None
+            self._spawn(job)
 
-db = InMemoryDB()
-db.seed()
+    async def wait_for_brief_job(self, job_id: UUID, merchant_id: UUID, timeout: float) -> Optional[JobRecord]:
+        done = self._job_done.get(job_id)
+        if done:
+            await asyncio.wait_for(done.wait(), timeout=timeout)
+        return self.store.jobs.get(job_id)
 
 
+memory_db = InMemoryDB()
+memory_repository = InMemoryRepository(memory_db)
@@ -0,0 +1,72 @@
+"""
+Data-version ETags for dashboard read endpoints
+
+Every write to bookings or briefs bumps a single counter row in the same
+transaction. Read endpoints derive a strong ETag from that counter plus the
+request path and query, so a matching If-None-Match is answered with 304
+after one primary-key lookup, without touching the booking tables.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import DataVersionModel
+
+if TYPE_CHECKING:
+    from .repository import BookingRepository
+
+DATA_VERSION_NAME = "bookings"
+
+
+async def bump_data_version(db: AsyncSession) -> None:
+    """Advance the data version; call inside the writing transaction, before commit."""
+    stmt = insert(DataVersionModel).values(name=DATA_VERSION_NAME, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersionModel.name],
+        set_={"version": DataVersionModel.version + 1},
+    )
+    await db.execute(stmt)
+
+
+async def current_data_version(db: AsyncSession) -> int:
+    version = (
+        await db.execute(select(DataVersionModel.version).where(DataVersionModel.name == DATA_VERSION_NAME))
+    ).scalar_one_or_none()
+    return version or 0
+
+
+def _etag_for(version: int, request: Request) -> str:
+    # Different query parameters produce different bodies for the same version
+    resource = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    return f'"{version}-{resource}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+async def conditional_response(
+    request: Request, response: Response, repo: BookingRepository
+) -> Optional[Response]:
+    """Return a 304 if the client's copy is current; otherwise set ETag on `response` and return None.
+
+    The version is read before the payload, so a write landing in between can
+    only make the body newer than its ETag, costing one extra refetch later.
+    """
+    etag = _etag_for(await repo.data_version(), request)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,72 @@
+"""
+Streaming export of demo bookings as NDJSON or CSV
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from .config import config
+from .repository import repository_session
+
+EXPORT_COLUMNS = (
+    "id",
+    "merchant_name",
+    "category",
+    "scheduled_time",
+    "ae_name",
+    "status",
+    "prep_brief_status",
+    "meeting_link",
+    "email",
+    "contact_number",
+    "products_interested",
+    "number_of_outlets",
+    "created_at",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _iter_batches() -> AsyncIterator[Sequence]:
+    """Yield export rows (in EXPORT_COLUMNS order) in batches of EXPORT_BATCH_SIZE."""
+    async with repository_session() as repo:
+        async for batch in repo.export_batches(config.EXPORT_BATCH_SIZE):
+            yield batch
+
+
+def _record(row: Sequence) -> dict:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record["id"] = str(record["id"])
+    record["ae_name"] = record["ae_name"] or ""
+    for key in ("scheduled_time", "created_at"):
+        record[key] = record[key].isoformat() if record[key] else None
+    record["products_interested"] = record["products_interested"] or []
+    return record
+
+
+async def export_ndjson() -> AsyncIterator[bytes]:
+    async for batch in _iter_batches():
+        yield "".join(json.dumps(_record(row)) + "\n" for row in batch).encode()
+
+
+async def export_csv() -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # Send the header straight away so clients see bytes before the first batch
+    yield buffer.getvalue().encode()
+    
+    async for batch in _iter_batches():
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            record = _record(row)
+            record["products_interested"] = ";".join(record["products_interested"])
+            writer.writerow(record[column] for column in EXPORT_COLUMNS)
+        yield buffer.getvalue().encode()
@@ -0,0 +1,270 @@
+"""
+Postgres-backed job queue and worker pool for prep brief generation
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, case, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .briefs import UPGRADE_JOB, brief_retry_delay, generate_and_save_brief
+from .changes import change_feed, notify_change
+from .config import config
+from .database import ACTIVE_JOB_PREDICATE, ACTIVE_JOB_STATUSES, AsyncSessionLocal, BriefJobModel
+
+
+async def _active_or_new_job(db: AsyncSession, merchant_id: UUID, status: str) -> Tuple[BriefJobModel, bool]:
+    """Create a job in `status`, or return the booking's job that is already queued or running.
+
+    The partial unique index allows one active job per booking, so concurrent
+    callers in any process coalesce onto the same job. Returns (job, created).
+    """
+    while True:
+        now = datetime.utcnow()
+        running = status == "running"
+        job_id = (
+            await db.execute(
+                insert(BriefJobModel)
+                .values(
+                    id=uuid4(),
+                    merchant_id=merchant_id,
+                    status=status,
+                    attempts=1 if running else 0,
+                    created_at=now,
+                    started_at=now if running else None,
+                )
+                .on_conflict_do_nothing(index_elements=[BriefJobModel.merchant_id], index_where=text(ACTIVE_JOB_PREDICATE))
+                .returning(BriefJobModel.id)
+            )
+        ).scalar_one_or_none()
+        if job_id is not None:
+            job = await db.get(BriefJobModel, job_id)
+        else:
+            job = (
+                await db.execute(
+                    select(BriefJobModel).where(
+                        BriefJobModel.merchant_id == merchant_id,
+                        BriefJobModel.status.in_(ACTIVE_JOB_STATUSES),
+                    )
+                )
+            ).scalar_one_or_none()
+            if job is None:
+                # The active job finished between the two statements; try again
+                await db.rollback()
+                continue
+        await db.commit()
+        return job, job_id is not None
+
+
+async def enqueue_brief_job(db: AsyncSession, merchant_id: UUID) -> BriefJobModel:
+    """Queue brief generation for a booking, or join the one already in flight."""
+    job, created = await _active_or_new_job(db, merchant_id, "queued")
+    if created:
+        brief_workers.notify()
+    return job
+
+
+async def start_brief_job(db: AsyncSession, merchant_id: UUID) -> Tuple[BriefJobModel, bool]:
+    """Claim generation for a caller that will run it inline (e.g. the SSE stream).
+
+    Returns (job, True) if this caller owns a new running job, or the booking's
+    in-flight job and False if someone else is already generating.
+    """
+    return await _active_or_new_job(db, merchant_id, "running")
+
+
+async def fail_brief_job(db: AsyncSession, job_id: UUID, merchant_id: UUID, error: str) -> None:
+    """Record a failed attempt: queue it again after a backoff if brief_retry_delay allows, else mark it failed."""
+    job = await db.get(BriefJobModel, job_id)
+    delay = brief_retry_delay(job.kind, job.attempts) if job else None
+    if delay is not None:
+        job.status = "queued"
+        job.error = error
+        job.started_at = None
+        job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+        await db.commit()
+        return
+
+    await db.execute(
+        update(BriefJobModel)
+        .where(BriefJobModel.id == job_id)
+        .values(status="failed", error=error, finished_at=datetime.utcnow())
+    )
+    # Wakes callers waiting on this booking's generation
+    await notify_change(db, {"type": "brief_failed", "id": str(merchant_id)})
+    await db.commit()
+
+
+async def requeue_brief_job(db: AsyncSession, job_id: UUID) -> None:
+    """Hand an abandoned inline generation (client disconnected) to the worker pool."""
+    await db.execute(
+        update(BriefJobModel)
+        .where(BriefJobModel.id == job_id, BriefJobModel.status == "running")
+        .values(status="queued", started_at=None)
+    )
+    await db.commit()
+    brief_workers.notify()
+
+
+async def _next_brief_event(events: asyncio.Queue, merchant_id: UUID) -> None:
+    target = str(merchant_id)
+    while True:
+        event = await events.get()
+        if event.get("type") == "resync":
+            return
+        if event.get("type") in ("brief_generated", "brief_failed") and event.get("id") == target:
+            return
+
+
+async def wait_for_brief_job(job_id: UUID, merchant_id: UUID, timeout: float) -> Optional[BriefJobModel]:
+    """Wait until a job is done or failed, in this process or any other.
+
+    Wakes on the booking's brief events from the change feed, and re-checks the
+    job row every BRIEF_JOB_POLL_INTERVAL in case the feed is unavailable.
+    Raises asyncio.TimeoutError after `timeout` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    # Subscribe before the first check so a completion in between isn't missed
+    async with change_feed.subscribe() as events:
+        while True:
+            async with AsyncSessionLocal() as db:
+                job = await db.get(BriefJobModel, job_id)
+            if job is None or job.status not in ACTIVE_JOB_STATUSES:
+                return job
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            try:
+                await asyncio.wait_for(_next_brief_event(events, merchant_id), timeout=min(remaining, config.BRIEF_JOB_POLL_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+
+
+class BriefJobWorkerPool:
+    """A fixed number of asyncio workers draining the brief_jobs table.
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+    workers across any number of processes can poll the same table without
+    handing out a job twice. Jobs left 'running' longer than BRIEF_JOB_TIMEOUT
+    (e.g. the process died mid-generation) are claimed again until they reach
+    BRIEF_JOB_MAX_ATTEMPTS, then marked failed so they free the booking's
+    active job slot. Jobs interrupted by stop() are put back in the queue, and
+    failed upgrades are queued again with a backoff (see brief_retry_delay).
+    """
+
+    def __init__(self, workers: int, poll_interval: float) -> None:
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def start(self) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"✅ Started {self.workers} brief generation workers")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers in this process instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while not self._stopping:
+            try:
+                claimed = await self._claim()
+            except Exception as e:
+                print(f"❌ Brief job claim failed: {e}")
+                claimed = None
+
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(*claimed)
+
+    async def _claim(self) -> Optional[Tuple[UUID, UUID, str]]:
+        stale_before = datetime.utcnow() - timedelta(seconds=config.BRIEF_JOB_TIMEOUT)
+        async with AsyncSessionLocal() as db:
+            # Stale jobs out of attempts would otherwise hold their booking's slot forever
+            abandoned = (
+                await db.execute(
+                    update(BriefJobModel)
+                    .where(
+                        BriefJobModel.status == "running",
+                        BriefJobModel.started_at < stale_before,
+                        BriefJobModel.attempts >= config.BRIEF_JOB_MAX_ATTEMPTS,
+                    )
+                    .values(status="failed", error="Gave up after repeated attempts", finished_at=datetime.utcnow())
+                    .returning(BriefJobModel.merchant_id)
+                )
+            ).scalars().all()
+            for merchant_id in abandoned:
+                await notify_change(db, {"type": "brief_failed", "id": str(merchant_id)})
+
+            job = (
+                await db.execute(
+                    select(BriefJobModel)
+                    .where(
+                        or_(
+                            and_(
+                                BriefJobModel.status == "queued",
+                                or_(BriefJobModel.run_after.is_(None), BriefJobModel.run_after <= datetime.utcnow()),
+                            ),
+                            and_(
+                                BriefJobModel.status == "running",
+                                BriefJobModel.started_at < stale_before,
+                                BriefJobModel.attempts < config.BRIEF_JOB_MAX_ATTEMPTS,
+                            ),
+                        )
+                    )
+                    # Upgrades only improve a brief the AE already has; first briefs go first
+                    .order_by(case((BriefJobModel.kind == UPGRADE_JOB, 1), else_=0), BriefJobModel.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+            ).scalar_one_or_none()
+            if job is None:
+                await db.commit()
+                return None
+            
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            job.attempts += 1
+            await db.commit()
+            return job.id, job.merchant_id, job.kind
+
+    async def _run(self, job_id: UUID, merchant_id: UUID, kind: str) -> None:
+        async with AsyncSessionLocal() as db:
+            try:
+                # Saving the brief marks the job done in the same transaction
+                await generate_and_save_brief(db, merchant_id, job_id, kind)
+            except asyncio.CancelledError:
+                # stop() during a deploy: hand the job back rather than leave it running
+                await db.rollback()
+                await requeue_brief_job(db, job_id)
+                raise
+            except Exception as e:
+                await db.rollback()
+                print(f"❌ Brief job {job_id} failed: {e}")
+                await fail_brief_job(db, job_id, merchant_id, str(e))
+
+
+brief_workers = BriefJobWorkerPool(config.BRIEF_WORKERS, config.BRIEF_JOB_POLL_INTERVAL)
@@ -0,0 +1,249 @@
+"""
+Shared async gateway for OpenAI calls
+
+One long-lived client per process (HTTP keep-alive), a concurrency cap
+matched to the account's rate limits, jittered exponential retry on
+429/5xx/connection errors, and a circuit breaker that fails fast while
+the provider is unhealthy so callers can fall back to mock briefs
+immediately instead of waiting out timeouts.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+import openai
+
+from .config import config
+from .metrics import LLM_ERRORS, LLM_REQUEST_SECONDS, LLM_TOKENS
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half-open"
+        if self.state == "half-open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Forget an abandoned (cancelled) probe so the next call can probe again."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Honour a Retry-After header in seconds, if the provider sent one."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _observe_attempt(operation: str, started: Optional[float], error: Optional[Exception] = None) -> None:
+    if error is not None:
+        LLM_ERRORS.labels(type(error).__name__).inc()
+    if started is not None:  # None when the attempt never got a concurrency slot
+        outcome = "ok" if error is None else "error"
+        LLM_REQUEST_SECONDS.labels(operation, outcome).observe(time.perf_counter() - started)
+
+
+def _count_usage(usage: Any) -> None:
+    if usage is not None:
+        LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+        LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+
+
+class LLMGateway:
+    """Process-wide entry point for chat completions."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        timeout: float,
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.breaker = breaker
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[openai.AsyncOpenAI] = None
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            )
+            self._client = openai.AsyncOpenAI(
+                api_key=config.OPENAI_API_KEY,
+                base_url=config.OPENAI_BASE_URL,
+                timeout=self.timeout,
+                max_retries=0,  # retries are handled here, with jitter and the breaker
+                http_client=httpx.AsyncClient(limits=limits, timeout=self.timeout),
+            )
+        return self._client
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # Full jitter keeps concurrent retries from synchronizing into bursts
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = _retry_after(error)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _record_error(self, error: Exception) -> None:
+        # Only provider-side failures say anything about provider health
+        if _is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    async def chat_completion(self, **kwargs: Any):
+        """Call chat.completions.create with concurrency limiting, retries and the breaker."""
+        if not self.breaker.allow():
+            LLM_ERRORS.labels(CircuitOpenError.__name__).inc()
+            raise CircuitOpenError("OpenAI circuit is open; skipping call")
+
+        attempt = 0
+        while True:
+            started = None
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    response = await self.client.chat.completions.create(**kwargs)
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                _observe_attempt("chat", started, e)
+                if _is_retryable(e) and attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff(attempt, e))
+                    attempt += 1
+                    continue
+                self._record_error(e)
+                raise
+            _observe_attempt("chat", started)
+            _count_usage(response.usage)
+            self.breaker.record_success()
+            return response
+
+    async def stream_chat_completion(self, **kwargs: Any) -> AsyncIterator[str]:
+        """Stream content deltas of a chat completion.
+
+        Opening the stream is retried like chat_completion; once tokens are
+        flowing, errors propagate to the caller. The concurrency slot is held
+        until the stream is exhausted or closed.
+        """
+        if not self.breaker.allow():
+            LLM_ERRORS.labels(CircuitOpenError.__name__).inc()
+            raise CircuitOpenError("OpenAI circuit is open; skipping call")
+
+        attempt = 0
+        while True:
+            await self._semaphore.acquire()
+            started = time.perf_counter()
+            try:
+                # include_usage adds a final chunk with token counts and no choices
+                stream = await self.client.chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **kwargs
+                )
+                break
+            except asyncio.CancelledError:
+                self._semaphore.release()
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                self._semaphore.release()
+                _observe_attempt("stream", started, e)
+                if _is_retryable(e) and attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff(attempt, e))
+                    attempt += 1
+                    continue
+                self._record_error(e)
+                raise
+
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                _count_usage(chunk.usage)
+        except (GeneratorExit, asyncio.CancelledError):
+            self.breaker.release_probe()
+            raise
+        except Exception as e:
+            _observe_attempt("stream", started, e)
+            self._record_error(e)
+            raise
+        else:
+            _observe_attempt("stream", started)
+            self.breaker.record_success()
+        finally:
+            self._semaphore.release()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.max_concurrency - self._semaphore._value,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+llm_gateway = LLMGateway(
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    max_retries=config.LLM_MAX_RETRIES,
+    backoff_base=config.LLM_BACKOFF_BASE,
+    backoff_max=config.LLM_BACKOFF_MAX,
+    timeout=config.LLM_TIMEOUT,
+    breaker=CircuitBreaker(config.LLM_BREAKER_THRESHOLD, config.LLM_BREAKER_RESET),
+)
@@ -1,11 +1,20 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 # Local modules
 from .routes import router
-from .database import create_tables, seed_data
+from .changes import change_feed
+from .database import async_engine, run_migrations, seed_data
+from .db import memory_db, memory_repository
+from .jobs import brief_workers
+from .llm_gateway import llm_gateway
+from .prompts import get_tokenizer
+from .scheduler import brief_scheduler
 from .config import config
+from .utils import draft_model
 
 
 def create_app() -> FastAPI:
@@ -19,6 +28,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
     app.include_router(router)
@@ -29,15 +39,43 @@ app = create_app()
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and start background workers on startup."""
+    if config.OPENAI_API_KEY:
+        # Start fetching the tokenizers in the background so the first briefs get exact budgets
+        for model in filter(None, (config.OPENAI_MODEL, draft_model())):
+            get_tokenizer(model)
+
+    if config.STORAGE_BACKEND == "memory":
+        # No database: queued briefs run as in-process tasks and the pre-generation scheduler is off
+        memory_db.seed()
+        print("⚠️  Using in-memory storage; nothing is persisted")
+        return
+
     try:
-        create_tables()
+        # Blocking DDL (and CREATE INDEX CONCURRENTLY waits); keep it off the event loop
+        await asyncio.to_thread(run_migrations)
         seed_data()
         print("✅ Database initialized successfully!")
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
         print("⚠️  Make sure PostgreSQL is running and DATABASE_URL is correct")
 
+    brief_workers.start()
+    change_feed.start()
+    if config.BRIEF_PREGEN_ENABLED:
+        brief_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and release pooled database and HTTP connections."""
+    await brief_scheduler.stop()
+    await brief_workers.stop()
+    await memory_repository.aclose()
+    await change_feed.stop()
+    await llm_gateway.aclose()
+    await async_engine.dispose()
+
 
 if __name__ == "__main__":
     # Uvicorn entry point for `python Backend/main.py`
@@ -0,0 +1,251 @@
+"""
+In-process metrics for DemoGenie: request, SQL, LLM and connection pool
+instrumentation, declared on a prometheus_client registry served at /metrics
+"""
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Seconds; tuned for pool checkout waits, where anything over ~100ms means saturation
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Seconds per OpenAI call; completions take seconds, not milliseconds
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+# Statements per request; anything past a handful on a list route is usually an N+1
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Per worker: with several workers each scrape sees one process
+registry = CollectorRegistry()
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "demogenie_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of the response",
+    ("method", "route", "status"),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "demogenie_http_requests_in_flight",
+    "Requests currently being handled, including open streams",
+    ("method", "route"),
+    registry=registry,
+)
+HTTP_SQL_STATEMENTS = Histogram(
+    "demogenie_http_request_sql_statements",
+    "SQL statements executed while handling one request",
+    ("method", "route"),
+    buckets=SQL_COUNT_BUCKETS,
+    registry=registry,
+)
+HTTP_SQL_SECONDS = Histogram(
+    "demogenie_http_request_sql_duration_seconds",
+    "Total time spent executing SQL while handling one request",
+    ("method", "route"),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+SQL_STATEMENT_SECONDS = Histogram(
+    "demogenie_sql_statement_duration_seconds",
+    "Time per SQL statement, including background workers",
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "demogenie_llm_request_duration_seconds",
+    "Time per OpenAI call attempt; streams are timed until the last token",
+    ("operation", "outcome"),
+    buckets=LLM_BUCKETS,
+    registry=registry,
+)
+LLM_TOKENS = Counter(
+    "demogenie_llm_tokens_total",
+    "Tokens reported by OpenAI usage",
+    ("type",),
+    registry=registry,
+)
+LLM_ERRORS = Counter(
+    "demogenie_llm_errors_total",
+    "Failed OpenAI call attempts (including retried ones and calls refused by the open circuit), by exception type",
+    ("error",),
+    registry=registry,
+)
+BRIEF_FALLBACKS = Counter(
+    "demogenie_brief_fallbacks_total",
+    "Briefs served from the mock generator instead of OpenAI",
+    ("reason",),
+    registry=registry,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "demogenie_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ("pool",),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "demogenie_db_pool_checkout_timeouts_total",
+    "Pool checkouts that gave up after DB_POOL_TIMEOUT",
+    ("pool",),
+    registry=registry,
+)
+
+
+class _CheckoutTimingMixin:
+    """Times Pool.connect() so checkout waits show up when the pool saturates.
+
+    Series are labelled by the class rather than held on the instance because
+    Engine.dispose() replaces the pool with a fresh instance via recreate().
+    """
+
+    metrics_label: str
+
+    def connect(self):  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+# Export zeros before the first checkout
+for _pool_class in (InstrumentedQueuePool, InstrumentedAsyncQueuePool):
+    DB_POOL_CHECKOUT_SECONDS.labels(_pool_class.metrics_label)
+    DB_POOL_CHECKOUT_TIMEOUTS.labels(_pool_class.metrics_label)
+
+
+def pool_stats(pool: Pool) -> Dict[str, object]:
+    """Current occupancy plus checkout wait distribution for a pool."""
+    stats: Dict[str, object] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # QueuePool.overflow() counts up from -pool_size; clamp to connections beyond the pool
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, _CheckoutTimingMixin):
+        labels = {"pool": pool.metrics_label}
+
+        def sample(name: str, **extra: str) -> float:
+            return registry.get_sample_value(name, {**labels, **extra}) or 0
+
+        wait = "demogenie_db_pool_checkout_wait_seconds"
+        stats["checkout_timeouts"] = int(sample("demogenie_db_pool_checkout_timeouts_total"))
+        stats["checkout_wait_seconds"] = {
+            "buckets": {le: int(sample(f"{wait}_bucket", le=le)) for le in [*map(str, DEFAULT_BUCKETS), "+Inf"]},
+            "count": int(sample(f"{wait}_count")),
+            "sum": round(sample(f"{wait}_sum"), 6),
+        }
+    return stats
+
+
+class PoolCollector(Collector):
+    """Occupancy gauges for each engine's current pool, read at scrape time."""
+
+    def __init__(self, pools: Dict[str, Callable[[], Pool]]) -> None:
+        self.pools = pools  # label -> current pool; a callable since dispose() swaps the pool
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        checked_out = GaugeMetricFamily(
+            "demogenie_db_pool_checked_out", "Connections currently checked out of the pool", labels=("pool",)
+        )
+        overflow = GaugeMetricFamily("demogenie_db_pool_overflow", "Connections open beyond the pool size", labels=("pool",))
+        for label, current in self.pools.items():
+            pool = current()
+            if isinstance(pool, QueuePool):
+                checked_out.add_metric((label,), pool.checkedout())
+                overflow.add_metric((label,), max(pool.overflow(), 0))
+        yield checked_out
+        yield overflow
+
+
+class _SqlStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by InstrumentedRoute for the duration of a request; copied into threadpool and greenlet contexts
+_request_sql: ContextVar[Optional[_SqlStats]] = ContextVar("request_sql", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    SQL_STATEMENT_SECONDS.observe(elapsed)
+    stats = _request_sql.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on engine (pass async_engine.sync_engine for the async one)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that records latency, in-flight requests and SQL work under its path template.
+
+    Wraps handle() rather than the endpoint so dependencies and streamed
+    response bodies are included. Requests that match no route are not recorded.
+    """
+
+    async def handle(self, scope, receive, send) -> None:
+        method = scope["method"]
+        status = "500"
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method, self.path)
+        stats = _SqlStats()
+        token = _request_sql.set(stats)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await super().handle(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(method, self.path, status).observe(time.perf_counter() - started)
+            HTTP_SQL_STATEMENTS.labels(method, self.path).observe(stats.statements)
+            HTTP_SQL_SECONDS.labels(method, self.path).observe(stats.seconds)
+            in_flight.dec()
+            _request_sql.reset(token)
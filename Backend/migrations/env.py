@@ -0,0 +1,62 @@
+"""
+Alembic environment for DemoGenie
+
+Runs against config.DATABASE_URL, or against the connection passed in by
+database.run_migrations() at startup (which already holds the migration lock).
+"""
+import sys
+from logging.config import fileConfig
+from pathlib import Path
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+# Make the Backend package importable when invoked through the alembic CLI
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from Backend.config import config as app_config  # noqa: E402
+from Backend.database import Base  # noqa: E402
+
+alembic_config = context.config
+connection = alembic_config.attributes.get("connection")
+
+# Don't reconfigure the application's logging when run from inside the app
+if alembic_config.config_file_name is not None and connection is None:
+    fileConfig(alembic_config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of executing it (alembic upgrade --sql)."""
+    context.configure(
+        url=app_config.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(conn) -> None:
+    context.configure(connection=conn, target_metadata=target_metadata, transaction_per_migration=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    if connection is not None:
+        _run(connection)
+        return
+
+    engine = create_engine(app_config.DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as conn:
+        _run(conn)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,86 @@
+"""initial schema: aes, merchant_bookings, prep_briefs
+
+Databases that predate migrations were built by create_all(), so each table
+is only created if it is missing; 0002 brings older shapes up to date.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("aes"):
+        op.create_table(
+            "aes",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("working_start", sa.Time(), nullable=False),
+            sa.Column("working_end", sa.Time(), nullable=False),
+        )
+
+    if _missing("merchant_bookings"):
+        op.create_table(
+            "merchant_bookings",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("merchant_name", sa.String(), nullable=False),
+            sa.Column("address", sa.String(), nullable=False),
+            sa.Column("contact_number", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column(
+                "products_interested",
+                postgresql.JSONB(),
+                nullable=False,
+                server_default=sa.text("'[]'::jsonb"),
+            ),
+            sa.Column("preferred_time", sa.DateTime(), nullable=False),
+            sa.Column("website_links", sa.String()),
+            sa.Column("social_media", sa.String()),
+            sa.Column("restaurant_category", sa.String(), nullable=False),
+            sa.Column("number_of_outlets", sa.String(), nullable=False),
+            sa.Column("current_pain_points", sa.Text()),
+            sa.Column("special_notes", sa.Text()),
+            sa.Column("assigned_ae_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("aes.id")),
+            sa.Column("scheduled_time", sa.DateTime()),
+            sa.Column("meeting_link", sa.String()),
+            sa.Column("prep_brief_status", sa.String()),
+            sa.Column("status", sa.String(), server_default="upcoming"),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+    if _missing("prep_briefs"):
+        op.create_table(
+            "prep_briefs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "merchant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("merchant_bookings.id"), nullable=False
+            ),
+            sa.Column("ae_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("aes.id"), nullable=False),
+            sa.Column("insights", sa.Text(), nullable=False),
+            sa.Column("pain_points_summary", sa.Text(), nullable=False),
+            sa.Column("relevant_features", sa.Text(), nullable=False),
+            sa.Column("pitch_suggestions", sa.Text(), nullable=False),
+            sa.Column("company_insights", sa.Text()),
+            sa.Column("relevant_product_features", sa.Text()),
+            sa.Column("status", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("prep_briefs")
+    op.drop_table("merchant_bookings")
+    op.drop_table("aes")
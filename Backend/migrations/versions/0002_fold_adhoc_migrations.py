@@ -0,0 +1,140 @@
+"""fold in the ad-hoc migration scripts
+
+Replaces migrate_add_status.py, migrate_add_enhanced_fields.py and
+migrate_products_jsonb.py for databases created before those columns existed.
+Every step checks the current shape first, so it is a no-op on fresh databases.
+
+products_interested is converted to JSONB without rewriting the table under
+an ACCESS EXCLUSIVE lock, which ALTER COLUMN ... TYPE would take: a jsonb
+column is added, backfilled in batches while a trigger converts concurrent
+writes, and swapped in with catalog-only changes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Rows that aren't valid JSON (hand-edited data) are split on commas/semicolons.
+# Not in pg_temp: the sync trigger runs it in other sessions' writes
+PRODUCTS_TO_JSONB = r"""
+CREATE OR REPLACE FUNCTION products_to_jsonb_0002(raw text) RETURNS jsonb AS $$
+BEGIN
+    IF raw IS NULL OR btrim(raw) = '' THEN
+        RETURN '[]'::jsonb;
+    END IF;
+    RETURN raw::jsonb;
+EXCEPTION WHEN others THEN
+    RETURN to_jsonb(array_remove(regexp_split_to_array(btrim(raw), '\s*[,;]\s*'), ''));
+END
+$$ LANGUAGE plpgsql
+"""
+
+SYNC_PRODUCTS_JSONB = """
+CREATE OR REPLACE FUNCTION sync_products_jsonb_0002() RETURNS trigger AS $$
+BEGIN
+    NEW.products_interested_jsonb := products_to_jsonb_0002(NEW.products_interested);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# Keyset batches over the primary key; rows written meanwhile are converted by the trigger
+BACKFILL_PRODUCTS_JSONB = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM merchant_bookings WHERE id > :after ORDER BY id LIMIT :size
+    )
+    UPDATE merchant_bookings m
+    SET products_interested_jsonb = products_to_jsonb_0002(m.products_interested)
+    FROM batch
+    WHERE m.id = batch.id
+    RETURNING m.id
+    """
+)
+
+
+def _columns(table: str) -> dict:
+    return {c["name"]: c for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    bookings = _columns("merchant_bookings")
+
+    # migrate_add_status.py
+    if "status" not in bookings:
+        op.add_column("merchant_bookings", sa.Column("status", sa.String(), server_default="upcoming"))
+        op.execute(
+            """
+            UPDATE merchant_bookings
+            SET status = CASE
+                WHEN prep_brief_status != 'Generated' THEN 'prep-needed'
+                ELSE 'upcoming'
+            END
+            """
+        )
+
+    # migrate_add_enhanced_fields.py
+    briefs = _columns("prep_briefs")
+    for column in ("company_insights", "relevant_product_features"):
+        if column not in briefs:
+            op.add_column("prep_briefs", sa.Column(column, sa.Text()))
+
+    # migrate_products_jsonb.py
+    products = bookings["products_interested"]
+    if not isinstance(products["type"], postgresql.JSONB):
+        _convert_products_to_jsonb(not_null=not products["nullable"])
+
+
+def _convert_products_to_jsonb(not_null: bool) -> None:
+    with op.get_context().autocommit_block():
+        op.execute(PRODUCTS_TO_JSONB)
+        op.execute(SYNC_PRODUCTS_JSONB)
+        # No default, so adding the column is metadata-only
+        op.execute("ALTER TABLE merchant_bookings ADD COLUMN IF NOT EXISTS products_interested_jsonb jsonb")
+        op.execute("DROP TRIGGER IF EXISTS sync_products_jsonb_0002 ON merchant_bookings")
+        op.execute(
+            "CREATE TRIGGER sync_products_jsonb_0002 BEFORE INSERT OR UPDATE OF products_interested "
+            "ON merchant_bookings FOR EACH ROW EXECUTE FUNCTION sync_products_jsonb_0002()"
+        )
+
+        bind = op.get_bind()
+        after = "00000000-0000-0000-0000-000000000000"
+        while True:
+            ids = bind.execute(BACKFILL_PRODUCTS_JSONB, {"after": after, "size": BACKFILL_BATCH_SIZE}).scalars().all()
+            if not ids:
+                break
+            after = str(max(ids))
+
+        if not_null:
+            # A validated CHECK lets SET NOT NULL below skip its full-table scan
+            op.execute(
+                "ALTER TABLE merchant_bookings ADD CONSTRAINT products_interested_jsonb_not_null "
+                "CHECK (products_interested_jsonb IS NOT NULL) NOT VALID"
+            )
+            op.execute("ALTER TABLE merchant_bookings VALIDATE CONSTRAINT products_interested_jsonb_not_null")
+
+    # The swap: catalog changes only, in one transaction so writers never see a missing column
+    op.execute("DROP TRIGGER sync_products_jsonb_0002 ON merchant_bookings")
+    op.execute("ALTER TABLE merchant_bookings DROP COLUMN products_interested")
+    op.execute("ALTER TABLE merchant_bookings RENAME COLUMN products_interested_jsonb TO products_interested")
+    op.execute("ALTER TABLE merchant_bookings ALTER COLUMN products_interested SET DEFAULT '[]'::jsonb")
+    if not_null:
+        op.execute("ALTER TABLE merchant_bookings ALTER COLUMN products_interested SET NOT NULL")
+        op.execute("ALTER TABLE merchant_bookings DROP CONSTRAINT products_interested_jsonb_not_null")
+    op.execute("DROP FUNCTION sync_products_jsonb_0002()")
+    op.execute("DROP FUNCTION products_to_jsonb_0002(text)")
+
+
+def downgrade() -> None:
+    # The folded scripts were never reversible; leave the columns in place
+    pass
@@ -0,0 +1,59 @@
+"""brief_jobs, brief_cache and data_versions tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("brief_jobs"):
+        op.create_table(
+            "brief_jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "merchant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("merchant_bookings.id"), nullable=False
+            ),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("error", sa.Text()),
+            sa.Column("brief_id", postgresql.UUID(as_uuid=True)),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("started_at", sa.DateTime()),
+            sa.Column("finished_at", sa.DateTime()),
+        )
+
+    if _missing("brief_cache"):
+        op.create_table(
+            "brief_cache",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("model", sa.String(), nullable=False),
+            sa.Column("prompt_version", sa.String(), nullable=False),
+            sa.Column("payload", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+    if _missing("data_versions"):
+        op.create_table(
+            "data_versions",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("version", sa.BigInteger(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
+    op.drop_table("brief_cache")
+    op.drop_table("brief_jobs")
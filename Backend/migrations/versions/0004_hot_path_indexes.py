@@ -0,0 +1,76 @@
+"""hot-path indexes, built concurrently
+
+CREATE INDEX CONCURRENTLY can't run inside a transaction, so each index is
+built in an autocommit block and doesn't block writes to production tables.
+A build that failed part-way leaves an INVALID index behind that IF NOT
+EXISTS would skip, so those are dropped and rebuilt.
+
+merchant_bookings.assigned_ae_id needs no index of its own: it leads
+ix_merchant_bookings_ae_scheduled_time.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Keep in step with the Index() declarations in database.py
+INDEXES = [
+    # /demos keyset pagination
+    ("ix_merchant_bookings_scheduled_time_id", "merchant_bookings (scheduled_time, id)"),
+    # /demos?sort=merchant_name keyset pagination
+    ("ix_merchant_bookings_merchant_name_id", "merchant_bookings (merchant_name, id)"),
+    # /calendar-events status + time window
+    ("ix_merchant_bookings_status_scheduled_time", "merchant_bookings (status, scheduled_time)"),
+    # Per-AE views and AE lookups, covering so they can be index-only scans
+    (
+        "ix_merchant_bookings_ae_scheduled_time",
+        "merchant_bookings (assigned_ae_id, scheduled_time, id) "
+        "INCLUDE (merchant_name, restaurant_category, status, prep_brief_status, meeting_link)",
+    ),
+    # /demos?product= containment
+    (
+        "ix_merchant_bookings_products_interested",
+        "merchant_bookings USING GIN (products_interested jsonb_path_ops)",
+    ),
+    # /demos?q= full-text search; must match BOOKING_SEARCH_DOCUMENT
+    (
+        "ix_merchant_bookings_search",
+        "merchant_bookings USING GIN (to_tsvector('english', coalesce(merchant_name, '') || ' ' "
+        "|| coalesce(current_pain_points, '') || ' ' || coalesce(special_notes, '')))",
+    ),
+    # /prep-brief/{merchant_id}
+    ("ix_prep_briefs_merchant_id", "prep_briefs (merchant_id)"),
+    # Workers claim the oldest queued job
+    ("ix_brief_jobs_status_created_at", "brief_jobs (status, created_at)"),
+    # Pre-generation skips bookings that already have a queued/running job
+    ("ix_brief_jobs_merchant_id_status", "brief_jobs (merchant_id, status)"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for name, definition in INDEXES:
+            invalid = bind.execute(
+                sa.text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": name},
+            ).scalar()
+            if invalid:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
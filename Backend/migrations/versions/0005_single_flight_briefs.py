@@ -0,0 +1,63 @@
+"""one brief per booking, one active brief job per booking
+
+Replaces ix_prep_briefs_merchant_id with a unique index so briefs are upserted,
+and ix_brief_jobs_merchant_id_status with a partial unique index over queued and
+running jobs so concurrent generate requests coalesce onto a single job.
+Existing duplicates are removed first: the newest brief per booking is kept, and
+all but the oldest active job per booking are marked failed.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+DEDUPE_BRIEFS = """
+DELETE FROM prep_briefs p
+USING (
+    SELECT id, row_number() OVER (PARTITION BY merchant_id ORDER BY created_at DESC NULLS LAST, id) AS n
+    FROM prep_briefs
+) ranked
+WHERE p.id = ranked.id AND ranked.n > 1
+"""
+
+DEDUPE_ACTIVE_JOBS = """
+UPDATE brief_jobs j
+SET status = 'failed', error = 'Superseded by an earlier job for the same booking', finished_at = now()
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY merchant_id ORDER BY created_at, id) AS n
+    FROM brief_jobs
+    WHERE status IN ('queued', 'running')
+) ranked
+WHERE j.id = ranked.id AND ranked.n > 1
+"""
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(DEDUPE_BRIEFS)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_prep_briefs_merchant_id")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY uq_prep_briefs_merchant_id ON prep_briefs (merchant_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_prep_briefs_merchant_id")
+
+        op.execute(DEDUPE_ACTIVE_JOBS)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_brief_jobs_active_merchant_id")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY uq_brief_jobs_active_merchant_id ON brief_jobs (merchant_id) "
+            "WHERE status IN ('queued', 'running')"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_brief_jobs_merchant_id_status")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_brief_jobs_merchant_id_status ON brief_jobs (merchant_id, status)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_brief_jobs_active_merchant_id")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_prep_briefs_merchant_id ON prep_briefs (merchant_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_prep_briefs_merchant_id")
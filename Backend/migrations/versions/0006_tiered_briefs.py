@@ -0,0 +1,27 @@
+"""draft briefs and upgrade jobs
+
+Adds prep_briefs.model, the model that wrote each brief, and brief_jobs.kind,
+which tells first-pass generation ("generate") from regenerating a draft brief
+with the final model ("upgrade"). Both are metadata-only column additions.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("prep_briefs", sa.Column("model", sa.String(), nullable=True))
+    op.add_column("brief_jobs", sa.Column("kind", sa.String(), nullable=False, server_default="generate"))
+
+
+def downgrade() -> None:
+    op.drop_column("brief_jobs", "kind")
+    op.drop_column("prep_briefs", "model")
@@ -0,0 +1,25 @@
+"""retry failed upgrade jobs after a backoff
+
+Adds brief_jobs.run_after: a queued job is not claimed before it. Failed
+upgrade jobs are queued again with it set instead of being marked failed.
+A nullable column with no default, so the addition is metadata-only.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("brief_jobs", sa.Column("run_after", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("brief_jobs", "run_after")
@@ -0,0 +1,25 @@
+"""per-AE timezones for working hours
+
+Adds aes.timezone, the IANA zone working_start/working_end are local to.
+Existing AEs get 'UTC', which is how their hours were checked before. A
+constant default, so the addition is metadata-only.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("aes", sa.Column("timezone", sa.String(), nullable=False, server_default="UTC"))
+
+
+def downgrade() -> None:
+    op.drop_column("aes", "timezone")
@@ -31,6 +31,18 @@ class DemoCard(BaseModel):
     specialNotes: Optional[str] = None
 
 
+class AEDemoSummary(BaseModel):
+    """Compact per-AE demo row; every field comes from the covering index."""
+
+    id: str
+    merchantName: str
+    category: str
+    scheduledDateTime: str
+    status: str
+    prepBriefStatus: str
+    meetingLink: str
+
+
 class ConfirmationCard(BaseModel):
     """Shape for merchant confirmation card (after booking)."""
 
@@ -64,6 +76,19 @@ class BookDemoResponse(ConfirmationCard):
     pass
 
 
+class ImportRowError(BaseModel):
+    row: int  # 1-based record number, excluding the CSV header
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    """Outcome of a bulk booking import."""
+
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
+
+
 # ---------- Internal Entities ----------
 
 
@@ -73,6 +98,7 @@ class AE(BaseModel):
     email: EmailStr
     working_start: time
     working_end: time
+    timezone: str = "UTC"  # IANA name; working hours are local to it
     booked_slots: List[datetime] = Field(default_factory=list)
 
 
@@ -104,7 +130,24 @@ class PrepBrief(BaseModel):
     pain_points_summary: str
     relevant_features: str
     pitch_suggestions: str
-    status: str = "Pending"
+    status: str = "Pending"  # "Draft" until the final model's brief replaces it, then "Generated"
+    model: Optional[str] = None  # model that wrote the brief; None for mock briefs
+
+
+class BriefJob(BaseModel):
+    """Background prep brief generation job, as returned to pollers."""
+
+    id: UUID
+    merchant_id: UUID
+    kind: str = "generate"  # "generate" | "upgrade" (regenerate a draft with the final model)
+    status: str  # "queued" | "running" | "done" | "failed"
+    attempts: int = 0
+    error: Optional[str] = None
+    brief_id: Optional[UUID] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    run_after: Optional[datetime] = None  # set while a failed upgrade waits to be retried
 
 
 class EnhancedPrepBrief(BaseModel):
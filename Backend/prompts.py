@@ -0,0 +1,291 @@
+"""
+Versioned prompt templates for prep brief generation, with token counting and budgeting
+
+Templates are registered by name and version and never edited once shipped:
+add a new version instead, so cache keys, metrics and the prompt benchmark
+(benchmarks/prompts.py) can tell them apart. The active brief template is
+the latest version unless BRIEF_PROMPT_VERSION pins another.
+
+Token counts use tiktoken once the model's encoding has loaded. Loading may
+download it, so it runs in a background thread and counts are a
+whitespace/punctuation estimate until then, or if it cannot be loaded.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import tiktoken
+
+from .config import config
+from .models import MerchantBooking
+
+# Free-text booking fields that the token budget may shorten, in the order they are rendered
+TRUNCATABLE_FIELDS = ("pain_points", "special_notes")
+TRUNCATION_MARK = "…"
+# Per-message framing tokens in the chat format, plus the reply primer
+MESSAGE_OVERHEAD_TOKENS = 3
+REPLY_OVERHEAD_TOKENS = 3
+
+
+class PromptTemplate(NamedTuple):
+    name: str
+    version: str
+    system: str
+    user: str  # str.format template over the fields from brief_fields()
+    defaults: Dict[str, str] = {}  # shown for empty fields instead of "None"
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}-v{self.version}"
+
+    def render(self, fields: Dict[str, Optional[str]]) -> List[dict]:
+        values = {name: value or self.defaults.get(name, "None") for name, value in fields.items()}
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.format(**values)},
+        ]
+
+
+PROMPTS: Dict[str, Dict[str, PromptTemplate]] = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    versions = PROMPTS.setdefault(template.name, {})
+    if template.version in versions:
+        raise ValueError(f"Prompt {template.key} is already registered; add a new version instead")
+    versions[template.version] = template
+    return template
+
+
+def get_prompt(name: str, version: Optional[str] = None) -> PromptTemplate:
+    """A registered template; the highest version when version is None."""
+    versions = PROMPTS[name]
+    if version is None:
+        return versions[max(versions, key=int)]
+    try:
+        return versions[version]
+    except KeyError:
+        raise ValueError(f"Unknown prompt version {name}-v{version}; registered: {sorted(versions)}") from None
+
+
+# The original brief prompt (trailing whitespace trimmed), kept for pinning and as the benchmark baseline
+register(PromptTemplate(
+    name="brief",
+    version="1",
+    system=(
+        "You are an expert sales consultant specializing in restaurant technology solutions with deep knowledge of POS systems, inventory management, online ordering, and restaurant operations. You excel at analyzing business challenges and providing actionable insights for sales professionals."
+    ),
+    user="""
+        You are an AI assistant helping an Account Executive prepare for a demo with a restaurant client.
+        Your task is to create a comprehensive, detailed prep brief that will help the AE understand the merchant's
+        business context, challenges, and how to effectively pitch our solutions.
+
+        CLIENT INFORMATION:
+        - Restaurant Name: {merchant_name}
+        - Category: {category}
+        - Number of Outlets: {outlets}
+        - Products Interested: {products}
+        - Current Pain Points: {pain_points}
+        - Special Notes: {special_notes}
+        - Contact: {contact_number} | {email}
+        - Address: {address}
+        - Website: {website}
+        - Social Media: {social_media}
+
+        REQUIREMENTS:
+        Please provide a comprehensive prep brief with the following sections:
+
+        1. COMPANY INSIGHTS: Analyze the restaurant's business model, market position, operational challenges, and growth opportunities. Consider their category, outlet count, and any patterns in their pain points.
+
+        2. PAIN POINTS SUMMARY: Expand on their current challenges with detailed analysis. Identify root causes, business impact, and how these challenges affect their operations, revenue, and customer experience.
+
+        3. RELEVANT PRODUCT FEATURES: Recommend specific features and solutions that directly address their pain points. Focus on ROI, efficiency gains, and competitive advantages they would achieve.
+
+        4. PITCH SUGGESTIONS: Provide specific talking points, approach recommendations, and conversation starters. Include objection handling strategies and success metrics to emphasize.
+
+        FORMAT REQUIREMENTS:
+        Format the response as JSON with these exact keys:
+        {{
+            "company_insights": "Detailed company analysis and business context (2-3 paragraphs)",
+            "pain_points_summary": "Comprehensive pain points analysis with business impact (2-3 paragraphs)",
+            "relevant_product_features": ["Feature 1 with benefit", "Feature 2 with benefit", "Feature 3 with benefit"],
+            "pitch_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3", "Suggestion 4"]
+        }}
+
+        IMPORTANT: Make the content rich in detail, actionable, and fully informative for a sales pitch.
+        Base all insights on the provided merchant information and industry knowledge of restaurant operations.
+        """,
+    defaults={"website": "Not specified", "social_media": "Not specified"},
+))
+
+# Same sections and JSON keys as v1 without the indentation, repetition and contact details the brief never uses
+register(PromptTemplate(
+    name="brief",
+    version="2",
+    system=(
+        "You are a sales consultant for restaurant technology (POS, payments, online ordering, inventory). "
+        "You write actionable demo prep briefs for Account Executives."
+    ),
+    user=(
+        "Write a demo prep brief for this restaurant.\n"
+        "Name: {merchant_name}\n"
+        "Category: {category}\n"
+        "Outlets: {outlets}\n"
+        "Products of interest: {products}\n"
+        "Pain points: {pain_points}\n"
+        "Notes: {special_notes}\n"
+        "Address: {address}\n"
+        "Website: {website}\n"
+        "Social: {social_media}\n"
+        "\n"
+        "Reply with JSON only, using these keys:\n"
+        "company_insights: business model, market position, challenges and growth opportunities (2-3 paragraphs)\n"
+        "pain_points_summary: root causes and impact on operations, revenue and guests (2-3 paragraphs)\n"
+        "relevant_product_features: list of 3+ features, each with its benefit or ROI\n"
+        "pitch_suggestions: list of 4 talking points, including objection handling and metrics to stress"
+    ),
+))
+
+
+def brief_fields(booking: MerchantBooking) -> Dict[str, Optional[str]]:
+    """Booking values for the brief templates' placeholders."""
+    return {
+        "merchant_name": booking.merchant_name,
+        "category": booking.restaurant_category,
+        "outlets": booking.number_of_outlets,
+        "products": ", ".join(booking.products_interested),
+        "pain_points": booking.current_pain_points,
+        "special_notes": booking.special_notes,
+        "contact_number": booking.contact_number,
+        "email": booking.email,
+        "address": booking.address,
+        "website": booking.website_links,
+        "social_media": booking.social_media,
+    }
+
+
+# Runs of whitespace, words (with one leading space) and punctuation: roughly how BPE tokenizers split text
+_PIECES = re.compile(r"\s+(?=\s)|\s?\w+|\s?[^\w\s]+|\s+")
+
+
+class Tokenizer:
+    """Token counting and truncation for one model; estimates until load() has fetched the encoding."""
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.encoding = None
+        self._load_lock = threading.Lock()
+        self._loaded = False
+
+    def load(self) -> "Tokenizer":
+        """Load the tiktoken encoding, blocking (it may be downloaded); later calls return at once."""
+        with self._load_lock:
+            if not self._loaded:
+                self.encoding = _load_encoding(self.model)
+                self._loaded = True
+        return self
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return sum(_estimate(piece) for piece in _PIECES.findall(text))
+
+    def count_messages(self, messages: List[dict]) -> int:
+        return REPLY_OVERHEAD_TOKENS + sum(MESSAGE_OVERHEAD_TOKENS + self.count(m["content"]) for m in messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Shorten text to at most max_tokens, cutting at a word boundary and marking the cut."""
+        if self.count(text) <= max_tokens:
+            return text
+        budget = max_tokens - self.count(TRUNCATION_MARK)
+        if budget <= 0:
+            return TRUNCATION_MARK
+        if self.encoding is not None:
+            head = self.encoding.decode(self.encoding.encode(text)[:budget])
+        else:
+            head, used = "", 0
+            for piece in _PIECES.findall(text):
+                used += _estimate(piece)
+                if used > budget:
+                    break
+                head += piece
+        if not text[len(head):len(head) + 1].isspace() and len(head.split()) > 1:
+            head = head.rsplit(None, 1)[0]  # drop the partial last word
+        return head.rstrip() + TRUNCATION_MARK
+
+
+def _estimate(piece: str) -> int:
+    return 1 + (len(piece) - 1) // 8
+
+
+def _load_encoding(model: str):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # encodings are downloaded on first use and may be unreachable
+        print(f"⚠️  tiktoken encoding for {model} unavailable ({type(e).__name__}); estimating prompt tokens")
+        return None
+
+
+_tokenizers: Dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(model: str) -> Tokenizer:
+    """The shared Tokenizer for model, never blocking: the first call starts loading it in a background thread."""
+    with _tokenizers_lock:
+        tokenizer = _tokenizers.get(model)
+        if tokenizer is None:
+            tokenizer = _tokenizers[model] = Tokenizer(model)
+            threading.Thread(target=tokenizer.load, name=f"tiktoken-{model}", daemon=True).start()
+    return tokenizer
+
+
+def render_within_budget(
+    template: PromptTemplate,
+    fields: Dict[str, Optional[str]],
+    tokenizer: Tokenizer,
+    budget: int,
+) -> List[dict]:
+    """Render template, shortening TRUNCATABLE_FIELDS so the messages fit in budget tokens (0 = no limit).
+
+    The tokens left after the rest of the prompt are shared evenly between
+    the fields, a field shorter than its share passing the remainder on,
+    so the same booking and budget always produce the same prompt. Only the
+    free-text fields shrink; if the prompt is over budget without them,
+    they are reduced to the truncation mark.
+    """
+    messages = template.render(fields)
+    if budget <= 0 or tokenizer.count_messages(messages) <= budget:
+        return messages
+
+    base = tokenizer.count_messages(template.render({**fields, **{name: "" for name in TRUNCATABLE_FIELDS}}))
+    sizes = {name: tokenizer.count(fields[name] or "") for name in TRUNCATABLE_FIELDS}
+    available = max(budget - base, 0)
+    shortened = dict(fields)
+    pending = sorted(TRUNCATABLE_FIELDS, key=lambda name: (sizes[name], TRUNCATABLE_FIELDS.index(name)))
+    while pending:
+        name = pending.pop(0)
+        share = available // (len(pending) + 1)
+        allowed = min(sizes[name], share)
+        if allowed < sizes[name]:
+            shortened[name] = tokenizer.truncate(fields[name] or "", allowed)
+        available -= allowed
+    return template.render(shortened)
+
+
+BRIEF_PROMPT = get_prompt("brief", config.BRIEF_PROMPT_VERSION)
+
+
+def render_brief_messages(booking: MerchantBooking, model: str, template: PromptTemplate = BRIEF_PROMPT) -> List[dict]:
+    """Chat messages for prep brief generation by model, under the configured token budget in model's tokens."""
+    tokenizer = get_tokenizer(model)
+    return render_within_budget(template, brief_fields(booking), tokenizer, config.BRIEF_PROMPT_TOKEN_BUDGET)
@@ -0,0 +1,412 @@
+"""
+Storage interface behind the API routes
+
+Routes, bulk import/export, streaming and AE assignment go through a
+BookingRepository instead of SQLAlchemy sessions. SqlRepository is the
+Postgres implementation; InMemoryRepository (db.py) runs the same API with no
+external services for local development, tests and benchmarks.
+STORAGE_BACKEND picks one.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .briefs import load_brief_context, load_prep_brief, save_prep_brief
+from .changes import notify_change
+from .config import config
+from .database import (
+    AEModel,
+    AsyncSessionLocal,
+    BOOKING_SEARCH_DOCUMENT,
+    BriefJobModel,
+    MerchantBookingModel,
+)
+from .etag import bump_data_version, current_data_version
+from .jobs import enqueue_brief_job, fail_brief_job, requeue_brief_job, start_brief_job, wait_for_brief_job
+from .models import AE, MerchantBooking, PrepBrief
+from .serialization import AE_DEMO_COLUMNS, CALENDAR_EVENT_COLUMNS, DEMO_CARD_COLUMNS, demo_card
+
+# A booking, AE or job: an ORM model, a SQLAlchemy row or an in-memory record,
+# all exposing the ORM column names as attributes
+Record = Any
+
+# Statuses shown on the calendar
+CALENDAR_STATUSES = ("upcoming", "prep-needed")
+
+
+class SlotConflictError(Exception):
+    """Raised when a new booking overlaps one already stored for its AE, e.g. booked by another process."""
+
+
+class DemoFilters(NamedTuple):
+    """Filters, order and keyset position for a page of bookings."""
+
+    status: Optional[List[str]] = None
+    ae_id: Optional[UUID] = None
+    category: Optional[str] = None
+    outlets: Optional[str] = None
+    product: Optional[str] = None
+    scheduled_from: Optional[datetime] = None  # naive UTC, like the stored times
+    scheduled_to: Optional[datetime] = None
+    q: Optional[str] = None
+    sort: str = "scheduled_time"  # "scheduled_time" or "merchant_name"; prefix "-" for descending
+    after: Optional[Tuple[Any, UUID]] = None  # (sort value, id) of the last row already returned
+
+
+class BookingRepository(ABC):
+    """Everything the API reads and writes. Each write commits and publishes its change event."""
+
+    @abstractmethod
+    async def data_version(self) -> int:
+        """Counter bumped by every booking or brief write; drives the ETags."""
+
+    # AEs and bookings
+
+    @abstractmethod
+    async def ae_exists(self, ae_id: UUID) -> bool: ...
+
+    @abstractmethod
+    async def assignment_snapshot(self, since: datetime) -> Tuple[List[Record], List[Tuple[UUID, datetime]]]:
+        """Every AE, and (ae_id, scheduled_time) for each assigned booking from `since` onwards."""
+
+    @abstractmethod
+    async def booking_with_ae_name(self, booking_id: UUID) -> Optional[Tuple[Record, Optional[str]]]: ...
+
+    @abstractmethod
+    async def list_demos(self, filters: DemoFilters, limit: int) -> List[Tuple[Record, Optional[str]]]:
+        """Up to `limit` (booking, AE name) pairs matching `filters`, in sort order."""
+
+    @abstractmethod
+    async def list_ae_demos(self, ae_id: UUID, filters: DemoFilters, limit: int) -> List[Record]:
+        """One AE's bookings by (scheduled_time, id); uses the status, window and `after` filters."""
+
+    @abstractmethod
+    async def calendar_events(
+        self, start: Optional[datetime], end: Optional[datetime], ae_id: Optional[UUID]
+    ) -> List[Tuple[Record, Optional[str]]]:
+        """Scheduled, not yet completed bookings in [start, end) with AE names, by scheduled time."""
+
+    @abstractmethod
+    def export_batches(self, batch_size: int) -> AsyncIterator[Sequence[Sequence[Any]]]:
+        """Every booking as an export.EXPORT_COLUMNS tuple, by scheduled time, in batches."""
+
+    @abstractmethod
+    async def create_booking(self, values: Dict[str, Any], ae_name: str) -> Record:
+        """Insert a booking. Raises SlotConflictError if its AE is already booked then."""
+
+    @abstractmethod
+    async def insert_bookings(self, values: List[Dict[str, Any]]) -> None:
+        """Insert a chunk of bookings in one transaction. Raises SlotConflictError as create_booking does."""
+
+    @abstractmethod
+    async def complete_demo(self, booking_id: UUID) -> bool:
+        """Mark a booking completed; False if it doesn't exist."""
+
+    # Briefs and brief jobs
+
+    @abstractmethod
+    async def brief_context(self, merchant_id: UUID) -> Tuple[MerchantBooking, AE]:
+        """Booking and assigned AE for generation. Raises BriefGenerationError."""
+
+    @abstractmethod
+    async def prep_brief(self, merchant_id: UUID) -> Optional[PrepBrief]: ...
+
+    @abstractmethod
+    async def save_prep_brief(self, brief: PrepBrief, job_id: Optional[UUID] = None) -> None:
+        """Store (or replace) the booking's brief and mark `job_id` done."""
+
+    @abstractmethod
+    async def brief_job(self, job_id: UUID) -> Optional[Record]: ...
+
+    @abstractmethod
+    async def enqueue_brief_job(self, merchant_id: UUID) -> Record:
+        """Queue generation for a booking, or return its job that is already queued or running."""
+
+    @abstractmethod
+    async def start_brief_job(self, merchant_id: UUID) -> Tuple[Record, bool]:
+        """Claim a running job for an inline generation; (job, False) if one is already in flight."""
+
+    @abstractmethod
+    async def fail_brief_job(self, job_id: UUID, merchant_id: UUID, error: str) -> None: ...
+
+    @abstractmethod
+    async def requeue_brief_job(self, job_id: UUID) -> None:
+        """Hand a running job whose client went away back to background generation."""
+
+    @abstractmethod
+    async def wait_for_brief_job(self, job_id: UUID, merchant_id: UUID, timeout: float) -> Optional[Record]:
+        """Wait until the job is done or failed. Raises asyncio.TimeoutError."""
+
+
+# /demos sort keys, each backed by a (column, id) index for keyset pagination
+DEMO_SORT_COLUMNS = {
+    "scheduled_time": MerchantBookingModel.scheduled_time,
+    "merchant_name": MerchantBookingModel.merchant_name,
+}
+
+
+# Namespace (first key) of the per-AE transaction-level advisory locks held while inserting bookings
+AE_SLOT_LOCK_KEY = 724_190_003
+
+# Any stored booking of the same AE starting less than one demo length either side of a new one
+SLOT_OVERLAP_CHECK = text(
+    "SELECT 1 FROM merchant_bookings b "
+    "JOIN unnest(CAST(:ae_ids AS uuid[]), CAST(:starts AS timestamp[])) AS r(ae_id, start_time) "
+    "ON b.assigned_ae_id = r.ae_id "
+    "AND b.scheduled_time > r.start_time - CAST(:duration AS interval) "
+    "AND b.scheduled_time < r.start_time + CAST(:duration AS interval) "
+    "LIMIT 1"
+)
+
+
+class SqlRepository(BookingRepository):
+    """Postgres storage through one AsyncSession."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def data_version(self) -> int:
+        return await current_data_version(self.db)
+
+    async def ae_exists(self, ae_id: UUID) -> bool:
+        return await self.db.get(AEModel, ae_id) is not None
+
+    async def assignment_snapshot(self, since: datetime) -> Tuple[List[Record], List[Tuple[UUID, datetime]]]:
+        aes = (await self.db.execute(select(AEModel))).scalars().all()
+        rows = await self.db.execute(
+            select(MerchantBookingModel.assigned_ae_id, MerchantBookingModel.scheduled_time).where(
+                MerchantBookingModel.assigned_ae_id.isnot(None),
+                MerchantBookingModel.scheduled_time >= since,
+            )
+        )
+        return list(aes), [tuple(row) for row in rows]
+
+    async def booking_with_ae_name(self, booking_id: UUID) -> Optional[Tuple[Record, Optional[str]]]:
+        row = (
+            await self.db.execute(
+                select(MerchantBookingModel, AEModel.name)
+                .outerjoin(AEModel, AEModel.id == MerchantBookingModel.assigned_ae_id)
+                .where(MerchantBookingModel.id == booking_id)
+            )
+        ).first()
+        return tuple(row) if row else None
+
+    async def list_demos(self, filters: DemoFilters, limit: int) -> List[Tuple[Record, Optional[str]]]:
+        # Bookings joined to their AE in one query, paged by (sort key, id)
+        descending = filters.sort.startswith("-")
+        sort_column = DEMO_SORT_COLUMNS[filters.sort.lstrip("-")]
+        order = (sort_column.desc(), MerchantBookingModel.id.desc()) if descending else (sort_column, MerchantBookingModel.id)
+        query = (
+            select(*DEMO_CARD_COLUMNS, AEModel.name.label("ae_name"))
+            .outerjoin(AEModel, AEModel.id == MerchantBookingModel.assigned_ae_id)
+            .order_by(*order)
+        )
+        if filters.status:
+            query = query.where(MerchantBookingModel.status.in_(filters.status))
+        if filters.ae_id:
+            query = query.where(MerchantBookingModel.assigned_ae_id == filters.ae_id)
+        if filters.category:
+            query = query.where(MerchantBookingModel.restaurant_category == filters.category)
+        if filters.outlets:
+            query = query.where(MerchantBookingModel.number_of_outlets == filters.outlets)
+        if filters.product:
+            # JSONB containment (@>) is served by the GIN index on products_interested
+            query = query.where(MerchantBookingModel.products_interested.contains([filters.product]))
+        if filters.scheduled_from:
+            query = query.where(MerchantBookingModel.scheduled_time >= filters.scheduled_from)
+        if filters.scheduled_to:
+            query = query.where(MerchantBookingModel.scheduled_time < filters.scheduled_to)
+        if filters.q and filters.q.strip():
+            # Same expression as ix_merchant_bookings_search, so the GIN index applies
+            query = query.where(
+                BOOKING_SEARCH_DOCUMENT.op("@@")(func.websearch_to_tsquery(text("'english'"), filters.q))
+            )
+        if filters.after:
+            position = tuple_(sort_column, MerchantBookingModel.id)
+            query = query.where(position < filters.after if descending else position > filters.after)
+
+        rows = (await self.db.execute(query.limit(limit))).all()
+        return [(row, row.ae_name) for row in rows]
+
+    async def list_ae_demos(self, ae_id: UUID, filters: DemoFilters, limit: int) -> List[Record]:
+        # Every selected column is in ix_merchant_bookings_ae_scheduled_time: an index-only scan
+        query = (
+            select(*AE_DEMO_COLUMNS)
+            .where(MerchantBookingModel.assigned_ae_id == ae_id, MerchantBookingModel.scheduled_time.isnot(None))
+            .order_by(MerchantBookingModel.scheduled_time, MerchantBookingModel.id)
+        )
+        if filters.status:
+            query = query.where(MerchantBookingModel.status.in_(filters.status))
+        if filters.scheduled_from:
+            query = query.where(MerchantBookingModel.scheduled_time >= filters.scheduled_from)
+        if filters.scheduled_to:
+            query = query.where(MerchantBookingModel.scheduled_time < filters.scheduled_to)
+        if filters.after:
+            query = query.where(
+                tuple_(MerchantBookingModel.scheduled_time, MerchantBookingModel.id) > filters.after
+            )
+        return list((await self.db.execute(query.limit(limit))).all())
+
+    async def calendar_events(
+        self, start: Optional[datetime], end: Optional[datetime], ae_id: Optional[UUID]
+    ) -> List[Tuple[Record, Optional[str]]]:
+        query = (
+            select(*CALENDAR_EVENT_COLUMNS, AEModel.name.label("ae_name"))
+            .outerjoin(AEModel, AEModel.id == MerchantBookingModel.assigned_ae_id)
+            .where(
+                MerchantBookingModel.status.in_(CALENDAR_STATUSES),
+                MerchantBookingModel.scheduled_time.isnot(None),
+            )
+        )
+        # Range predicates on scheduled_time use ix_merchant_bookings_status_scheduled_time
+        if start:
+            query = query.where(MerchantBookingModel.scheduled_time >= start)
+        if end:
+            query = query.where(MerchantBookingModel.scheduled_time < end)
+        if ae_id:
+            # Index-only scan of ix_merchant_bookings_ae_scheduled_time
+            query = query.where(MerchantBookingModel.assigned_ae_id == ae_id)
+        rows = (await self.db.execute(query.order_by(MerchantBookingModel.scheduled_time))).all()
+        return [(row, row.ae_name) for row in rows]
+
+    async def export_batches(self, batch_size: int) -> AsyncIterator[Sequence[Sequence[Any]]]:
+        # Read from a server-side cursor so memory use is independent of row count
+        b = MerchantBookingModel
+        query = (
+            select(
+                b.id,
+                b.merchant_name,
+                b.restaurant_category,
+                b.scheduled_time,
+                AEModel.name,
+                b.status,
+                b.prep_brief_status,
+                b.meeting_link,
+                b.email,
+                b.contact_number,
+                b.products_interested,
+                b.number_of_outlets,
+                b.created_at,
+            )
+            .outerjoin(AEModel, AEModel.id == b.assigned_ae_id)
+            .order_by(b.scheduled_time, b.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(query)
+        async for batch in result.partitions():
+            yield batch
+
+    async def _claim_slots(self, values: List[Dict[str, Any]]) -> None:
+        """Lock the bookings' AEs until commit and reject bookings that overlap stored ones.
+
+        The assignment engine only sees other processes' bookings when it
+        refreshes, so this is what keeps two workers from double-booking an AE.
+        """
+        slots = [(row["assigned_ae_id"], row["scheduled_time"]) for row in values if row.get("assigned_ae_id") and row.get("scheduled_time")]
+        if not slots:
+            return
+        # Same order in every transaction, so two chunks sharing AEs can't deadlock
+        for ae_id in sorted({str(ae_id) for ae_id, _ in slots}):
+            await self.db.execute(
+                text("SELECT pg_advisory_xact_lock(:key, hashtext(:ae_id))"), {"key": AE_SLOT_LOCK_KEY, "ae_id": ae_id}
+            )
+        overlap = (
+            await self.db.execute(
+                SLOT_OVERLAP_CHECK,
+                {
+                    "ae_ids": [ae_id for ae_id, _ in slots],
+                    "starts": [start for _, start in slots],
+                    "duration": timedelta(minutes=config.DEMO_DURATION_MINUTES),
+                },
+            )
+        ).first()
+        if overlap:
+            await self.db.rollback()
+            raise SlotConflictError("An assigned AE is already booked at that time")
+
+    async def create_booking(self, values: Dict[str, Any], ae_name: str) -> Record:
+        await self._claim_slots([values])
+        booking = MerchantBookingModel(**values)
+        self.db.add(booking)
+        await self.db.flush()
+        await bump_data_version(self.db)
+        # Full card so open dashboards can insert it without refetching /demos
+        await notify_change(self.db, {"type": "booking_created", "demo": demo_card(booking, ae_name)})
+        await self.db.commit()
+        return booking
+
+    async def insert_bookings(self, values: List[Dict[str, Any]]) -> None:
+        try:
+            await self._claim_slots(values)
+            # executemany; SQLAlchemy batches these into multi-row INSERT statements
+            await self.db.execute(insert(MerchantBookingModel), values)
+            await bump_data_version(self.db)
+            await notify_change(self.db, {"type": "bookings_imported", "count": len(values)})
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def complete_demo(self, booking_id: UUID) -> bool:
+        booking = await self.db.get(MerchantBookingModel, booking_id)
+        if not booking:
+            return False
+
+        booking.status = "completed"
+        await bump_data_version(self.db)
+        await notify_change(self.db, {"type": "demo_completed", "id": str(booking_id)})
+        await self.db.commit()
+        return True
+
+    async def brief_context(self, merchant_id: UUID) -> Tuple[MerchantBooking, AE]:
+        return await load_brief_context(self.db, merchant_id)
+
+    async def prep_brief(self, merchant_id: UUID) -> Optional[PrepBrief]:
+        return await load_prep_brief(self.db, merchant_id)
+
+    async def save_prep_brief(self, brief: PrepBrief, job_id: Optional[UUID] = None) -> None:
+        await save_prep_brief(self.db, brief, job_id)
+
+    async def brief_job(self, job_id: UUID) -> Optional[Record]:
+        return await self.db.get(BriefJobModel, job_id)
+
+    async def enqueue_brief_job(self, merchant_id: UUID) -> Record:
+        return await enqueue_brief_job(self.db, merchant_id)
+
+    async def start_brief_job(self, merchant_id: UUID) -> Tuple[Record, bool]:
+        return await start_brief_job(self.db, merchant_id)
+
+    async def fail_brief_job(self, job_id: UUID, merchant_id: UUID, error: str) -> None:
+        await fail_brief_job(self.db, job_id, merchant_id, error)
+
+    async def requeue_brief_job(self, job_id: UUID) -> None:
+        await requeue_brief_job(self.db, job_id)
+
+    async def wait_for_brief_job(self, job_id: UUID, merchant_id: UUID, timeout: float) -> Optional[Record]:
+        # Polls with short-lived sessions of its own rather than holding this one
+        return await wait_for_brief_job(job_id, merchant_id, timeout)
+
+
+@asynccontextmanager
+async def repository_session() -> AsyncIterator[BookingRepository]:
+    """A repository for one unit of work: a fresh session on Postgres, the shared store in memory mode."""
+    if config.STORAGE_BACKEND == "memory":
+        from .db import memory_repository  # db.py builds on this module
+
+        yield memory_repository
+        return
+    async with AsyncSessionLocal() as db:
+        yield SqlRepository(db)
+
+
+# Route dependency
+async def get_repository() -> AsyncIterator[BookingRepository]:
+    async with repository_session() as repo:
+        yield repo
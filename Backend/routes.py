@@ -1,65 +1,129 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
-from typing import List
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from prometheus_client import generate_latest
 
-from .database import get_db, AEModel, MerchantBookingModel, PrepBriefModel
+from .brief_cache import brief_cache
+from .assignment import ASSIGNMENT_ATTEMPTS, assignment_engine, naive_utc
+from .briefs import UPGRADE_JOB, BriefGenerationError
+from .bulk_import import IMPORT_FORMATS, import_bookings
+from .database import async_engine, engine
+from .etag import conditional_response
+from .export import EXPORT_MEDIA_TYPES, export_csv, export_ndjson
+from .llm_gateway import llm_gateway
+from .metrics import PROMETHEUS_CONTENT_TYPE, InstrumentedRoute, pool_stats, registry
+from .repository import BookingRepository, DemoFilters, SlotConflictError, get_repository
+from .serialization import ae_demo_summary, calendar_event, demo_card, trusted_json
+from .streaming import stream_brief_events, stream_change_events, stream_joined_brief_events
 from .models import (
-    AE,
+    AEDemoSummary,
     BookDemoRequest,
     BookDemoResponse,
+    BriefJob,
+    BulkImportResponse,
     ConfirmationCard,
     DemoCard,
-    MerchantBooking,
     PrepBrief,
 )
-from .utils import assign_ae, calendar_mock_book, create_meeting_link, generate_ai_brief
+from .utils import (
+    create_meeting_link,
+    current_brief_cache_key,
+    decode_cursor,
+    draft_model,
+    encode_cursor,
+)
+
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+DEMOS_PAGE_SIZE = 100
+DEMOS_MAX_PAGE_SIZE = 500
+
+# /demos sort keys, each with the parser for its cursor value
+DEMOS_SORT_KEYS = {
+    "scheduled_time": datetime.fromisoformat,
+    "merchant_name": str,
+}
+DEMOS_DEFAULT_SORT = "scheduled_time"
+DEMOS_SORT_PATTERN = f"^-?({'|'.join(DEMOS_SORT_KEYS)})$"
 
 
-router = APIRouter()
+def _scheduled_window(start: Optional[datetime], end: Optional[datetime]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """A from/to query window in naive UTC, like stored times, so aware and naive bounds compare."""
+    start = naive_utc(start) if start else None
+    end = naive_utc(end) if end else None
+    if start and end and end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    return start, end
+
+
+def _cursor_position(cursor: Optional[str], sort: str) -> Optional[Tuple[Any, UUID]]:
+    """The (sort value, id) a page cursor resumes after; 400 if it is malformed or was issued for another sort."""
+    if not cursor:
+        return None
+    try:
+        cursor_sort, after_value, after_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError("cursor was issued for a different sort")
+        return (DEMOS_SORT_KEYS[sort.lstrip("-")](after_value), after_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.get("/")
 def root():
   return {"status": "ok"}
 
 @router.post("/book-demo", response_model=BookDemoResponse)
-async def book_demo(payload: BookDemoRequest, db: Session = Depends(get_db)) -> BookDemoResponse:
-    # Get all AEs
-    aes = db.query(AEModel).all()
-    if not aes:
-        raise HTTPException(status_code=500, detail="No AEs available in system.")
-    
-    # Simple round-robin assignment for demo
-    ae = aes[0]  # For demo, just assign to first AE
-    
-    # Create booking
-    booking = MerchantBookingModel(
-        merchant_name=payload.merchantName,
-        address=payload.address,
-        contact_number=payload.contactNumber,
-        email=payload.email,
-        products_interested=json.dumps(payload.productsInterested),
-        preferred_time=payload.preferredDateTime,
-        website_links=payload.website,
-        social_media=payload.socialMedia,
-        restaurant_category=payload.category,
-        number_of_outlets=payload.outlets,
-        current_pain_points=payload.painPoints or "",
-        special_notes=payload.specialNotes,
-        assigned_ae_id=ae.id,
-        scheduled_time=payload.preferredDateTime,
-        meeting_link=create_meeting_link(),
-        prep_brief_status="Pending",
-    )
-    
-    db.add(booking)
-    db.commit()
-    db.refresh(booking)
+async def book_demo(payload: BookDemoRequest, repo: BookingRepository = Depends(get_repository)) -> BookDemoResponse:
+    # Stored in naive UTC columns; reserve and store the same value
+    start = naive_utc(payload.preferredDateTime)
+    for _ in range(ASSIGNMENT_ATTEMPTS):
+        # Least-loaded AE who is working and free for the whole demo
+        ae = await assignment_engine.assign(repo, start)
+        if ae is None:
+            if not assignment_engine.schedules:
+                raise HTTPException(status_code=500, detail="No AEs available in system.")
+            raise HTTPException(status_code=409, detail="No AE is available at the requested time.")
+        
+        # Create booking
+        values = dict(
+            merchant_name=payload.merchantName,
+            address=payload.address,
+            contact_number=payload.contactNumber,
+            email=payload.email,
+            products_interested=payload.productsInterested,
+            preferred_time=start,
+            website_links=payload.website,
+            social_media=payload.socialMedia,
+            restaurant_category=payload.category,
+            number_of_outlets=payload.outlets,
+            current_pain_points=payload.painPoints or "",
+            special_notes=payload.specialNotes,
+            assigned_ae_id=ae.ae_id,
+            scheduled_time=start,
+            meeting_link=create_meeting_link(),
+            prep_brief_status="Pending",
+        )
+        try:
+            booking = await repo.create_booking(values, ae.name)
+        except SlotConflictError:
+            # Another process booked this AE first; reload schedules and pick again
+            assignment_engine.release(ae.ae_id, start)
+            assignment_engine.invalidate()
+            continue
+        except BaseException:
+            assignment_engine.release(ae.ae_id, start)
+            raise
+        assignment_engine.confirm(ae.ae_id, start)
+        break
+    else:
+        raise HTTPException(status_code=409, detail="No AE is available at the requested time.")
 
     # Response matches frontend confirmation shape
     return BookDemoResponse(
@@ -70,191 +134,289 @@ async def book_demo(payload: BookDemoRequest, db: Session = Depends(get_db)) ->
     )
 
 
+@router.post("/bookings/import", response_model=BulkImportResponse)
+async def import_bookings_bulk(request: Request, repo: BookingRepository = Depends(get_repository)) -> BulkImportResponse:
+    """Bulk-create bookings from a streamed CSV (text/csv) or NDJSON (application/x-ndjson) body.
+
+    Rows use the /book-demo field names; in CSV, products_interested is a
+    JSON array or a semicolon-separated list. Valid rows are imported even
+    when others fail; every failure is reported with its row number.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type; use one of: {', '.join(IMPORT_FORMATS)}",
+        )
+    return await import_bookings(repo, request.stream(), fmt)
+
+
 @router.get("/merchant/{merchant_id}", response_model=ConfirmationCard)
-def get_merchant_confirmation(merchant_id: UUID, db: Session = Depends(get_db)) -> ConfirmationCard:
-    booking = db.query(MerchantBookingModel).filter(MerchantBookingModel.id == merchant_id).first()
-    if not booking:
+async def get_merchant_confirmation(merchant_id: UUID, repo: BookingRepository = Depends(get_repository)) -> ConfirmationCard:
+    row = await repo.booking_with_ae_name(merchant_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Merchant booking not found")
     
-    ae = db.query(AEModel).filter(AEModel.id == booking.assigned_ae_id).first() if booking.assigned_ae_id else None
+    booking, ae_name = row
     return ConfirmationCard(
         merchantName=booking.merchant_name,
-        aeName=ae.name if ae else "",
+        aeName=ae_name or "",
         scheduledDateTime=booking.scheduled_time.isoformat() if booking.scheduled_time else "",
         meetingLink=booking.meeting_link or "",
     )
 
 
 @router.get("/demos", response_model=List[DemoCard])
-def list_demos(db: Session = Depends(get_db)) -> List[DemoCard]:
-    # Return all bookings as AE dashboard expects
-    result: List[DemoCard] = []
-    bookings = db.query(MerchantBookingModel).all()
-    
-    for b in bookings:
-        ae_name = ""
-        if b.assigned_ae_id:
-            ae = db.query(AEModel).filter(AEModel.id == b.assigned_ae_id).first()
-            ae_name = ae.name if ae else ""
-        
-        # Use the status field from database, fallback to logic if not set
-        status = b.status if hasattr(b, 'status') and b.status else ("prep-needed" if b.prep_brief_status != "Generated" else "upcoming")
-        
-        # Parse products_interested from JSON string
-        products_list = []
-        try:
-            products_list = json.loads(b.products_interested) if b.products_interested else []
-        except:
-            products_list = []
-        
-        result.append(
-            DemoCard(
-                id=str(b.id),
-                merchantName=b.merchant_name,
-                category=b.restaurant_category,
-                scheduledDateTime=(b.scheduled_time or b.preferred_time).isoformat(),
-                aeName=ae_name,
-                status=status,
-                meetingLink=b.meeting_link or create_meeting_link(),
-                address=b.address,
-                contactNumber=b.contact_number,
-                email=b.email,
-                website=b.website_links,
-                socialMedia=b.social_media,
-                productsInterested=", ".join(products_list),
-                outlets=b.number_of_outlets,
-                painPoints=b.current_pain_points,
-                specialNotes=b.special_notes,
-            )
-        )
-    return result
-
+async def list_demos(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    limit: int = Query(DEMOS_PAGE_SIZE, ge=1, le=DEMOS_MAX_PAGE_SIZE),
+    status: Optional[List[str]] = Query(None, description="upcoming, prep-needed or completed; repeat for several"),
+    ae_id: Optional[UUID] = Query(None, description="Assigned AE"),
+    category: Optional[str] = Query(None, description="Restaurant category (exact)"),
+    outlets: Optional[str] = Query(None, description="Outlet bucket, e.g. '2-5 Locations'"),
+    product: Optional[str] = Query(None, description="Only merchants interested in this product (exact name)"),
+    scheduled_from: Optional[datetime] = Query(None, alias="from", description="Scheduled at or after"),
+    scheduled_to: Optional[datetime] = Query(None, alias="to", description="Scheduled before"),
+    q: Optional[str] = Query(None, description="Full-text search over merchant name, pain points and notes"),
+    sort: str = Query(DEMOS_DEFAULT_SORT, pattern=DEMOS_SORT_PATTERN, description="Sort key; prefix '-' for descending"),
+    repo: BookingRepository = Depends(get_repository),
+) -> List[DemoCard]:
+    scheduled_from, scheduled_to = _scheduled_window(scheduled_from, scheduled_to)
+    not_modified = await conditional_response(request, response, repo)
+    if not_modified:
+        return not_modified
 
-@router.post("/generate-brief/{merchant_id}", response_model=PrepBrief)
-async def generate_brief(merchant_id: UUID, db: Session = Depends(get_db)) -> PrepBrief:
-    booking = db.query(MerchantBookingModel).filter(MerchantBookingModel.id == merchant_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Merchant booking not found")
-    if not booking.assigned_ae_id:
-        raise HTTPException(status_code=400, detail="No AE assigned to booking")
-    
-    ae = db.query(AEModel).filter(AEModel.id == booking.assigned_ae_id).first()
-    if not ae:
-        raise HTTPException(status_code=400, detail="Assigned AE not found")
-
-    # Convert to Pydantic models for AI function
-    booking_pydantic = MerchantBooking(
-        id=booking.id,
-        merchant_name=booking.merchant_name,
-        address=booking.address,
-        contact_number=booking.contact_number,
-        email=booking.email,
-        products_interested=json.loads(booking.products_interested) if booking.products_interested else [],
-        preferred_time=booking.preferred_time,
-        website_links=booking.website_links,
-        social_media=booking.social_media,
-        restaurant_category=booking.restaurant_category,
-        number_of_outlets=booking.number_of_outlets,
-        current_pain_points=booking.current_pain_points,
-        special_notes=booking.special_notes,
-        assigned_ae=booking.assigned_ae_id,
-        scheduled_time=booking.scheduled_time,
-        meeting_link=booking.meeting_link,
-        prep_brief_status=booking.prep_brief_status,
+    after = _cursor_position(cursor, sort)
+    filters = DemoFilters(
+        status=status,
+        ae_id=ae_id,
+        category=category,
+        outlets=outlets,
+        product=product,
+        scheduled_from=scheduled_from,
+        scheduled_to=scheduled_to,
+        q=q,
+        sort=sort,
+        after=after,
     )
-    
-    ae_pydantic = AE(
-        id=ae.id,
-        name=ae.name,
-        email=ae.email,
-        working_start=ae.working_start,
-        working_end=ae.working_end,
-        booked_slots=[]  # Not used in AI generation
+
+    # Fetch one extra row to know whether another page exists
+    rows = await repo.list_demos(filters, limit + 1)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, _ = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(sort, getattr(last, sort.lstrip("-")), last.id)
+
+    # response_model documents the shape; the rows are trusted and skip re-validation
+    return trusted_json([demo_card(row, ae_name) for row, ae_name in rows], response)
+
+
+@router.get("/demos/export")
+async def export_demos(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+) -> StreamingResponse:
+    """Stream every booking with its AE name and brief status; memory use is independent of row count."""
+    body = export_csv() if format == "csv" else export_ndjson()
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="demos.{format}"'},
     )
 
-    brief_pydantic = await generate_ai_brief(booking_pydantic, ae_pydantic)
-    
-    # Save to database
-    brief = PrepBriefModel(
-        merchant_id=booking.id,
-        ae_id=ae.id,
-        insights=brief_pydantic.insights,
-        pain_points_summary=brief_pydantic.pain_points_summary,
-        relevant_features=brief_pydantic.relevant_features,
-        pitch_suggestions=brief_pydantic.pitch_suggestions,
-        status="Generated",
+
+@router.get("/aes/{ae_id}/demos", response_model=List[AEDemoSummary])
+async def list_ae_demos(
+    ae_id: UUID,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    limit: int = Query(DEMOS_PAGE_SIZE, ge=1, le=DEMOS_MAX_PAGE_SIZE),
+    status: Optional[List[str]] = Query(None, description="upcoming, prep-needed or completed; repeat for several"),
+    scheduled_from: Optional[datetime] = Query(None, alias="from", description="Scheduled at or after"),
+    scheduled_to: Optional[datetime] = Query(None, alias="to", description="Scheduled before"),
+    repo: BookingRepository = Depends(get_repository),
+) -> List[AEDemoSummary]:
+    """One AE's demos in schedule order; on Postgres, read entirely from the covering per-AE index."""
+    scheduled_from, scheduled_to = _scheduled_window(scheduled_from, scheduled_to)
+    not_modified = await conditional_response(request, response, repo)
+    if not_modified:
+        return not_modified
+    if not await repo.ae_exists(ae_id):
+        raise HTTPException(status_code=404, detail="AE not found")
+
+    after = _cursor_position(cursor, "scheduled_time")
+    filters = DemoFilters(status=status, scheduled_from=scheduled_from, scheduled_to=scheduled_to, after=after)
+
+    rows = await repo.list_ae_demos(ae_id, filters, limit + 1)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor("scheduled_time", last.scheduled_time, last.id)
+
+    return trusted_json([ae_demo_summary(row) for row in rows], response)
+
+
+@router.post("/generate-brief/{merchant_id}", response_model=BriefJob, status_code=202)
+async def generate_brief(merchant_id: UUID, response: Response, repo: BookingRepository = Depends(get_repository)) -> BriefJob:
+    """Queue prep brief generation; poll the returned job for completion.
+
+    While a booking's brief is queued or being generated, every caller gets
+    that same job back instead of starting another generation.
+    """
+    try:
+        await repo.brief_context(merchant_id)
+    except BriefGenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    job = await repo.enqueue_brief_job(merchant_id)
+    response.headers["Location"] = f"/brief-jobs/{job.id}"
+    return BriefJob.model_validate(job, from_attributes=True)
+
+
+@router.get("/generate-brief/{merchant_id}/stream")
+async def stream_brief(merchant_id: UUID, repo: BookingRepository = Depends(get_repository)) -> StreamingResponse:
+    """Generate a prep brief and push each section as a Server-Sent Event as soon as it is complete.
+
+    If the booking's brief is already being generated (another tab, a queued
+    job, another worker), the stream waits for that generation and replays its
+    result instead of calling the model again.
+    """
+    try:
+        booking, ae = await repo.brief_context(merchant_id)
+    except BriefGenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    # Commits, releasing the connection; the stream persists the brief with its own session
+    job, owner = await repo.start_brief_job(merchant_id)
+
+    if owner:
+        events = stream_brief_events(booking, ae, job.id)
+    else:
+        events = stream_joined_brief_events(job.id, merchant_id, upgrading=job.kind == UPGRADE_JOB)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    
-    db.add(brief)
-    booking.prep_brief_status = "Generated"
-    db.commit()
-    db.refresh(brief)
-    
-    return brief_pydantic
+
+
+@router.get("/brief-jobs/{job_id}", response_model=BriefJob)
+async def get_brief_job(job_id: UUID, repo: BookingRepository = Depends(get_repository)) -> BriefJob:
+    job = await repo.brief_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Brief job not found")
+    return BriefJob.model_validate(job, from_attributes=True)
 
 
 @router.get("/prep-brief/{merchant_id}", response_model=PrepBrief)
-def get_prep_brief(merchant_id: UUID, db: Session = Depends(get_db)) -> PrepBrief:
-    brief = db.query(PrepBriefModel).filter(PrepBriefModel.merchant_id == merchant_id).first()
+async def get_prep_brief(
+    merchant_id: UUID, request: Request, response: Response, repo: BookingRepository = Depends(get_repository)
+) -> PrepBrief:
+    not_modified = await conditional_response(request, response, repo)
+    if not_modified:
+        return not_modified
+
+    brief = await repo.prep_brief(merchant_id)
     if not brief:
         raise HTTPException(status_code=404, detail="Prep brief not found")
+    return brief
+
+
+@router.delete("/prep-brief/{merchant_id}/cache")
+async def invalidate_merchant_brief_cache(merchant_id: UUID, repo: BookingRepository = Depends(get_repository)):
+    """Drop the cached briefs matching this booking's current context and model settings (draft model too)."""
+    try:
+        booking, _ = await repo.brief_context(merchant_id)
+    except BriefGenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
-    return PrepBrief(
-        id=brief.id,
-        merchant_id=brief.merchant_id,
-        ae_id=brief.ae_id,
-        insights=brief.company_insights or brief.insights,  # Use enhanced field if available
-        pain_points_summary=brief.pain_points_summary,
-        relevant_features=brief.relevant_product_features or brief.relevant_features,  # Use enhanced field if available
-        pitch_suggestions=brief.pitch_suggestions,
-        status=brief.status,
-    )
+    key = current_brief_cache_key(booking)
+    result = {"key": key, "invalidated": await brief_cache.invalidate(key)}
+    model = draft_model()
+    if model:
+        draft_key = current_brief_cache_key(booking, model)
+        result.update(draft_key=draft_key, draft_invalidated=await brief_cache.invalidate(draft_key))
+    return result
+
+
+@router.delete("/brief-cache/{key}")
+async def invalidate_brief_cache_entry(key: str):
+    """Drop a single brief cache entry by key."""
+    return {"key": key, "invalidated": await brief_cache.invalidate(key)}
+
+
+@router.delete("/brief-cache")
+async def clear_brief_cache():
+    """Drop every cached brief."""
+    return {"invalidated": await brief_cache.clear()}
 
 
 @router.get("/calendar-events")
-def calendar_events_mock(db: Session = Depends(get_db)):
-    # Return actual demo bookings for calendar display
-    bookings = db.query(MerchantBookingModel).filter(
-        MerchantBookingModel.status.in_(["upcoming", "prep-needed"])
-    ).all()
-    
-    calendar_events = []
-    for booking in bookings:
-        if booking.scheduled_time:
-            ae_name = ""
-            if booking.assigned_ae_id:
-                ae = db.query(AEModel).filter(AEModel.id == booking.assigned_ae_id).first()
-                ae_name = ae.name if ae else ""
-            
-            calendar_events.append({
-                "id": str(booking.id),
-                "merchant_name": booking.merchant_name,
-                "scheduled_time": booking.scheduled_time.isoformat(),
-                "ae_name": ae_name,
-                "category": booking.restaurant_category,
-                "status": booking.status,
-                "meeting_link": booking.meeting_link or "",
-                "prep_brief_status": booking.prep_brief_status,
-            })
+async def calendar_events_mock(
+    request: Request,
+    response: Response,
+    from_: Optional[datetime] = Query(None, alias="from", description="Window start (inclusive)"),
+    to: Optional[datetime] = Query(None, description="Window end (exclusive)"),
+    ae_id: Optional[UUID] = Query(None, description="Only this AE's demos"),
+    repo: BookingRepository = Depends(get_repository),
+):
+    # Return demo bookings in the visible calendar window, joined to AE names
+    from_, to = _scheduled_window(from_, to)
+    not_modified = await conditional_response(request, response, repo)
+    if not_modified:
+        return not_modified
+
+    rows = await repo.calendar_events(from_, to, ae_id)
+    calendar_events = [calendar_event(row, ae_name) for row, ae_name in rows]
     
-    return {
+    return trusted_json({
         "events": calendar_events,
         "total_events": len(calendar_events)
-    }
+    }, response)
+
+
+@router.get("/changes")
+async def booking_changes(request: Request) -> StreamingResponse:
+    """Server-Sent Events feed of booking changes for live dashboards.
+
+    Events: `booking_created` (full demo card), `bookings_imported`,
+    `brief_generated`, `demo_completed`, and `resync` when the client may
+    have missed events and should refetch /demos.
+    """
+    return StreamingResponse(
+        stream_change_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.put("/demos/{demo_id}/complete")
-def mark_demo_complete(demo_id: UUID, db: Session = Depends(get_db)):
+async def mark_demo_complete(demo_id: UUID, repo: BookingRepository = Depends(get_repository)):
     """Mark a demo as completed."""
-    booking = db.query(MerchantBookingModel).filter(MerchantBookingModel.id == demo_id).first()
-    
-    if not booking:
+    if not await repo.complete_demo(demo_id):
         raise HTTPException(status_code=404, detail="Demo not found")
     
-    booking.status = "completed"
-    db.commit()
-    db.refresh(booking)
-    
     return {"message": "Demo marked as completed", "status": "completed"}
 
 
+@router.get("/metrics")
+def prometheus_metrics():
+    """Request, SQL, LLM and connection pool metrics for this worker, in Prometheus text format."""
+    return Response(content=generate_latest(registry), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/metrics/pool")
+def connection_pool_metrics():
+    """Live connection pool occupancy and checkout wait histograms for this worker."""
+    return {
+        "async": pool_stats(async_engine.pool),
+        "sync": pool_stats(engine.pool),
+    }
+
+
+@router.get("/metrics/llm")
+def llm_gateway_metrics():
+    """Circuit breaker state and in-flight OpenAI calls for this worker."""
+    return llm_gateway.status()
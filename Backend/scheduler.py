@@ -0,0 +1,135 @@
+"""
+Periodic pre-generation of prep briefs for upcoming demos
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from .config import config
+from .database import (
+    ACTIVE_JOB_PREDICATE,
+    ACTIVE_JOB_STATUSES,
+    AsyncSessionLocal,
+    BriefJobModel,
+    MerchantBookingModel,
+)
+from .jobs import brief_workers
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock
+PREGEN_LOCK_KEY = 724_190_001
+
+
+class BriefPregenerationScheduler:
+    """Queues brief jobs for demos starting within the horizon that have no brief yet.
+
+    Every worker process runs this loop, but each sweep takes a transaction-level
+    advisory lock, so only one process scans and enqueues at a time; the others
+    skip that tick. Generation itself runs on the bounded brief job worker pool.
+    A booking whose jobs failed waits retry_backoff, doubled per failure, before
+    it is queued again, and is left alone after BRIEF_JOB_MAX_ATTEMPTS failures.
+    """
+
+    def __init__(self, interval: float, horizon: timedelta, batch_size: int, retry_backoff: float) -> None:
+        self.interval = interval
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.retry_backoff = retry_backoff
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+        print(f"✅ Brief pre-generation scheduled every {self.interval:g}s for demos in the next {self.horizon}")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                queued = await self.run_once()
+                if queued:
+                    print(f"🗓️  Queued {queued} prep briefs for upcoming demos")
+            except Exception as e:
+                print(f"❌ Brief pre-generation sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """Run one sweep. Returns the number of jobs queued (0 if another process holds the lock)."""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            locked = (await db.execute(select(func.pg_try_advisory_xact_lock(PREGEN_LOCK_KEY)))).scalar()
+            if not locked:
+                return 0
+
+            in_flight = select(BriefJobModel.merchant_id).where(BriefJobModel.status.in_(ACTIVE_JOB_STATUSES))
+            failures = (
+                select(
+                    BriefJobModel.merchant_id,
+                    func.count().label("count"),
+                    func.max(BriefJobModel.finished_at).label("last"),
+                )
+                .where(BriefJobModel.status == "failed")
+                .group_by(BriefJobModel.merchant_id)
+                .subquery()
+            )
+            backoff = func.make_interval(0, 0, 0, 0, 0, 0, self.retry_backoff * func.power(2, failures.c.count - 1))
+            merchant_ids = (
+                await db.execute(
+                    select(MerchantBookingModel.id)
+                    .outerjoin(failures, failures.c.merchant_id == MerchantBookingModel.id)
+                    .where(
+                        MerchantBookingModel.scheduled_time >= now,
+                        MerchantBookingModel.scheduled_time < now + self.horizon,
+                        MerchantBookingModel.prep_brief_status.is_distinct_from("Generated"),
+                        MerchantBookingModel.status != "completed",
+                        MerchantBookingModel.assigned_ae_id.isnot(None),
+                        MerchantBookingModel.id.not_in(in_flight),
+                        # Deterministic failures would otherwise be retried, and billed, every sweep
+                        or_(
+                            failures.c.count.is_(None),
+                            and_(failures.c.count < config.BRIEF_JOB_MAX_ATTEMPTS, failures.c.last < now - backoff),
+                        ),
+                    )
+                    .order_by(MerchantBookingModel.scheduled_time)
+                    .limit(self.batch_size)
+                )
+            ).scalars().all()
+
+            queued = 0
+            if merchant_ids:
+                # A request may have queued one of these since the scan; keep its job
+                result = await db.execute(
+                    insert(BriefJobModel)
+                    .values(
+                        [
+                            dict(id=uuid4(), merchant_id=merchant_id, status="queued", attempts=0, created_at=now)
+                            for merchant_id in merchant_ids
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=[BriefJobModel.merchant_id], index_where=text(ACTIVE_JOB_PREDICATE))
+                    .returning(BriefJobModel.id)
+                )
+                queued = len(result.all())
+            # Committing also releases the advisory lock
+            await db.commit()
+
+        if queued:
+            brief_workers.notify()
+        return queued
+
+
+brief_scheduler = BriefPregenerationScheduler(
+    interval=config.BRIEF_PREGEN_INTERVAL,
+    horizon=timedelta(hours=config.BRIEF_PREGEN_HORIZON_HOURS),
+    batch_size=config.BRIEF_PREGEN_BATCH_SIZE,
+    retry_backoff=config.BRIEF_PREGEN_RETRY_BACKOFF,
+)
@@ -0,0 +1,117 @@
+"""
+Trusted fast path for list responses
+
+Rows written through the API were validated on the way in, so the read routes
+select plain columns, build dicts directly and serialize them with orjson
+instead of hydrating ORM objects and re-validating every row through
+DemoCard and response_model.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Response
+
+from .database import MerchantBookingModel
+from .utils import create_meeting_link
+
+# Columns behind a DemoCard; select these plus the AE name instead of whole entities
+DEMO_CARD_COLUMNS = (
+    MerchantBookingModel.id,
+    MerchantBookingModel.merchant_name,
+    MerchantBookingModel.restaurant_category,
+    MerchantBookingModel.scheduled_time,
+    MerchantBookingModel.preferred_time,
+    MerchantBookingModel.status,
+    MerchantBookingModel.prep_brief_status,
+    MerchantBookingModel.meeting_link,
+    MerchantBookingModel.address,
+    MerchantBookingModel.contact_number,
+    MerchantBookingModel.email,
+    MerchantBookingModel.website_links,
+    MerchantBookingModel.social_media,
+    MerchantBookingModel.products_interested,
+    MerchantBookingModel.number_of_outlets,
+    MerchantBookingModel.current_pain_points,
+    MerchantBookingModel.special_notes,
+)
+
+# Exactly the columns of ix_merchant_bookings_ae_scheduled_time, so per-AE lists never touch the heap
+AE_DEMO_COLUMNS = (
+    MerchantBookingModel.id,
+    MerchantBookingModel.merchant_name,
+    MerchantBookingModel.restaurant_category,
+    MerchantBookingModel.scheduled_time,
+    MerchantBookingModel.status,
+    MerchantBookingModel.prep_brief_status,
+    MerchantBookingModel.meeting_link,
+)
+
+CALENDAR_EVENT_COLUMNS = (
+    MerchantBookingModel.id,
+    MerchantBookingModel.merchant_name,
+    MerchantBookingModel.scheduled_time,
+    MerchantBookingModel.restaurant_category,
+    MerchantBookingModel.status,
+    MerchantBookingModel.meeting_link,
+    MerchantBookingModel.prep_brief_status,
+)
+
+
+def demo_card(b: Any, ae_name: Optional[str]) -> Dict[str, Any]:
+    """DemoCard-shaped dict from a booking row or model instance."""
+    # Use the status field from database, fallback to logic if not set
+    status = b.status or ("prep-needed" if b.prep_brief_status != "Generated" else "upcoming")
+    return {
+        "id": str(b.id),
+        "merchantName": b.merchant_name,
+        "category": b.restaurant_category,
+        "scheduledDateTime": (b.scheduled_time or b.preferred_time).isoformat(),
+        "aeName": ae_name or "",
+        "status": status,
+        "meetingLink": b.meeting_link or create_meeting_link(),
+        "address": b.address,
+        "contactNumber": b.contact_number,
+        "email": b.email,
+        "website": b.website_links,
+        "socialMedia": b.social_media,
+        "productsInterested": ", ".join(b.products_interested or []),
+        "outlets": b.number_of_outlets,
+        "painPoints": b.current_pain_points,
+        "specialNotes": b.special_notes,
+    }
+
+
+def ae_demo_summary(b: Any) -> Dict[str, Any]:
+    return {
+        "id": str(b.id),
+        "merchantName": b.merchant_name,
+        "category": b.restaurant_category,
+        "scheduledDateTime": b.scheduled_time.isoformat(),
+        "status": b.status,
+        "prepBriefStatus": b.prep_brief_status,
+        "meetingLink": b.meeting_link or "",
+    }
+
+
+def calendar_event(b: Any, ae_name: Optional[str]) -> Dict[str, Any]:
+    return {
+        "id": str(b.id),
+        "merchant_name": b.merchant_name,
+        "scheduled_time": b.scheduled_time.isoformat(),
+        "ae_name": ae_name or "",
+        "category": b.restaurant_category,
+        "status": b.status,
+        "meeting_link": b.meeting_link or "",
+        "prep_brief_status": b.prep_brief_status,
+    }
+
+
+def trusted_json(content: Any, response: Response) -> Response:
+    """Serialize with orjson, bypassing response_model validation.
+
+    FastAPI only merges headers set on the injected `response` when it builds
+    the response itself, so they are copied across here.
+    """
+    return Response(orjson.dumps(content), media_type="application/json", headers=dict(response.headers))
@@ -49,8 +49,8 @@ def setup_database():
     
     # Now create tables
     try:
-        from .database import create_tables, seed_data
-        create_tables()
+        from .database import run_migrations, seed_data
+        run_migrations()
         seed_data()
         print("✅ Tables created and seeded successfully!")
         return True
@@ -0,0 +1,248 @@
+"""
+Server-Sent Events streaming of prep brief generation
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Set, Tuple
+from uuid import UUID
+
+from fastapi import Request
+
+from .brief_cache import brief_cache
+from .changes import change_feed
+from .config import config
+from .llm_gateway import llm_gateway
+from .metrics import BRIEF_FALLBACKS
+from .models import AE, MerchantBooking, PrepBrief
+from .prompts import render_brief_messages
+from .repository import repository_session
+from .utils import (
+    DRAFT_STATUS,
+    _mock_generate_brief,
+    _parse_ai_response,
+    brief_from_ai_data,
+    cache_brief,
+    current_brief_cache_key,
+    draft_model,
+    format_brief_section,
+)
+
+# Streamed section name (the model's JSON key) -> PrepBrief field
+SECTION_FIELDS = {
+    "company_insights": "insights",
+    "pain_points_summary": "pain_points_summary",
+    "relevant_product_features": "relevant_features",
+    "pitch_suggestions": "pitch_suggestions",
+}
+
+
+class JSONSectionParser:
+    """Incrementally scans a streamed JSON object and returns each top-level
+    member as soon as its value is complete.
+
+    Text before the opening brace (e.g. a ```json fence) and after the closing
+    brace is ignored.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = -1
+        self._finished = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self._buffer += text
+        members: List[Tuple[str, Any]] = []
+        while self._pos < len(self._buffer) and not self._finished:
+            ch = self._buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._take_member(self._pos))
+                    self._finished = True
+            elif ch == "," and self._depth == 1:
+                members.extend(self._take_member(self._pos))
+                self._member_start = self._pos + 1
+            self._pos += 1
+        return members
+
+    def _take_member(self, end: int) -> List[Tuple[str, Any]]:
+        segment = self._buffer[self._member_start:end].strip()
+        if not segment:
+            return []
+        try:
+            return list(json.loads("{" + segment + "}").items())
+        except ValueError:
+            return []
+
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _background(coro: Awaitable[None]) -> None:
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _requeue_abandoned(job_id: UUID) -> None:
+    try:
+        async with repository_session() as repo:
+            await repo.requeue_brief_job(job_id)
+    except Exception as e:
+        print(f"❌ Failed to requeue brief job {job_id}: {e}")
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _section_events(brief: PrepBrief) -> Iterator[str]:
+    for section, field in SECTION_FIELDS.items():
+        yield sse_event("section", {"section": section, "content": getattr(brief, field)})
+
+
+async def stream_brief_events(booking: MerchantBooking, ae: AE, job_id: UUID) -> AsyncIterator[str]:
+    """Yield SSE frames for a brief as it is generated, then persist it.
+
+    Emits one `section` event per completed brief section, then `done` with
+    the stored brief. Cache hits and mock fallbacks emit every section at
+    once; a fallback after partial output re-sends all sections. With a
+    draft model configured the brief comes from it and is saved as a Draft,
+    which queues its upgrade to OPENAI_MODEL. The caller
+    owns `job_id` (status running); if the client disconnects before the
+    brief is saved, the job is handed back to the worker pool.
+    """
+    finished = False
+    try:
+        async for frame in _generate_brief_frames(booking, ae, job_id):
+            yield frame
+        finished = True
+    finally:
+        if not finished:
+            _background(_requeue_abandoned(job_id))
+
+
+async def _generate_brief_frames(booking: MerchantBooking, ae: AE, job_id: UUID) -> AsyncIterator[str]:
+    brief = None
+    model = draft_model() or config.OPENAI_MODEL
+    if config.OPENAI_API_KEY:
+        cache_key = current_brief_cache_key(booking, model) if config.BRIEF_CACHE_ENABLED else None
+        cached = await brief_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            brief = PrepBrief(merchant_id=booking.id, ae_id=ae.id, status="Generated", model=model, **cached)
+            for frame in _section_events(brief):
+                yield frame
+        else:
+            parser = JSONSectionParser()
+            ai_data: Dict[str, Any] = {}
+            content: List[str] = []
+            try:
+                async for delta in llm_gateway.stream_chat_completion(
+                    model=model,
+                    messages=render_brief_messages(booking, model),
+                    temperature=config.OPENAI_TEMPERATURE,
+                    max_tokens=config.OPENAI_MAX_TOKENS,
+                ):
+                    content.append(delta)
+                    for key, value in parser.feed(delta):
+                        ai_data[key] = value
+                        if key in SECTION_FIELDS:
+                            yield sse_event("section", {"section": key, "content": format_brief_section(value)})
+                
+                if not ai_data:
+                    # Fallback: extract sections from text
+                    ai_data = _parse_ai_response("".join(content))
+                brief = brief_from_ai_data(ai_data, booking, ae)
+                brief.model = model
+                if cache_key:
+                    await cache_brief(cache_key, brief)
+            except Exception as e:
+                print(f"OpenAI streaming error: {e}")
+                print("Falling back to mock brief generation")
+
+    if brief is None:
+        BRIEF_FALLBACKS.labels("llm_error" if config.OPENAI_API_KEY else "no_api_key").inc()
+        brief = _mock_generate_brief(booking, ae)
+        for frame in _section_events(brief):
+            yield frame
+    if draft_model():
+        brief.status = DRAFT_STATUS
+
+    try:
+        async with repository_session() as repo:
+            await repo.save_prep_brief(brief, job_id)
+    except Exception as e:
+        print(f"❌ Failed to save streamed brief: {e}")
+        async with repository_session() as repo:
+            await repo.fail_brief_job(job_id, booking.id, str(e))
+        yield sse_event("error", {"detail": "Brief generated but could not be saved"})
+        return
+    yield sse_event("done", brief.model_dump(mode="json"))
+
+
+async def stream_joined_brief_events(job_id: UUID, merchant_id: UUID, upgrading: bool = False) -> AsyncIterator[str]:
+    """Yield SSE frames for a generation someone else is running: wait, then replay the saved brief.
+
+    When the job is upgrading a draft (`upgrading`), the stored draft is
+    replayed straight away instead of waiting for the final model.
+    """
+    yield ": joined in-flight generation\n\n"
+    async with repository_session() as repo:
+        brief = await repo.prep_brief(merchant_id) if upgrading else None
+        if brief is None:
+            try:
+                job = await repo.wait_for_brief_job(job_id, merchant_id, timeout=config.BRIEF_JOB_TIMEOUT)
+            except asyncio.TimeoutError:
+                yield sse_event("error", {"detail": "Timed out waiting for brief generation"})
+                return
+            if job is None or job.status != "done":
+                yield sse_event("error", {"detail": (job.error if job else None) or "Brief generation failed"})
+                return
+            brief = await repo.prep_brief(merchant_id)
+    if brief is None:
+        yield sse_event("error", {"detail": "Brief generation failed"})
+        return
+    for frame in _section_events(brief):
+        yield frame
+    yield sse_event("done", brief.model_dump(mode="json"))
+
+
+async def stream_change_events(request: Request) -> AsyncIterator[str]:
+    """Yield SSE frames for booking changes until the client disconnects.
+
+    Each event is named by its `type`; a comment line is sent every
+    CHANGE_FEED_HEARTBEAT seconds so idle proxies keep the connection open.
+    """
+    async with change_feed.subscribe() as queue:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=config.CHANGE_FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_event(event.get("type", "change"), event)
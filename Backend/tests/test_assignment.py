@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, time, timedelta
+from uuid import uuid4
+
+import pytest
+
+from Backend.assignment import AESchedule, AssignmentEngine
+
+DURATION = timedelta(minutes=30)
+NOON = datetime(2031, 5, 5, 12, 0)
+
+
+@pytest.fixture
+def schedule():
+    schedule = AESchedule(uuid4(), "Sam", time(9, 0), time(17, 0))
+    schedule.book(NOON)
+    return schedule
+
+
+@pytest.mark.parametrize(
+    "offset, free",
+    [
+        (-30, True),  # ends exactly when the booking starts
+        (-29, False),
+        (-1, False),
+        (0, False),
+        (29, False),
+        (30, True),  # starts exactly when the booking ends
+        (90, True),
+    ],
+)
+def test_is_free_boundaries(schedule, offset, free):
+    assert schedule.is_free(NOON + timedelta(minutes=offset), DURATION) is free
+
+
+def test_is_free_between_back_to_back_bookings(schedule):
+    schedule.book(NOON + timedelta(minutes=60))
+    assert schedule.is_free(NOON + timedelta(minutes=30), DURATION)
+    assert not schedule.is_free(NOON + timedelta(minutes=31), DURATION)
+
+    schedule.release(NOON)
+    assert schedule.is_free(NOON, DURATION)
+
+
+@pytest.mark.parametrize(
+    "start, inside",
+    [
+        (datetime(2031, 5, 5, 9, 0), True),
+        (datetime(2031, 5, 5, 8, 59), False),
+        (datetime(2031, 5, 5, 16, 30), True),
+        (datetime(2031, 5, 5, 16, 31), False),
+        (datetime(2031, 5, 5, 23, 45), False),  # would end on the next day
+    ],
+)
+def test_within_working_hours(schedule, start, inside):
+    assert schedule.within_working_hours(start, DURATION) is inside
+
+
+@pytest.mark.parametrize(
+    "start, inside",
+    [
+        (datetime(2031, 5, 5, 3, 30), True),  # 09:00 in Kolkata
+        (datetime(2031, 5, 5, 3, 29), False),
+        (datetime(2031, 5, 5, 11, 0), True),  # 16:30 there
+        (datetime(2031, 5, 5, 12, 0), False),  # inside 9-17 UTC, but 17:30 there
+        (datetime(2031, 5, 4, 18, 15), False),  # 23:45 there, ends on the next local day
+    ],
+)
+def test_working_hours_are_local_to_the_ae(start, inside):
+    schedule = AESchedule(uuid4(), "Priya", time(9, 0), time(17, 0), "Asia/Kolkata")
+    assert schedule.within_working_hours(start, DURATION) is inside
+
+
+def test_working_hours_follow_daylight_saving():
+    schedule = AESchedule(uuid4(), "Sam", time(9, 0), time(17, 0), "America/New_York")
+    assert schedule.within_working_hours(datetime(2031, 1, 6, 14, 0), DURATION)  # 09:00 EST
+    assert not schedule.within_working_hours(datetime(2031, 7, 7, 12, 30), DURATION)  # 08:30 EDT
+    assert schedule.within_working_hours(datetime(2031, 7, 7, 13, 0), DURATION)  # 09:00 EDT
+
+
+class SnapshotRepo:
+    """Just the assignment_snapshot part of a repository: one AE and its committed bookings."""
+
+    def __init__(self) -> None:
+        self.ae = type("AE", (), dict(id=uuid4(), name="Sam", working_start=time(9, 0), working_end=time(17, 0), timezone="UTC"))
+        self.committed = []
+
+    async def assignment_snapshot(self, since):
+        return [self.ae], [(self.ae.id, start) for start in self.committed if start >= since]
+
+
+def test_pending_reservations_survive_a_rebuild():
+    async def scenario():
+        engine = AssignmentEngine(DURATION, refresh_interval=60)
+        repo = SnapshotRepo()
+        first = await engine.assign(repo, NOON)
+        assert first is not None
+
+        # A rebuild while the first booking is still being saved must not free its slot
+        engine.invalidate()
+        assert await engine.assign(repo, NOON) is None
+
+        # Committed and confirmed: later snapshots carry it, and it stays taken
+        repo.committed.append(NOON)
+        engine.confirm(first.ae_id, NOON)
+        engine.invalidate()
+        assert await engine.assign(repo, NOON + timedelta(minutes=15)) is None
+        assert engine.schedules[first.ae_id].starts == [NOON]
+
+        # Released reservations are dropped
+        later = await engine.assign(repo, NOON + timedelta(hours=2))
+        engine.release(later.ae_id, NOON + timedelta(hours=2))
+        engine.invalidate()
+        assert await engine.assign(repo, NOON + timedelta(hours=2)) is not None
+
+    asyncio.run(scenario())
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from Backend.config import config
+from Backend.llm_gateway import llm_gateway
+
+
+class FakeLLM:
+    """Stands in for llm_gateway.chat_completion; completions for a model can be held or made to fail."""
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.held = {}  # model -> threading.Event released by the test
+        self.failing = set()
+
+    def hold(self, model: str) -> threading.Event:
+        self.held[model] = threading.Event()
+        return self.held[model]
+
+    async def chat_completion(self, model, messages, **kwargs):
+        self.calls.append(model)
+        gate = self.held.get(model)
+        while gate is not None and not gate.is_set():
+            await asyncio.sleep(0.01)
+        if model in self.failing:
+            raise RuntimeError("provider unavailable")
+        brief = {
+            "company_insights": f"Insights by {model}",
+            "pain_points_summary": "Pain points",
+            "relevant_product_features": ["Feature"],
+            "pitch_suggestions": ["Pitch"],
+        }
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(brief)))])
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(config, "OPENAI_DRAFT_MODEL", None)
+    monkeypatch.setattr(config, "BRIEF_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_gateway, "chat_completion", fake.chat_completion)
+    return fake
+
+
+@pytest.fixture
+def merchant_id(client, book):
+    book(name="Brief Bistro")
+    return next(d["id"] for d in client.get("/demos").json() if d["merchantName"] == "Brief Bistro")
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.02)
+    raise AssertionError("condition not met in time")
+
+
+def finished_job(client, job_id):
+    job = client.get(f"/brief-jobs/{job_id}").json()
+    return job if job["status"] in ("done", "failed") else None
+
+
+def test_generate_requests_coalesce_onto_one_job(client, llm, merchant_id):
+    release = llm.hold(config.OPENAI_MODEL)
+    responses = [client.post(f"/generate-brief/{merchant_id}") for _ in range(3)]
+
+    assert {r.status_code for r in responses} == {202}
+    assert len({r.json()["id"] for r in responses}) == 1
+    job_id = responses[0].json()["id"]
+    assert responses[0].headers["location"] == f"/brief-jobs/{job_id}"
+
+    release.set()
+    assert wait_for(lambda: finished_job(client, job_id))["status"] == "done"
+    assert llm.calls == [config.OPENAI_MODEL]
+
+    brief = client.get(f"/prep-brief/{merchant_id}").json()
+    assert (brief["status"], brief["model"]) == ("Generated", config.OPENAI_MODEL)
+    # Once the job has finished, the next request starts a new one
+    assert client.post(f"/generate-brief/{merchant_id}").json()["id"] != job_id
+
+
+def test_draft_brief_is_upgraded_in_place(client, llm, merchant_id, monkeypatch):
+    monkeypatch.setattr(config, "OPENAI_DRAFT_MODEL", "fast-model")
+    release = llm.hold(config.OPENAI_MODEL)
+
+    job = client.post(f"/generate-brief/{merchant_id}").json()
+    assert job["kind"] == "generate"
+    assert wait_for(lambda: finished_job(client, job["id"]))["status"] == "done"
+
+    draft = client.get(f"/prep-brief/{merchant_id}").json()
+    assert (draft["status"], draft["model"]) == ("Draft", "fast-model")
+    assert draft["insights"] == "Insights by fast-model"
+    # The upgrade is the booking's active job, so new requests join it
+    upgrade = client.post(f"/generate-brief/{merchant_id}").json()
+    assert upgrade["kind"] == "upgrade"
+
+    release.set()
+    assert wait_for(lambda: finished_job(client, upgrade["id"]))["status"] == "done"
+    final = client.get(f"/prep-brief/{merchant_id}").json()
+    assert (final["status"], final["model"]) == ("Generated", config.OPENAI_MODEL)
+    assert final["id"] == draft["id"]
+    assert final["insights"] == f"Insights by {config.OPENAI_MODEL}"
+    assert llm.calls == ["fast-model", config.OPENAI_MODEL]
+
+
+def test_failed_upgrade_keeps_the_draft(client, llm, merchant_id, monkeypatch):
+    monkeypatch.setattr(config, "OPENAI_DRAFT_MODEL", "fast-model")
+    monkeypatch.setattr(config, "BRIEF_UPGRADE_RETRY_DELAY", 0)
+    llm.failing.add(config.OPENAI_MODEL)
+    release = llm.hold(config.OPENAI_MODEL)
+
+    job = client.post(f"/generate-brief/{merchant_id}").json()
+    wait_for(lambda: finished_job(client, job["id"]))
+    upgrade = client.post(f"/generate-brief/{merchant_id}").json()
+    assert upgrade["kind"] == "upgrade"
+
+    release.set()
+    failed = wait_for(lambda: finished_job(client, upgrade["id"]))
+    # Retried up to the attempt limit before giving up
+    assert (failed["status"], failed["attempts"]) == ("failed", config.BRIEF_JOB_MAX_ATTEMPTS)
+    assert llm.calls.count(config.OPENAI_MODEL) == config.BRIEF_JOB_MAX_ATTEMPTS
+    brief = client.get(f"/prep-brief/{merchant_id}").json()
+    assert (brief["status"], brief["model"]) == ("Draft", "fast-model")
+
+
+def test_upgrade_is_retried_after_a_transient_failure(client, llm, merchant_id, monkeypatch):
+    monkeypatch.setattr(config, "OPENAI_DRAFT_MODEL", "fast-model")
+    monkeypatch.setattr(config, "BRIEF_UPGRADE_RETRY_DELAY", 0.2)
+    llm.failing.add(config.OPENAI_MODEL)
+
+    job = client.post(f"/generate-brief/{merchant_id}").json()
+    wait_for(lambda: finished_job(client, job["id"]))
+    upgrade = client.post(f"/generate-brief/{merchant_id}").json()
+
+    waiting = wait_for(lambda: (lambda j: j if j["run_after"] else None)(client.get(f"/brief-jobs/{upgrade['id']}").json()))
+    assert (waiting["status"], waiting["attempts"]) == ("queued", 1) and waiting["error"]
+    llm.failing.clear()
+
+    assert wait_for(lambda: finished_job(client, upgrade["id"]))["status"] == "done"
+    brief = client.get(f"/prep-brief/{merchant_id}").json()
+    assert (brief["status"], brief["model"]) == ("Generated", config.OPENAI_MODEL)
+
+
+def test_without_api_key_briefs_are_mocked(client, merchant_id):
+    job = client.post(f"/generate-brief/{merchant_id}").json()
+    assert wait_for(lambda: finished_job(client, job["id"]))["status"] == "done"
+    brief = client.get(f"/prep-brief/{merchant_id}").json()
+    assert (brief["status"], brief["model"]) == ("Generated", None)
@@ -0,0 +1,63 @@
+import json
+
+CSV_HEADER = "merchant_name,address,contact_number,email,products_interested,preferred_time,restaurant_category,number_of_outlets,current_pain_points,special_notes\n"
+
+
+def import_body(client, body: str, content_type: str):
+    response = client.post("/bookings/import", content=body.encode(), headers={"content-type": content_type})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_csv_with_quoted_multiline_fields(client):
+    body = CSV_HEADER + (
+        'Harbour Kitchen,"12 Quay St, Suite 4",555-0101,a@example.com,POS;Payments,2031-06-02T10:00:00,Cafe,1 Location,'
+        '"Slow checkout\nat lunch, ""peak"" hours","Line one\nLine two"\n'
+        'Broken Row,1 Road,555-0102,not-an-email,POS,2031-06-02T11:00:00,Cafe,1 Location,,\n'
+        'Noodle Bar,2 Road,555-0103,b@example.com,"[""POS"", ""Loyalty""]",2031-06-02T12:00:00Z,Bar,2-5 Locations,,\n'
+    )
+    report = import_body(client, body, "text/csv")
+
+    assert (report["imported"], report["failed"]) == (2, 1)
+    assert report["errors"][0]["row"] == 2 and "email" in report["errors"][0]["error"]
+
+    demos = {d["merchantName"]: d for d in client.get("/demos", params={"limit": 50}).json()}
+    harbour = demos["Harbour Kitchen"]
+    assert harbour["address"] == "12 Quay St, Suite 4"
+    assert harbour["painPoints"] == 'Slow checkout\nat lunch, "peak" hours'
+    assert harbour["specialNotes"] == "Line one\nLine two"
+    assert harbour["productsInterested"] == "POS, Payments"
+    assert demos["Noodle Bar"]["productsInterested"] == "POS, Loyalty"
+    assert demos["Noodle Bar"]["scheduledDateTime"] == "2031-06-02T12:00:00"
+
+
+def test_csv_unterminated_quote_is_reported(client):
+    report = import_body(client, CSV_HEADER + 'Open Quote,"1 Road,555,a@example.com,POS,2031-06-02T10:00:00,Cafe,1,,\n', "text/csv")
+    assert report["imported"] == 0
+    assert report["errors"] == [{"row": 1, "error": "Unterminated quoted field at end of file"}]
+
+
+def test_ndjson_reports_bad_rows_and_imports_the_rest(client):
+    good = {
+        "merchantName": "Json Diner",
+        "address": "3 Road",
+        "contactNumber": "555",
+        "email": "c@example.com",
+        "preferredDateTime": "2031-06-03T13:00:00+02:00",
+        "category": "Diner",
+        "outlets": "1 Location",
+    }
+    body = "\n".join([json.dumps(good), "{not json", json.dumps(dict(good, preferredDateTime="2031-06-03T03:00:00"))]) + "\n"
+    report = import_body(client, body, "application/x-ndjson")
+
+    # Row 3 is outside every AE's working hours
+    assert report["imported"] == 1
+    assert [e["row"] for e in report["errors"]] == [2, 3]
+    assert report["errors"][1]["error"] == "No AE is available at the requested time."
+    # Stored as naive UTC
+    demo = next(d for d in client.get("/demos").json() if d["merchantName"] == "Json Diner")
+    assert demo["scheduledDateTime"] == "2031-06-03T11:00:00"
+
+
+def test_unsupported_content_type(client):
+    assert client.post("/bookings/import", content=b"{}", headers={"content-type": "application/json"}).status_code == 415
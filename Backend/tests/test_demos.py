@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import pytest
+
+from Backend.db import BookingRecord, memory_db
+
+SORT_KEYS = {
+    "scheduled_time": lambda demo: (demo["scheduledDateTime"], UUID(demo["id"])),
+    "merchant_name": lambda demo: (demo["merchantName"], UUID(demo["id"])),
+}
+
+
+def all_pages(client, url="/demos", limit=3, **params):
+    demos, cursor = [], None
+    while True:
+        page_params = dict(params, limit=limit)
+        if cursor:
+            page_params["cursor"] = cursor
+        response = client.get(url, params=page_params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= limit
+        demos += page
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return demos
+
+
+@pytest.fixture
+def demos(book):
+    """Twenty bookings over four days with repeated names, so sorts need the id tiebreak."""
+    start = datetime(2031, 5, 5, 10, 0)
+    for i in range(20):
+        when = start + timedelta(days=i % 4, minutes=30 * (i // 4))
+        book(
+            name=["Alpha Grill", "Beta|Bar", "Gamma Cafe"][i % 3],
+            when=when.isoformat(),
+            category="Bar" if i % 2 else "Cafe",
+            productsInterested=["POS", "Loyalty"] if i % 5 == 0 else ["Payments"],
+            painPoints="slow inventory counts" if i % 4 == 0 else "staff scheduling",
+        )
+
+
+@pytest.mark.parametrize("sort", ["scheduled_time", "-scheduled_time", "merchant_name", "-merchant_name"])
+def test_cursor_pages_cover_every_demo_once_in_order(client, demos, sort):
+    everything = client.get("/demos", params={"limit": 500}).json()
+    paged = all_pages(client, sort=sort)
+
+    key = SORT_KEYS[sort.lstrip("-")]
+    assert [key(d) for d in paged] == sorted((key(d) for d in everything), reverse=sort.startswith("-"))
+    assert len({d["id"] for d in paged}) == len(everything) == 22  # plus the two seeded bookings
+
+
+def test_demos_carry_the_ae_name(client, demos):
+    assert all(d["aeName"] for d in all_pages(client))
+
+
+def test_cursor_from_another_sort_is_rejected(client, demos):
+    cursor = client.get("/demos", params={"limit": 2}).headers["x-next-cursor"]
+    assert client.get("/demos", params={"cursor": cursor, "sort": "merchant_name"}).status_code == 400
+    assert client.get("/demos", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_filters(client, demos):
+    bars = all_pages(client, category="Bar")
+    assert len(bars) == 10 and all(d["category"] == "Bar" for d in bars)
+
+    loyalty = all_pages(client, product="Loyalty")
+    assert len(loyalty) == 4 and all("Loyalty" in d["productsInterested"] for d in loyalty)
+
+    window = all_pages(client, **{"from": "2031-05-06T00:00:00", "to": "2031-05-07T00:00:00"})
+    assert len(window) == 5 and all(d["scheduledDateTime"].startswith("2031-05-06") for d in window)
+
+    ae = next(ae for ae in memory_db.aes.values() if ae.name == "Mike Chen")
+    mine = all_pages(client, ae_id=str(ae.id))
+    assert mine and all(d["aeName"] == "Mike Chen" for d in mine)
+
+    completed_id = window[0]["id"]
+    assert client.put(f"/demos/{completed_id}/complete").status_code == 200
+    assert [d["id"] for d in all_pages(client, status=["completed"])] == [completed_id]
+
+    assert client.get("/demos", params={"from": "2031-05-07T00:00:00", "to": "2031-05-06T00:00:00"}).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "window",
+    [
+        {"from": "2031-05-06T00:00:00Z", "to": "2031-05-07T00:00:00Z"},
+        {"from": "2031-05-06T02:00:00+02:00", "to": "2031-05-06T19:00:00-05:00"},
+        {"from": "2031-05-06T00:00:00", "to": "2031-05-07T00:00:00Z"},
+        {"from": "2031-05-06T00:00:00Z", "to": "2031-05-07T00:00:00"},
+    ],
+)
+def test_window_accepts_aware_and_mixed_bounds(client, demos, window):
+    naive = all_pages(client, **{"from": "2031-05-06T00:00:00", "to": "2031-05-07T00:00:00"})
+    assert all_pages(client, **window) == naive
+
+
+def test_inverted_mixed_window_is_rejected(client):
+    assert client.get("/demos", params={"from": "2031-05-06T03:00:00+02:00", "to": "2031-05-06T00:00:00"}).status_code == 400
+
+
+def test_search(client, demos):
+    assert len(all_pages(client, q="inventory")) == 5 + 1  # plus the seeded Bella Vista booking
+    assert len(all_pages(client, q="inventory or scheduling")) == 20 + 1
+    assert {d["merchantName"] for d in all_pages(client, q="gamma")} == {"Gamma Cafe"}
+    assert all_pages(client, q="inventory -slow") == [all_pages(client, q="Bella")[0]]
+
+
+def test_if_none_match_returns_304_until_data_changes(client, book):
+    first = client.get("/demos")
+    etag = first.headers["etag"]
+
+    cached = client.get("/demos", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert client.get("/calendar-events", headers={"If-None-Match": client.get("/calendar-events").headers["etag"]}).status_code == 304
+
+    book()
+    assert client.get("/demos", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_calendar_window_accepts_aware_and_mixed_bounds(client, demos):
+    naive = client.get("/calendar-events", params={"from": "2031-05-06T00:00:00", "to": "2031-05-07T00:00:00"}).json()
+    assert naive["total_events"] == 5
+
+    for window in (
+        {"from": "2031-05-06T00:00:00Z", "to": "2031-05-07T02:00:00+02:00"},
+        {"from": "2031-05-06T00:00:00", "to": "2031-05-07T00:00:00Z"},
+    ):
+        response = client.get("/calendar-events", params=window)
+        assert response.status_code == 200, response.text
+        assert response.json()["events"] == naive["events"]
+    assert client.get("/calendar-events", params={"from": "2031-05-06T02:00:00+02:00", "to": "2031-05-06T00:00:00"}).status_code == 400
+
+
+def test_ae_demos_window_and_unscheduled_bookings(client, demos):
+    ae = next(ae for ae in memory_db.aes.values() if ae.name == "Mike Chen")
+    memory_db.add_booking(BookingRecord(merchant_name="Unscheduled", products_interested=[], assigned_ae_id=ae.id))
+    url = f"/aes/{ae.id}/demos"
+
+    mine = all_pages(client, url)
+    assert mine and "Unscheduled" not in {d["merchantName"] for d in mine}
+    naive = all_pages(client, url, **{"from": "2031-05-06T00:00:00", "to": "2031-05-08T00:00:00"})
+    assert naive and naive == all_pages(client, url, **{"from": "2031-05-06T02:00:00+02:00", "to": "2031-05-08T00:00:00Z"})
+    assert naive == all_pages(client, url, **{"from": "2031-05-06T00:00:00", "to": "2031-05-08T00:00:00Z"})
+
+    cursor = client.get(url, params={"limit": 1}).headers["x-next-cursor"]
+    assert client.get(url, params={"cursor": cursor}).status_code == 200
+    assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 400
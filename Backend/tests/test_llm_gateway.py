@@ -0,0 +1,62 @@
+import pytest
+
+from Backend import llm_gateway
+from Backend.llm_gateway import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_gateway.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # resets the run
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_admits_one_probe_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 29.9
+    assert not breaker.allow()
+
+    clock[0] += 0.1
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    assert not breaker.allow()  # the probe is still in flight
+
+
+def test_probe_success_closes_and_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened_at == clock[0]
+    assert not breaker.allow()
+
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert (breaker.state, breaker.failures) == ("closed", 0)
+    assert breaker.allow() and breaker.allow()
+
+
+def test_released_probe_lets_the_next_call_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == "half-open"
+    assert breaker.allow()
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime
+
+from Backend.db import BookingRecord, InMemoryDB, InMemoryRepository
+
+
+def booking(name: str, when: datetime, ae_id=None) -> BookingRecord:
+    return BookingRecord(merchant_name=name, products_interested=[], scheduled_time=when, preferred_time=when, assigned_ae_id=ae_id)
+
+
+def test_indexes_stay_sorted_through_add_and_bulk_load():
+    store = InMemoryDB()
+    store.seed()
+    ae_id = next(iter(store.aes))
+    store.add_booking(booking("Zeta", datetime(2031, 1, 3, 12), ae_id))
+    store.load_bookings([booking("Alpha", datetime(2031, 1, 2, 12), ae_id), booking("Mid", datetime(2031, 1, 1, 12))])
+
+    assert store.by_time == sorted(store.by_time) and len(store.by_time) == 5
+    assert store.by_name == sorted(store.by_name) and store.by_name[0][0] == "Alpha"
+    assert [when for when, _ in store.by_ae[ae_id]][-2:] == [datetime(2031, 1, 2, 12), datetime(2031, 1, 3, 12)]
+
+
+def test_set_status_moves_the_booking_between_status_sets():
+    store = InMemoryDB()
+    record = booking("Cafe", datetime(2031, 1, 1, 12))
+    store.add_booking(record)
+
+    store.set_status(record, "completed")
+    assert record.id not in store.by_status["upcoming"]
+    assert store.by_status["completed"] == {record.id}
+
+
+def test_aclose_cancels_in_flight_tasks():
+    async def scenario():
+        repository = InMemoryRepository(InMemoryDB())
+        task = asyncio.get_running_loop().create_task(asyncio.sleep(60))
+        repository._tasks.add(task)
+        await repository.aclose()
+        return task, repository
+
+    task, repository = asyncio.run(scenario())
+    assert task.cancelled() and not repository._tasks
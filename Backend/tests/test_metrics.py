@@ -0,0 +1,19 @@
+def test_requests_are_recorded_under_the_route_template(client):
+    client.get("/demos")
+    client.get("/brief-jobs/00000000-0000-0000-0000-000000000000")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'demogenie_http_request_duration_seconds_count{method="GET",route="/demos",status="200"}' in body
+    assert 'route="/brief-jobs/{job_id}",status="404"' in body
+    assert 'demogenie_db_pool_checkout_wait_seconds_count{pool="async"}' in body
+
+
+def test_pool_metrics_report_checkout_waits(client):
+    stats = client.get("/metrics/pool").json()
+    assert set(stats) == {"async", "sync"}
+    waits = stats["async"]["checkout_wait_seconds"]
+    assert list(waits["buckets"])[-1] == "+Inf"
+    assert waits["buckets"]["+Inf"] == waits["count"]
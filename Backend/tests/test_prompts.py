@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from Backend import prompts
+from Backend.prompts import PROMPTS, TRUNCATION_MARK, Tokenizer, brief_fields, render_within_budget
+from Backend.models import MerchantBooking
+
+LONG_TEXT = "Owner wants reporting, refunds and staff permissions across every location. " * 40
+
+
+@pytest.fixture
+def tokenizer():
+    return Tokenizer("gpt-4")
+
+
+@pytest.fixture
+def fields():
+    booking = MerchantBooking(
+        merchant_name="Budget Bistro",
+        address="1 Road",
+        contact_number="555",
+        email="a@example.com",
+        products_interested=["POS", "Payments"],
+        preferred_time="2031-05-05T10:00:00",
+        restaurant_category="Cafe",
+        number_of_outlets="1 Location",
+        current_pain_points=LONG_TEXT,
+        special_notes=LONG_TEXT[: len(LONG_TEXT) // 4],
+    )
+    return brief_fields(booking)
+
+
+TEMPLATES = [template for versions in PROMPTS.values() for template in versions.values()]
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=lambda t: t.key)
+@pytest.mark.parametrize("room", [2, 10, 75, 300])
+def test_rendered_prompt_fits_budget(template, room, tokenizer, fields):
+    # `room` tokens for the free-text fields on top of the rest of the prompt
+    base = tokenizer.count_messages(template.render({**fields, "pain_points": "", "special_notes": ""}))
+    budget = base + room
+    messages = render_within_budget(template, fields, tokenizer, budget)
+    assert tokenizer.count_messages(messages) <= budget
+    # Deterministic for the same inputs
+    assert render_within_budget(template, fields, tokenizer, budget) == messages
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=lambda t: t.key)
+def test_prompt_under_budget_or_unlimited_is_unchanged(template, tokenizer, fields):
+    assert render_within_budget(template, fields, tokenizer, 0) == template.render(fields)
+    short = dict(fields, pain_points="Slow checkout", special_notes=None)
+    assert render_within_budget(template, short, tokenizer, 10_000) == template.render(short)
+
+
+def test_truncate_cuts_at_a_word_boundary(tokenizer):
+    text = tokenizer.truncate(LONG_TEXT, 20)
+    assert tokenizer.count(text) <= 20
+    assert text.endswith(TRUNCATION_MARK)
+    assert LONG_TEXT.startswith(text[: -len(TRUNCATION_MARK)])
+    assert LONG_TEXT[len(text) - len(TRUNCATION_MARK)] in " ,."
+
+
+def test_get_tokenizer_loads_in_the_background(monkeypatch):
+    release, encoding = threading.Event(), object()
+
+    def slow_load(model):
+        release.wait(5)
+        return encoding
+
+    monkeypatch.setattr(prompts, "_load_encoding", slow_load)
+    monkeypatch.setattr(prompts, "_tokenizers", {})
+
+    tokenizer = prompts.get_tokenizer("slow-model")
+    assert not tokenizer.exact  # returned without waiting; estimates meanwhile
+    assert prompts.get_tokenizer("slow-model") is tokenizer
+    release.set()
+    assert tokenizer.load().encoding is encoding
+
+
+def test_brief_messages_are_budgeted_for_the_target_model(monkeypatch):
+    monkeypatch.setattr(prompts, "_load_encoding", lambda model: None)
+    monkeypatch.setattr(prompts, "_tokenizers", {})
+    booking = MerchantBooking(
+        merchant_name="Budget Bistro",
+        address="1 Road",
+        contact_number="555",
+        email="a@example.com",
+        products_interested=["POS"],
+        preferred_time="2031-05-05T10:00:00",
+        restaurant_category="Cafe",
+        number_of_outlets="1 Location",
+    )
+
+    prompts.render_brief_messages(booking, "draft-model")
+    assert set(prompts._tokenizers) == {"draft-model"}
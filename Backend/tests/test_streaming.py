@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from Backend.streaming import JSONSectionParser
+
+BRIEF = {
+    "company_insights": 'Says "hi", uses {braces} and [brackets], ends with a backslash \\',
+    "pain_points_summary": "Line one\nLine two",
+    "relevant_product_features": ["A, with comma", {"nested": ["x", "}"]}],
+    "pitch_suggestions": [],
+}
+DOCUMENT = "```json\n" + json.dumps(BRIEF, indent=2) + "\n```\ntrailing text"
+
+
+def feed_in_chunks(chunks):
+    parser = JSONSectionParser()
+    members = []
+    for chunk in chunks:
+        members += parser.feed(chunk)
+    return members
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(DOCUMENT)])
+def test_members_are_identical_for_any_chunking(size):
+    chunks = [DOCUMENT[i:i + size] for i in range(0, len(DOCUMENT), size)]
+    assert feed_in_chunks(chunks) == list(BRIEF.items())
+
+
+def test_every_two_way_split():
+    for cut in range(len(DOCUMENT)):
+        assert feed_in_chunks([DOCUMENT[:cut], DOCUMENT[cut:]]) == list(BRIEF.items())
+
+
+def test_member_is_returned_as_soon_as_it_is_complete():
+    parser = JSONSectionParser()
+    assert parser.feed('{"company_insights": "done"') == []
+    assert parser.feed(', "pain') == [("company_insights", "done")]
+    assert parser.feed('_points_summary": "x"}') == [("pain_points_summary", "x")]
+    assert parser.feed(', "ignored": 1}') == []
+
+
+def test_malformed_member_is_skipped():
+    assert feed_in_chunks(['{"a": tru, "b": 2}']) == [("b", 2)]
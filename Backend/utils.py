@@ -1,96 +1,136 @@
 from __future__ import annotations
 
+import base64
 import json
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Optional
 from uuid import UUID
 
+from .brief_cache import brief_cache, brief_cache_key
 from .config import config
-from .db import db
+from .llm_gateway import llm_gateway
+from .metrics import BRIEF_FALLBACKS
 from .models import AE, MerchantBooking, PrepBrief
+from .prompts import BRIEF_PROMPT, render_brief_messages
 
 
-def is_within_working_hours(ae: AE, dt: datetime) -> bool:
-    return ae.working_start <= dt.time() <= ae.working_end
+def create_meeting_link() -> str:
+    # Placeholder meeting link generator
+    return "https://meet.google.com/zsp-mgca-qso?hs=197&hs=187&authuser=0&ijlm=1756460105373&adhoc=1"
+
+
+def encode_cursor(sort: str, value: Any, booking_id: UUID) -> str:
+    """Encode a keyset position (sort key, its value, booking id) as an opaque, URL-safe cursor."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = f"{sort}|{value}|{booking_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str, UUID]:
+    """Decode a cursor produced by encode_cursor into (sort, raw value, id). Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        sort, rest = raw.split("|", 1)
+        # The value itself may contain "|" (e.g. a merchant name), the id never does
+        value, booking_id = rest.rsplit("|", 1)
+        return sort, value, UUID(booking_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+# Identifies the prompt in cache keys. The token budget is part of it since it changes what the model sees;
+# change the prompt by registering a new template version in prompts.py
+PROMPT_VERSION = f"{BRIEF_PROMPT.key}/{config.BRIEF_PROMPT_TOKEN_BUDGET}"
 
 
-def is_ae_available(ae: AE, dt: datetime) -> bool:
-    return is_within_working_hours(ae, dt) and dt not in ae.booked_slots
+# PrepBrief.status of a brief from the draft model, awaiting its upgrade
+DRAFT_STATUS = "Draft"
 
 
-def assign_ae(preferred_time: datetime) -> Optional[UUID]:
-    """Pick the least busy AE available at preferred_time."""
-    available: List[AE] = [ae for ae in db.aes.values() if is_ae_available(ae, preferred_time)]
-    if not available:
+def draft_model() -> Optional[str]:
+    """The fast model that writes first briefs, or None when every brief comes from OPENAI_MODEL."""
+    if not config.OPENAI_API_KEY or config.OPENAI_DRAFT_MODEL in (None, "", config.OPENAI_MODEL):
         return None
-    available.sort(key=lambda ae: len(ae.booked_slots))
-    return available[0].id
+    return config.OPENAI_DRAFT_MODEL
 
 
-def create_meeting_link() -> str:
-    # Placeholder meeting link generator
-    return "https://meet.google.com/zsp-mgca-qso?hs=197&hs=187&authuser=0&ijlm=1756460105373&adhoc=1"
+def current_brief_cache_key(booking: MerchantBooking, model: Optional[str] = None) -> str:
+    """Cache key for this booking under a model (default OPENAI_MODEL), sampling settings and prompt."""
+    return brief_cache_key(
+        booking,
+        model=model or config.OPENAI_MODEL,
+        temperature=config.OPENAI_TEMPERATURE,
+        max_tokens=config.OPENAI_MAX_TOKENS,
+        prompt_version=PROMPT_VERSION,
+    )
+
+
+def format_brief_section(value) -> str:
+    # Convert arrays to strings for storage if needed
+    if isinstance(value, list):
+        return "\n• " + "\n• ".join(value)
+    return value
+
+
+def brief_from_ai_data(ai_data: dict, booking: MerchantBooking, ae: AE) -> PrepBrief:
+    """Build a PrepBrief from the model's JSON sections."""
+    # Handle both old and new format for backward compatibility
+    insights = ai_data.get("company_insights") or ai_data.get("insights", "")
+    pain_points = ai_data.get("pain_points_summary", booking.current_pain_points or "")
+    relevant_features = ai_data.get("relevant_product_features") or ai_data.get("relevant_features", "")
+    pitch_suggestions = ai_data.get("pitch_suggestions", "")
+    
+    return PrepBrief(
+        merchant_id=booking.id,
+        ae_id=ae.id,
+        insights=insights,
+        pain_points_summary=pain_points,
+        relevant_features=format_brief_section(relevant_features),
+        pitch_suggestions=format_brief_section(pitch_suggestions),
+        status="Generated",
+    )
 
 
-async def generate_ai_brief(booking: MerchantBooking, ae: AE) -> PrepBrief:
-    """Generate a prep brief using OpenAI API or fallback to mock."""
+async def cache_brief(cache_key: str, brief: PrepBrief) -> None:
+    """Store a brief's sections under cache_key in both cache tiers."""
+    await brief_cache.put(
+        cache_key,
+        {
+            "insights": brief.insights,
+            "pain_points_summary": brief.pain_points_summary,
+            "relevant_features": brief.relevant_features,
+            "pitch_suggestions": brief.pitch_suggestions,
+        },
+        model=brief.model or config.OPENAI_MODEL,
+        prompt_version=PROMPT_VERSION,
+    )
+
+
+async def generate_ai_brief(booking: MerchantBooking, ae: AE, model: Optional[str] = None) -> PrepBrief:
+    """Generate a prep brief with `model` (default OPENAI_MODEL) or fall back to mock.
+
+    Successful OpenAI results are cached by content; mock fallbacks are not,
+    so a transient API failure never pins a mock brief in the cache. The
+    brief's `model` is left unset for mock briefs.
+    """
     
     if not config.OPENAI_API_KEY:
+        BRIEF_FALLBACKS.labels("no_api_key").inc()
         return _mock_generate_brief(booking, ae)
     
+    model = model or config.OPENAI_MODEL
+    cache_key = current_brief_cache_key(booking, model) if config.BRIEF_CACHE_ENABLED else None
+    if cache_key:
+        cached = await brief_cache.get(cache_key)
+        if cached is not None:
+            return PrepBrief(merchant_id=booking.id, ae_id=ae.id, status="Generated", model=model, **cached)
+    
     try:
-        import openai
-        
-        client = openai.AsyncOpenAI(api_key=config.OPENAI_API_KEY)
-        
-        # Create a detailed prompt for the AI
-        prompt = f"""
-        You are an AI assistant helping an Account Executive prepare for a demo with a restaurant client. 
-        Your task is to create a comprehensive, detailed prep brief that will help the AE understand the merchant's 
-        business context, challenges, and how to effectively pitch our solutions.
-
-        CLIENT INFORMATION:
-        - Restaurant Name: {booking.merchant_name}
-        - Category: {booking.restaurant_category}
-        - Number of Outlets: {booking.number_of_outlets}
-        - Products Interested: {', '.join(booking.products_interested)}
-        - Current Pain Points: {booking.current_pain_points}
-        - Special Notes: {booking.special_notes or 'None'}
-        - Contact: {booking.contact_number} | {booking.email}
-        - Address: {booking.address}
-        - Website: {booking.website_links or 'Not specified'}
-        - Social Media: {booking.social_media or 'Not specified'}
-
-        REQUIREMENTS:
-        Please provide a comprehensive prep brief with the following sections:
-
-        1. COMPANY INSIGHTS: Analyze the restaurant's business model, market position, operational challenges, and growth opportunities. Consider their category, outlet count, and any patterns in their pain points.
-
-        2. PAIN POINTS SUMMARY: Expand on their current challenges with detailed analysis. Identify root causes, business impact, and how these challenges affect their operations, revenue, and customer experience.
-
-        3. RELEVANT PRODUCT FEATURES: Recommend specific features and solutions that directly address their pain points. Focus on ROI, efficiency gains, and competitive advantages they would achieve.
-
-        4. PITCH SUGGESTIONS: Provide specific talking points, approach recommendations, and conversation starters. Include objection handling strategies and success metrics to emphasize.
-
-        FORMAT REQUIREMENTS:
-        Format the response as JSON with these exact keys:
-        {{
-            "company_insights": "Detailed company analysis and business context (2-3 paragraphs)",
-            "pain_points_summary": "Comprehensive pain points analysis with business impact (2-3 paragraphs)", 
-            "relevant_product_features": ["Feature 1 with benefit", "Feature 2 with benefit", "Feature 3 with benefit"],
-            "pitch_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3", "Suggestion 4"]
-        }}
-
-        IMPORTANT: Make the content rich in detail, actionable, and fully informative for a sales pitch. 
-        Base all insights on the provided merchant information and industry knowledge of restaurant operations.
-        """
-        
-        response = await client.chat.completions.create(
-            model=config.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are an expert sales consultant specializing in restaurant technology solutions with deep knowledge of POS systems, inventory management, online ordering, and restaurant operations. You excel at analyzing business challenges and providing actionable insights for sales professionals."},
-                {"role": "user", "content": prompt}
-            ],
+        response = await llm_gateway.chat_completion(
+            model=model,
+            messages=render_brief_messages(booking, model),
             temperature=config.OPENAI_TEMPERATURE,
             max_tokens=config.OPENAI_MAX_TOKENS,
         )
@@ -106,32 +146,16 @@ async def generate_ai_brief(booking: MerchantBooking, ae: AE) -> PrepBrief:
             # Fallback: extract sections from text
             ai_data = _parse_ai_response(content)
         
-        # Handle both old and new format for backward compatibility
-        insights = ai_data.get("company_insights") or ai_data.get("insights", "")
-        pain_points = ai_data.get("pain_points_summary", booking.current_pain_points or "")
-        relevant_features = ai_data.get("relevant_product_features") or ai_data.get("relevant_features", "")
-        pitch_suggestions = ai_data.get("pitch_suggestions", "")
-        
-        # Convert arrays to strings for storage if needed
-        if isinstance(relevant_features, list):
-            relevant_features = "\n• " + "\n• ".join(relevant_features)
-        if isinstance(pitch_suggestions, list):
-            pitch_suggestions = "\n• " + "\n• ".join(pitch_suggestions)
-        
-        brief = PrepBrief(
-            merchant_id=booking.id,
-            ae_id=ae.id,
-            insights=insights,
-            pain_points_summary=pain_points,
-            relevant_features=relevant_features,
-            pitch_suggestions=pitch_suggestions,
-            status="Generated",
-        )
+        brief = brief_from_ai_data(ai_data, booking, ae)
+        brief.model = model
+        if cache_key:
+            await cache_brief(cache_key, brief)
         return brief
         
     except Exception as e:
         print(f"OpenAI API error: {e}")
         print("Falling back to mock brief generation")
+        BRIEF_FALLBACKS.labels("llm_error").inc()
         return _mock_generate_brief(booking, ae)
 
 
@@ -242,10 +266,3 @@ def _parse_ai_response(content: str) -> dict:
             sections[current_section] += line + " "
     
     return sections
-
-
-def calendar_mock_book(ae: AE, dt: datetime) -> None:
-    """Placeholder for Google Calendar booking; just store the slot."""
-    ae.booked_slots.append(dt)
-
-
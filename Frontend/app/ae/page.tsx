@@ -2,7 +2,7 @@
 
 import type React from "react"
 
-import { useEffect, useMemo, useState } from "react"
+import { useEffect, useMemo, useRef, useState } from "react"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Input } from "@/components/ui/input"
@@ -69,35 +69,59 @@ interface CalendarEvent {
   prep_brief_status: string
 }
 
-async function fetchDemos(): Promise<Demo[]> {
+interface PrepBriefView {
+  insights: string
+  pitch: string
+  next_steps: string
+  status?: string // "Draft" while the final model's upgrade is pending, then "Generated"
+  model?: string | null
+}
+
+// Streamed brief section names that differ from the stored brief's field names
+const BRIEF_SECTION_FIELDS: Record<string, string> = {
+  company_insights: "insights",
+  relevant_product_features: "relevant_features",
+}
+
+interface DemoPage {
+  demos: Demo[]
+  nextCursor: string | null // X-Next-Cursor; null on the last page
+}
+
+// One keyset page of /demos; later pages load on demand instead of pulling the whole table
+async function fetchDemos(cursor: string | null = null): Promise<DemoPage> {
   const baseUrl = process.env.NEXT_PUBLIC_API_BASE_URL || "http://localhost:8000"
-  const res = await fetch(`${baseUrl}/demos`, { cache: "no-store" })
+  const url = cursor ? `${baseUrl}/demos?cursor=${encodeURIComponent(cursor)}` : `${baseUrl}/demos`
+  // "no-cache" revalidates with If-None-Match, so an unchanged page comes back as 304
+  const res = await fetch(url, { cache: "no-cache" })
   if (!res.ok) throw new Error("Failed to load demos")
-  const raw = await res.json()
-  // Normalize potential backend shapes into the UI Demo interface where possible
-  return (raw as any[]).map((item) => {
-    const scheduledDateTime =
-      item.scheduledDateTime || item.scheduled_time || item.scheduledTime || item.scheduled || new Date().toISOString()
-    return {
-      id: String(item.id ?? item.merchant_id ?? item.merchantId ?? Math.random().toString(36).slice(2)),
-      merchantName: item.merchantName || item.merchant_name || item.merchant || "Merchant",
-      category: item.category || "",
-      scheduledDateTime,
-      aeName: item.aeName || item.ae_name || "",
-      status: (item.status as Demo["status"]) || "upcoming",
-      meetingLink: item.meetingLink || item.meeting_link || "#",
-      address: item.address || "",
-      contactNumber: item.contactNumber || item.contact_number || "",
-      email: item.email || "",
-      website: item.website,
-      socialMedia: item.socialMedia,
-      productsInterested: item.productsInterested || item.products_interested || "",
-      outlets: String(item.outlets ?? ""),
-      painPoints: item.painPoints || item.pain_points || "",
-      specialNotes: item.specialNotes || item.special_notes,
-      prep_brief_status: item.prep_brief_status || item.prepBriefStatus || item.prepStatus || "Pending",
-    } as Demo
-  })
+  const raw: any[] = await res.json()
+  return { demos: raw.map(normalizeDemo), nextCursor: res.headers.get("X-Next-Cursor") }
+}
+
+// Normalize potential backend shapes into the UI Demo interface where possible
+function normalizeDemo(item: any): Demo {
+  const scheduledDateTime =
+    item.scheduledDateTime || item.scheduled_time || item.scheduledTime || item.scheduled || new Date().toISOString()
+  return {
+    id: String(item.id ?? item.merchant_id ?? item.merchantId ?? Math.random().toString(36).slice(2)),
+    merchantName: item.merchantName || item.merchant_name || item.merchant || "Merchant",
+    category: item.category || "",
+    scheduledDateTime,
+    aeName: item.aeName || item.ae_name || "",
+    status: (item.status as Demo["status"]) || "upcoming",
+    meetingLink: item.meetingLink || item.meeting_link || "#",
+    address: item.address || "",
+    contactNumber: item.contactNumber || item.contact_number || "",
+    email: item.email || "",
+    website: item.website,
+    socialMedia: item.socialMedia,
+    productsInterested: item.productsInterested || item.products_interested || "",
+    outlets: String(item.outlets ?? ""),
+    painPoints: item.painPoints || item.pain_points || "",
+    specialNotes: item.specialNotes || item.special_notes,
+    prep_brief_status: item.prep_brief_status || item.prepBriefStatus || item.prepStatus || "Pending",
+  } as Demo
 }
 
 export default function AEPage() {
@@ -105,11 +129,16 @@ export default function AEPage() {
   const [isLoggedIn, setIsLoggedIn] = useState(false)
   const [aeName, setAeName] = useState("")
   const [demos, setDemos] = useState<Demo[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(false)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [generating, setGenerating] = useState<Record<string, boolean>>({})
   const [viewing, setViewing] = useState<Record<string, boolean>>({})
-  const [briefs, setBriefs] = useState<Record<string, { insights: string; pitch: string; next_steps: string } | null>>({})
+  const [briefs, setBriefs] = useState<Record<string, PrepBriefView | null>>({})
+  // Read by the /changes listener, which is set up once per login
+  const loadedBriefs = useRef(briefs)
+  loadedBriefs.current = briefs
   const [previewModalOpen, setPreviewModalOpen] = useState<string | null>(null)
   const [generatingPDF, setGeneratingPDF] = useState<Record<string, boolean>>({})
   const [markingComplete, setMarkingComplete] = useState<Record<string, boolean>>({})
@@ -130,8 +159,10 @@ export default function AEPage() {
     let cancelled = false
     setLoading(true)
     fetchDemos()
-      .then((data) => {
-        if (!cancelled) setDemos(data)
+      .then((page) => {
+        if (cancelled) return
+        setDemos(page.demos)
+        setNextCursor(page.nextCursor)
       })
       .catch((err) => {
         console.error(err)
@@ -146,17 +177,95 @@ export default function AEPage() {
     }
   }, [isLoggedIn])
 
+  // Live updates pushed from /changes instead of re-downloading the demo list
+  useEffect(() => {
+    if (!isLoggedIn || typeof EventSource === "undefined") return
+    const baseUrl = process.env.NEXT_PUBLIC_API_BASE_URL || "http://localhost:8000"
+    const source = new EventSource(`${baseUrl}/changes`)
+    // Back to the first page; further pages load again on demand
+    const refetch = () =>
+      fetchDemos()
+        .then((page) => {
+          setDemos(page.demos)
+          setNextCursor(page.nextCursor)
+        })
+        .catch((err) => console.error(err))
+    const patch = (id: string, changes: Partial<Demo>) =>
+      setDemos((prev) => prev.map((d) => (d.id === id ? { ...d, ...changes } : d)))
+    const data = (e: Event) => JSON.parse((e as MessageEvent).data)
+    let opened = false
+
+    source.onopen = () => {
+      // Events sent while the browser was reconnecting are lost, so catch up
+      if (opened) refetch()
+      opened = true
+    }
+    source.addEventListener("booking_created", (e) => {
+      const demo = normalizeDemo(data(e).demo)
+      setDemos((prev) =>
+        [...prev.filter((d) => d.id !== demo.id), demo].sort((a, b) =>
+          a.scheduledDateTime.localeCompare(b.scheduledDateTime),
+        ),
+      )
+    })
+    source.addEventListener("demo_completed", (e) => patch(data(e).id, { status: "completed" }))
+    source.addEventListener("brief_generated", (e) => {
+      const { id } = data(e)
+      patch(id, { prep_brief_status: "Generated" })
+      // Swap a brief on screen for the stored one, e.g. a draft for its final-model upgrade
+      if (loadedBriefs.current[id]) {
+        fetch(`${baseUrl}/prep-brief/${id}`, { cache: "no-cache" })
+          .then((res) => (res.ok ? res.json() : null))
+          .then((brief) => brief && setBriefs((prev) => ({ ...prev, [id]: mapBriefPayload(brief) })))
+          .catch((err) => console.error(err))
+      }
+    })
+    source.addEventListener("bookings_imported", refetch)
+    source.addEventListener("resync", refetch)
+    return () => source.close()
+  }, [isLoggedIn])
+
+  const loadMoreDemos = async () => {
+    if (!nextCursor || loadingMore) return
+    setLoadingMore(true)
+    try {
+      const page = await fetchDemos(nextCursor)
+      // A demo pushed by booking_created may already be in the list
+      setDemos((prev) => {
+        const seen = new Set(prev.map((d) => d.id))
+        return [...prev, ...page.demos.filter((d) => !seen.has(d.id))]
+      })
+      setNextCursor(page.nextCursor)
+    } catch (err) {
+      console.error(err)
+      toast({ title: "Failed to load more demos", description: String(err), variant: "destructive" })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const upcomingDemos = demos.filter((demo) => demo.status === "upcoming")
   const prepNeededDemos = demos.filter((demo) => demo.status === "prep-needed")
 
   const baseUrl = useMemo(() => process.env.NEXT_PUBLIC_API_BASE_URL || "http://localhost:8000", [])
 
-  function mapBriefPayload(raw: any): { insights: string; pitch: string; next_steps: string } {
+  function mapBriefPayload(raw: any): PrepBriefView {
     // Enhanced backend fields: insights (company_insights), pain_points_summary, relevant_features, pitch_suggestions
     const insights = [raw?.insights, raw?.pain_points_summary].filter(Boolean).join("\n\n") || ""
     const pitch = raw?.pitch_suggestions || raw?.pitch || ""
     const nextSteps = raw?.relevant_features || raw?.next_steps || raw?.status || ""
-    return { insights, pitch, next_steps: nextSteps }
+    return { insights, pitch, next_steps: nextSteps, status: raw?.status, model: raw?.model }
+  }
+
+  // Which tier wrote a brief: the fast draft model (upgrade pending) or the final model
+  function briefTierBadge(brief: PrepBriefView | null | undefined) {
+    if (!brief?.status) return null
+    const draft = brief.status === "Draft"
+    return (
+      <Badge variant={draft ? "outline" : "secondary"} className="ml-auto text-xs" title={brief.model || "Template brief"}>
+        {draft ? "Draft" : "Final"}
+      </Badge>
+    )
   }
 
   const handleMarkComplete = async (demo: Demo) => {
@@ -197,14 +306,52 @@ export default function AEPage() {
     }
   }
 
+  // Stream the brief over SSE, showing each section as soon as it is complete.
+  // Resolves with the stored brief, or null if the stream fails before finishing.
+  function streamBrief(merchantId: string): Promise<any | null> {
+    return new Promise((resolve) => {
+      const partial: Record<string, string> = {}
+      const source = new EventSource(`${baseUrl}/generate-brief/${merchantId}/stream`)
+      source.addEventListener("section", (event) => {
+        const { section, content } = JSON.parse((event as MessageEvent).data)
+        partial[BRIEF_SECTION_FIELDS[section] ?? section] = content
+        setBriefs((prev) => ({ ...prev, [merchantId]: mapBriefPayload(partial) }))
+      })
+      source.addEventListener("done", (event) => {
+        source.close()
+        resolve(JSON.parse((event as MessageEvent).data))
+      })
+      source.onerror = () => {
+        source.close()
+        resolve(null)
+      }
+    })
+  }
+
+  // Queue generation as a background job and poll until it settles
+  async function generateBriefViaJob(merchantId: string) {
+    const res = await fetch(`${baseUrl}/generate-brief/${merchantId}`, {
+      method: "POST",
+    })
+    if (!res.ok) throw new Error(`Failed to generate brief (${res.status})`)
+    let job = await res.json()
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 1000))
+      const jobRes = await fetch(`${baseUrl}/brief-jobs/${job.id}`, { cache: "no-store" })
+      if (!jobRes.ok) throw new Error(`Failed to check brief status (${jobRes.status})`)
+      job = await jobRes.json()
+    }
+    if (job.status !== "done") throw new Error(job.error || "Brief generation failed")
+    const briefRes = await fetch(`${baseUrl}/prep-brief/${merchantId}`, { cache: "no-cache" })
+    if (!briefRes.ok) throw new Error(`Failed to fetch brief (${briefRes.status})`)
+    return briefRes.json()
+  }
+
   async function handleGenerateBrief(merchantId: string) {
     try {
       setGenerating((prev) => ({ ...prev, [merchantId]: true }))
-      const res = await fetch(`${baseUrl}/generate-brief/${merchantId}`, {
-        method: "POST",
-      })
-      if (!res.ok) throw new Error(`Failed to generate brief (${res.status})`)
-      const data = await res.json()
+      let data = typeof EventSource !== "undefined" ? await streamBrief(merchantId) : null
+      if (!data) data = await generateBriefViaJob(merchantId)
       // Update brief locally and mark status as Generated
       setBriefs((prev) => ({ ...prev, [merchantId]: mapBriefPayload(data) }))
       setDemos((prev) => prev.map((d) => (d.id === merchantId ? { ...d, prep_brief_status: "Generated" } : d)))
@@ -220,7 +367,7 @@ export default function AEPage() {
   async function handleViewBrief(merchantId: string) {
     try {
       setViewing((prev) => ({ ...prev, [merchantId]: true }))
-      const res = await fetch(`${baseUrl}/prep-brief/${merchantId}`, { method: "GET", cache: "no-store" })
+      const res = await fetch(`${baseUrl}/prep-brief/${merchantId}`, { method: "GET", cache: "no-cache" })
       if (!res.ok) throw new Error(`Failed to fetch brief (${res.status})`)
       const data = await res.json()
       setBriefs((prev) => ({ ...prev, [merchantId]: mapBriefPayload(data) }))
@@ -491,11 +638,15 @@ export default function AEPage() {
     return { todaysCount, pending, rate }
   }, [demos])
 
-  // Function to fetch calendar events
+  // Function to fetch calendar events for the visible month grid
   const fetchCalendarEvents = async () => {
     try {
       setCalendarLoading(true)
-      const res = await fetch(`${baseUrl}/calendar-events`, { cache: "no-store" })
+      const gridDays = getDaysInMonth(currentMonth)
+      const windowEnd = new Date(gridDays[gridDays.length - 1])
+      windowEnd.setDate(windowEnd.getDate() + 1)
+      const params = new URLSearchParams({ from: toLocalISODate(gridDays[0]), to: toLocalISODate(windowEnd) })
+      const res = await fetch(`${baseUrl}/calendar-events?${params}`, { cache: "no-cache" })
       if (!res.ok) throw new Error("Failed to load calendar events")
       const data = await res.json()
       setCalendarEvents(data.events || [])
@@ -513,14 +664,19 @@ export default function AEPage() {
     fetchCalendarEvents()
   }, [isLoggedIn])
 
-  // Refresh calendar when demos change
+  // Refresh calendar when demos or the visible month change
   useEffect(() => {
     if (isLoggedIn) {
       fetchCalendarEvents()
     }
-  }, [demos, isLoggedIn])
+  }, [demos, isLoggedIn, currentMonth])
 
   // Calendar utility functions
+  const toLocalISODate = (date: Date) => {
+    const pad = (n: number) => String(n).padStart(2, "0")
+    return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T00:00:00`
+  }
+
   const getDaysInMonth = (date: Date) => {
     const year = date.getFullYear()
     const month = date.getMonth()
@@ -790,6 +946,18 @@ export default function AEPage() {
                       </div>
                     </div>
                   ))}
+                  {!loading && nextCursor && (
+                    <Button variant="outline" className="w-full" onClick={loadMoreDemos} disabled={loadingMore}>
+                      {loadingMore ? (
+                        <>
+                          <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+                          Loading
+                        </>
+                      ) : (
+                        "Load more"
+                      )}
+                    </Button>
+                  )}
                 </div>
               </CardContent>
             </Card>
@@ -934,6 +1102,7 @@ export default function AEPage() {
                                         <h4 className="font-semibold mb-3 flex items-center gap-2 text-blue-800">
                                           <Sparkles className="w-4 h-4 text-blue-600" />
                                           AI-Generated Insights
+                                          {briefTierBadge(briefs[demo.id])}
                                         </h4>
                                         <p className="text-sm text-blue-700 whitespace-pre-wrap">{briefs[demo.id]?.insights || 'No insights available'}</p>
                                       </div>
@@ -1171,6 +1340,7 @@ export default function AEPage() {
                       <h4 className="font-semibold mb-3 flex items-center gap-2">
                         <Sparkles className="w-4 h-4 text-primary" />
                         Prep Brief
+                        {briefTierBadge(briefs[demo.id])}
                       </h4>
                       {briefs[demo.id] ? (
                         <div className="space-y-4 text-sm">